@@ -1,8 +1,24 @@
 from django.contrib import admin
 
-from administration.models import Role, CustomPermission, Log
+from administration.models import Role, CustomPermission, Log, LogDailySummary
 
 # Register your models here.
 admin.site.register(Role)
 admin.site.register(CustomPermission)
-admin.site.register(Log)
\ No newline at end of file
+admin.site.register(LogDailySummary)
+
+
+@admin.register(Log)
+class LogAdmin(admin.ModelAdmin):
+    list_display = ["timestamp", "user", "action", "category", "content_object"]
+    list_filter = ["category", "action"]
+    list_select_related = ["user", "content_type"]
+    date_hierarchy = "timestamp"
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("user", "content_type")
+            .prefetch_related("content_object")
+        )
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AdministrationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'administration'
+
+    def ready(self):
+        from . import audit, permissions
+
+        audit.connect_signals()
+        permissions.connect_signals()
@@ -0,0 +1,232 @@
+import datetime
+import gzip
+import json
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Log, LogDailySummary
+from .pagination import PAGE_SIZE, KeysetPage, decode_cursor, encode_cursor
+
+# Alte Protokolleinträge werden tageweise als gzip-komprimiertes JSONL unter
+# LOG_ARCHIVE_DIR/<Jahr>/<Monat>/<Datum>.jsonl.gz abgelegt und danach in
+# kleinen Blöcken aus der Datenbank gelöscht. Die Anzahl pro Tag, Kategorie
+# und Aktion führt LogDailySummary schon beim Schreiben der Einträge mit, sie
+# bleibt deshalb auch nach dem Archivieren erhalten.
+ARCHIVE_FIELDS = [
+    "id",
+    "user_id",
+    "user__username",
+    "action",
+    "category",
+    "timestamp",
+    "content_type_id",
+    "object_id",
+    "model_name",
+    "message",
+]
+
+
+def get_archive_dir():
+    return Path(settings.LOG_ARCHIVE_DIR)
+
+
+def get_archive_path(date):
+    return (
+        get_archive_dir() / f"{date:%Y}" / f"{date:%m}" / f"{date.isoformat()}.jsonl.gz"
+    )
+
+
+def _serialize(row):
+    record = {field.replace("user__", ""): row[field] for field in ARCHIVE_FIELDS}
+    record["timestamp"] = row["timestamp"].isoformat()
+    return record
+
+
+def _write_records(date, records):
+    path = get_archive_path(date)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Jeder Block wird als eigenes gzip-Member angehängt, gzip liest die
+    # Datei trotzdem als einen zusammenhängenden Strom.
+    with gzip.open(path, "at", encoding="utf-8") as archive:
+        for record in records:
+            archive.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _update_summary(key, count):
+    date, category, action = key
+    return LogDailySummary.objects.filter(
+        date=date, category=category, action=action
+    ).update(count=F("count") + count)
+
+
+def add_to_summary(entries):
+    # Wird in derselben Transaktion wie die Einträge selbst aufgerufen.
+    counts = Counter(
+        (timezone.localtime(entry.timestamp).date(), entry.category, entry.action)
+        for entry in entries
+    )
+    for key, count in counts.items():
+        if _update_summary(key, count):
+            continue
+        date, category, action = key
+        try:
+            with transaction.atomic():
+                LogDailySummary.objects.create(
+                    date=date, category=category, action=action, count=count
+                )
+        except IntegrityError:
+            _update_summary(key, count)
+
+
+def archive_logs(before, chunk_size=None):
+    chunk_size = chunk_size or settings.LOG_ARCHIVE_CHUNK_SIZE
+    archived = 0
+
+    while True:
+        rows = list(
+            Log.objects.filter(timestamp__lt=before)
+            .order_by("pk")
+            .values(*ARCHIVE_FIELDS)[:chunk_size]
+        )
+        if not rows:
+            return archived
+
+        records = defaultdict(list)
+        for row in rows:
+            date = timezone.localtime(row["timestamp"]).date()
+            records[date].append(_serialize(row))
+
+        # Erst ins Archiv schreiben, dann löschen: bricht der Lauf
+        # dazwischen ab, steht ein Block höchstens doppelt im Archiv.
+        for date, day_records in records.items():
+            _write_records(date, day_records)
+
+        Log.objects.filter(pk__in=[row["id"] for row in rows]).delete()
+
+        archived += len(rows)
+
+
+def _archived_dates(date_from=None, date_to=None):
+    dates = []
+    for path in get_archive_dir().glob("*/*/*.jsonl.gz"):
+        date = parse_date(path.name.split(".")[0])
+        if date is None:
+            continue
+        if date_from and date < date_from:
+            continue
+        if date_to and date > date_to:
+            continue
+        dates.append(date)
+    return sorted(dates, reverse=True)
+
+
+def _read_records(date):
+    with gzip.open(get_archive_path(date), "rt", encoding="utf-8") as archive:
+        for line in archive:
+            if line.strip():
+                record = json.loads(line)
+                record["timestamp"] = parse_datetime(record["timestamp"])
+                yield record
+
+
+def _matches(record, category, params):
+    if record["category"] != category:
+        return False
+    if params.get("user") and record["username"] != params["user"]:
+        return False
+    if params.get("action") and record["action"] != params["action"]:
+        return False
+    if params.get("model_name") and record["model_name"] != params["model_name"]:
+        return False
+    return True
+
+
+def search_archive(category, params, cursor=None, per_page=PAGE_SIZE):
+    date_from = parse_date(params.get("date_from") or "")
+    date_to = parse_date(params.get("date_to") or "")
+
+    position = decode_cursor(cursor) if cursor else None
+    if position is not None:
+        try:
+            timestamp = parse_datetime(position[0])
+        except (TypeError, ValueError):
+            timestamp = None
+        if timestamp is None or timezone.is_naive(timestamp):
+            position = None
+        else:
+            position = (timestamp, position[1])
+            cursor_date = timezone.localtime(timestamp).date()
+            date_to = min(date_to, cursor_date) if date_to else cursor_date
+
+    object_list = []
+    for date in _archived_dates(date_from, date_to):
+        day = sorted(
+            (
+                record
+                for record in _read_records(date)
+                if _matches(record, category, params)
+            ),
+            key=lambda record: (record["timestamp"], record["id"]),
+            reverse=True,
+        )
+        if position is not None:
+            day = [
+                record
+                for record in day
+                if (record["timestamp"], record["id"]) < position
+            ]
+        object_list.extend(day)
+        if len(object_list) > per_page:
+            break
+
+    next_cursor = None
+    if len(object_list) > per_page:
+        object_list = object_list[:per_page]
+        last = object_list[-1]
+        next_cursor = encode_cursor(last["timestamp"].isoformat(), last["id"])
+
+    return KeysetPage(object_list, next_cursor)
+
+
+# Protokollaktivität der letzten Tage für die Systemübersicht, gelesen nur aus
+# LogDailySummary (höchstens eine Zeile pro Tag, Kategorie und Aktion).
+LOG_ACTIVITY_DAYS = 7
+
+
+def get_daily_log_counts(date_from, date_to):
+    counts = Counter()
+    summaries = LogDailySummary.objects.filter(date__range=(date_from, date_to))
+    for row in summaries.values("date", "category", "action", "count"):
+        counts[(row["date"], row["category"], row["action"])] += row["count"]
+    return counts
+
+
+def get_log_activity(days=LOG_ACTIVITY_DAYS):
+    date_to = timezone.localdate()
+    date_from = date_to - datetime.timedelta(days=days - 1)
+    totals = defaultdict(Counter)
+    counts = get_daily_log_counts(date_from, date_to)
+    for (date, category, action), count in counts.items():
+        totals[date][category] += count
+
+    activity = []
+    for offset in range(days):
+        date = date_to - datetime.timedelta(days=offset)
+        activity.append(
+            {
+                "date": date,
+                "total": sum(totals[date].values()),
+                "categories": [
+                    (label, totals[date][category])
+                    for category, label in Log.CATEGORIES
+                    if totals[date][category]
+                ],
+            }
+        )
+    return activity
@@ -0,0 +1,167 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.signals import request_finished
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .archive import add_to_summary
+from .models import Log
+
+logger = logging.getLogger(__name__)
+
+# Protokolleinträge werden nicht mehr einzeln im Request geschrieben, sondern
+# gesammelt und gebündelt per bulk_create gespeichert. Ein Hintergrund-Thread
+# leert den Puffer, sobald er voll ist, das Intervall abgelaufen ist oder ein
+# Request endet. Beim Herunterfahren wird der Rest synchron geschrieben.
+AUDIT_LOG_BATCH_SIZE = getattr(settings, "AUDIT_LOG_BATCH_SIZE", 100)
+AUDIT_LOG_FLUSH_INTERVAL = getattr(settings, "AUDIT_LOG_FLUSH_INTERVAL", 2.0)
+
+
+def _is_synchronous():
+    return getattr(settings, "AUDIT_LOG_SYNCHRONOUS", False)
+
+
+class LogBuffer:
+    def __init__(self, batch_size, flush_interval):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._entries = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._worker = None
+
+    def add(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+            full = len(self._entries) >= self.batch_size
+        self._ensure_worker()
+        if full:
+            self._wakeup.set()
+
+    def notify(self):
+        if self._entries:
+            self._ensure_worker()
+            self._wakeup.set()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                entries, self._entries = self._entries, []
+            if not entries:
+                return 0
+
+            written = 0
+            for start in range(0, len(entries), self.batch_size):
+                batch = entries[start : start + self.batch_size]
+                try:
+                    with transaction.atomic():
+                        Log.objects.bulk_create(batch)
+                        add_to_summary(batch)
+                    written += len(batch)
+                except Exception:
+                    # Einzeln nachschreiben, damit ein fehlerhafter Eintrag
+                    # (z. B. ein inzwischen gelöschter Benutzer) nicht den
+                    # ganzen Stapel blockiert. Was auch einzeln scheitert,
+                    # wird protokolliert und verworfen.
+                    written += self._write_each(batch)
+            return written
+
+    def _write_each(self, entries):
+        written = 0
+        for entry in entries:
+            try:
+                with transaction.atomic():
+                    Log.objects.bulk_create([entry])
+                    add_to_summary([entry])
+                written += 1
+            except Exception:
+                logger.exception(
+                    "Protokolleintrag verworfen: %s %s von Benutzer %s: %s",
+                    entry.category,
+                    entry.action,
+                    entry.user_id,
+                    entry.message,
+                )
+        return written
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+        if self._worker is not None and self._worker.is_alive():
+            self._worker.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def _ensure_worker(self):
+        if self._stopped or (self._worker is not None and self._worker.is_alive()):
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="audit-log-writer", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        try:
+            while not self._stopped:
+                # Aufgeweckt wird bei vollem Puffer und am Ende eines Requests,
+                # sonst spätestens nach Ablauf des Intervalls.
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                if self._stopped:
+                    break
+                if self._entries:
+                    self.flush()
+        finally:
+            connection.close()
+
+
+log_buffer = LogBuffer(AUDIT_LOG_BATCH_SIZE, AUDIT_LOG_FLUSH_INTERVAL)
+
+
+def write_log(user, action, category, content_object=None, message=None):
+    entry = Log(
+        user=user,
+        action=action,
+        category=category,
+        timestamp=timezone.now(),
+        message=message,
+    )
+    if content_object is not None:
+        # bulk_create umgeht Log.save(), model_name wird deshalb hier gesetzt.
+        entry.content_type = ContentType.objects.get_for_model(content_object)
+        entry.object_id = content_object.pk
+        entry.model_name = entry.content_type.model
+
+    if _is_synchronous():
+        with transaction.atomic():
+            entry.save()
+            add_to_summary([entry])
+    else:
+        log_buffer.add(entry)
+    return entry
+
+
+def flush_logs():
+    return log_buffer.flush()
+
+
+def _request_finished(sender, **kwargs):
+    log_buffer.notify()
+
+
+def _shutdown():
+    log_buffer.stop()
+
+
+def connect_signals():
+    request_finished.connect(
+        _request_finished, dispatch_uid="administration.audit.request_finished"
+    )
+    atexit.register(_shutdown)
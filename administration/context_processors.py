@@ -0,0 +1,9 @@
+from django.utils.functional import SimpleLazyObject
+
+from .permissions import get_user_permissions
+
+
+def role_permissions(request):
+    return {
+        "role_permissions": SimpleLazyObject(lambda: get_user_permissions(request.user))
+    }
@@ -0,0 +1,114 @@
+import csv
+import datetime
+import json
+import zlib
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .archive import search_archive
+from .pagination import paginate_keyset
+from .streaming import Echo, buffered
+
+LOG_ACTIONS = ["READ", "CREATE", "UPDATE", "DELETE"]
+LOG_FILTERS = ["user", "action", "model_name", "date_from", "date_to", "archive"]
+
+
+def _start_of_day(value):
+    date = parse_date(value or "")
+    if date is None:
+        return None
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+
+
+def filter_logs(queryset, params):
+    if params.get("user"):
+        queryset = queryset.filter(user__username=params["user"])
+
+    if params.get("action"):
+        queryset = queryset.filter(action=params["action"])
+
+    if params.get("model_name"):
+        queryset = queryset.filter(model_name=params["model_name"])
+
+    date_from = _start_of_day(params.get("date_from"))
+    if date_from is not None:
+        queryset = queryset.filter(timestamp__gte=date_from)
+
+    date_to = _start_of_day(params.get("date_to"))
+    if date_to is not None:
+        queryset = queryset.filter(timestamp__lt=date_to + datetime.timedelta(days=1))
+
+    return queryset
+
+
+def get_log_filters(params):
+    return {name: params.get(name, "") for name in LOG_FILTERS}
+
+
+def paginate_logs(queryset, category, params):
+    # Archivierte Einträge liegen nicht mehr in der Datenbank und werden nur
+    # auf ausdrücklichen Wunsch aus den Archivdateien gelesen.
+    if params.get("archive"):
+        return search_archive(category, params, params.get("cursor"))
+    return paginate_keyset(queryset, params.get("cursor"))
+
+
+# Export für vollständige Protokollauszüge. Die Zeilen werden blockweise per
+# iterator() gelesen und direkt in die Antwort geschrieben, der Speicherbedarf
+# bleibt dadurch unabhängig von der Anzahl der Einträge.
+LOG_EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+}
+LOG_EXPORT_FIELDS = [
+    "id",
+    "timestamp",
+    "user__username",
+    "action",
+    "category",
+    "model_name",
+    "object_id",
+    "message",
+]
+LOG_EXPORT_CHUNK_SIZE = 2000
+
+
+def _csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow([field.replace("user__", "") for field in LOG_EXPORT_FIELDS])
+    for row in rows:
+        yield writer.writerow(
+            [
+                value.isoformat() if name == "timestamp" else value
+                for name, value in zip(LOG_EXPORT_FIELDS, row)
+            ]
+        )
+
+
+def _jsonl_lines(rows):
+    names = [field.replace("user__", "") for field in LOG_EXPORT_FIELDS]
+    for row in rows:
+        record = dict(zip(names, row))
+        record["timestamp"] = record["timestamp"].isoformat()
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def _gzipped(chunks):
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_logs(queryset, export_format, compress=False):
+    rows = (
+        queryset.order_by("timestamp", "pk")
+        .values_list(*LOG_EXPORT_FIELDS)
+        .iterator(chunk_size=LOG_EXPORT_CHUNK_SIZE)
+    )
+    lines = _jsonl_lines(rows) if export_format == "jsonl" else _csv_lines(rows)
+    chunks = buffered(lines)
+    return _gzipped(chunks) if compress else chunks
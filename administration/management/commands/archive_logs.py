@@ -0,0 +1,37 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from administration.archive import archive_logs, get_archive_dir
+from administration.audit import flush_logs
+
+
+class Command(BaseCommand):
+    help = "Move logs older than the retention period into the compressed archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.LOG_RETENTION_DAYS,
+            help="Archive logs older than this many days",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.LOG_ARCHIVE_CHUNK_SIZE,
+            help="Number of logs archived and deleted per transaction",
+        )
+
+    def handle(self, *args, **options):
+        flush_logs()
+
+        before = timezone.now() - datetime.timedelta(days=options["days"])
+        archived = archive_logs(before, chunk_size=options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archive: {archived} logs older than {before:%Y-%m-%d} moved to {get_archive_dir()}."
+            )
+        )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from administration.models import Role
+from administration.roles import copy_role_permissions
+
+
+class Command(BaseCommand):
+    help = "Copy the permissions of one role to one or more other roles"
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="Name of the role to copy from")
+        parser.add_argument(
+            "targets", nargs="+", help="Names of the roles to copy the permissions to"
+        )
+
+    def handle(self, *args, **options):
+        names = [options["source"], *options["targets"]]
+        roles = {role.name: role for role in Role.objects.filter(name__in=names)}
+        missing = [name for name in names if name not in roles]
+        if missing:
+            raise CommandError(f"Unknown roles: {', '.join(missing)}")
+
+        changed = copy_role_permissions(
+            roles[options["source"]], [roles[name] for name in options["targets"]]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Permissions: copied from '{options['source']}' to {len(changed)} changed roles."
+            )
+        )
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.8 on 2026-10-17 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0004_alter_log_category'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='log',
+            index=models.Index(fields=['category', '-timestamp', '-id'], name='log_category_timestamp_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.8 on 2026-10-17 20:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0005_log_category_timestamp_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('category', models.CharField(choices=[('SYSTEM', 'System'), ('ADMINISTRATION', 'Administration'), ('COMMUNICATION', 'Kommunikation'), ('MANAGEMENT', 'Verwaltung'), ('DISPOSITION', 'Disposition'), ('CLOUD', 'Cloud')], max_length=20)),
+                ('action', models.CharField(max_length=10)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-date', 'category', 'action'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='logdailysummary',
+            constraint=models.UniqueConstraint(fields=('date', 'category', 'action'), name='log_daily_summary_unique'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.2.8 on 2026-10-17 22:10
+
+from django.db import migrations, models
+
+
+def merge_duplicates(apps, schema_editor):
+    # setup_permissions hat bei geänderten Beschreibungen doppelte Rechte
+    # angelegt. Rollen werden auf den ältesten Eintrag umgehängt, die übrigen
+    # gelöscht.
+    CustomPermission = apps.get_model("administration", "CustomPermission")
+    Role = apps.get_model("administration", "Role")
+    RolePermission = Role.permissions.through
+
+    keep = {}
+    duplicates = {}
+    for pk, codename in CustomPermission.objects.order_by("pk").values_list(
+        "pk", "permission"
+    ):
+        if codename in keep:
+            duplicates[pk] = keep[codename]
+        else:
+            keep[codename] = pk
+    if not duplicates:
+        return
+
+    RolePermission.objects.bulk_create(
+        [
+            RolePermission(role_id=role_id, custompermission_id=duplicates[pk])
+            for role_id, pk in RolePermission.objects.filter(
+                custompermission_id__in=duplicates
+            ).values_list("role_id", "custompermission_id")
+        ],
+        ignore_conflicts=True,
+    )
+    CustomPermission.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0006_log_daily_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='custompermission',
+            name='permission',
+            field=models.CharField(max_length=200, unique=True),
+        ),
+    ]
@@ -0,0 +1,49 @@
+from collections import Counter
+
+from django.db import migrations
+from django.db.models import F
+from django.utils import timezone
+
+
+# Bisher enthielt LogDailySummary nur archivierte Einträge. Ab jetzt zählt sie
+# alle Einträge, die noch vorhandenen werden deshalb einmalig nachgetragen.
+def _live_counts(apps):
+    Log = apps.get_model("administration", "Log")
+    counts = Counter()
+    for timestamp, category, action in (
+        Log.objects.values_list("timestamp", "category", "action").iterator()
+    ):
+        counts[(timezone.localtime(timestamp).date(), category, action)] += 1
+    return counts
+
+
+def add_live_logs(apps, schema_editor):
+    LogDailySummary = apps.get_model("administration", "LogDailySummary")
+    for (date, category, action), count in _live_counts(apps).items():
+        summary, created = LogDailySummary.objects.get_or_create(
+            date=date, category=category, action=action, defaults={"count": count}
+        )
+        if not created:
+            LogDailySummary.objects.filter(pk=summary.pk).update(
+                count=F("count") + count
+            )
+
+
+def remove_live_logs(apps, schema_editor):
+    LogDailySummary = apps.get_model("administration", "LogDailySummary")
+    for (date, category, action), count in _live_counts(apps).items():
+        LogDailySummary.objects.filter(
+            date=date, category=category, action=action
+        ).update(count=F("count") - count)
+    LogDailySummary.objects.filter(count=0).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("administration", "0008_cache_version"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_live_logs, remove_live_logs),
+    ]
@@ -11,7 +11,7 @@ User = get_user_model()
 
 
 class CustomPermission(models.Model):
-    permission = models.CharField(max_length=200)
+    permission = models.CharField(max_length=200, unique=True)
     description = models.CharField(max_length=200)
 
     def __str__(self):
@@ -53,6 +53,17 @@ class Role(models.Model):
         ordering = ["name"]
 
 
+class CacheVersion(models.Model):
+    # Versionsnummern für Cache-Einträge und Prozessspeicher. Die Zahl liegt
+    # dauerhaft in der Datenbank, im Cache nur als Kopie, damit sie nach
+    # einem Verfall oder Verdrängen nie auf einen älteren Stand zurückfällt.
+    name = models.CharField(max_length=100, unique=True)
+    version = models.PositiveIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.name}: {self.version}"
+
+
 class Log(models.Model):
     ACTION_CHOICES = (
         ("READ", "Lesen"),
@@ -93,3 +104,28 @@ class Log(models.Model):
 
     class Meta:
         ordering = ["-timestamp"]
+        indexes = [
+            models.Index(
+                fields=["category", "-timestamp", "-id"],
+                name="log_category_timestamp_idx",
+            ),
+        ]
+
+
+class LogDailySummary(models.Model):
+    date = models.DateField()
+    category = models.CharField(max_length=20, choices=Log.CATEGORIES)
+    action = models.CharField(max_length=10)
+    count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.date} | {self.category} | {self.action}: {self.count}"
+
+    class Meta:
+        ordering = ["-date", "category", "action"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "category", "action"],
+                name="log_daily_summary_unique",
+            ),
+        ]
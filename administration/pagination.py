@@ -0,0 +1,81 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+# Seitenweises Blättern über (Sortierfeld, id) statt über OFFSET. Jede Seite
+# setzt direkt hinter dem letzten Eintrag der vorherigen Seite an, dadurch
+# bleibt die Abfrage auch bei Millionen von Zeilen gleich schnell.
+PAGE_SIZE = 50
+MAX_INTEGER = 2**63 - 1
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def next_query(self, params, parameter="cursor"):
+        query = params.copy()
+        query[parameter] = self.next_cursor
+        return query.urlencode()
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def encode_cursor(value, pk):
+    data = json.dumps([value, pk]).encode()
+    return base64.urlsafe_b64encode(data).decode()
+
+
+def decode_cursor(cursor, model_field=None):
+    # Ein manipulierter oder veralteter Cursor gilt als kein Cursor.
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if model_field is not None:
+            value = model_field.to_python(value)
+        pk = int(pk)
+        if value is None or abs(pk) > MAX_INTEGER:
+            return None
+        if isinstance(value, int) and abs(value) > MAX_INTEGER:
+            return None
+        return value, pk
+    except (TypeError, ValueError, OverflowError, ValidationError):
+        return None
+
+
+def paginate_keyset(
+    queryset, cursor=None, field="timestamp", per_page=PAGE_SIZE, descending=True
+):
+    model_field = queryset.model._meta.get_field(field)
+    lookup = "lt" if descending else "gt"
+
+    position = decode_cursor(cursor, model_field) if cursor else None
+    if position is not None:
+        value, pk = position
+        queryset = queryset.filter(
+            Q(**{f"{field}__{lookup}": value})
+            | Q(**{field: value, f"pk__{lookup}": pk})
+        )
+
+    prefix = "-" if descending else ""
+    object_list = list(
+        queryset.order_by(f"{prefix}{field}", f"{prefix}pk")[: per_page + 1]
+    )
+
+    next_cursor = None
+    if len(object_list) > per_page:
+        object_list = object_list[:per_page]
+        last = object_list[-1]
+        next_cursor = encode_cursor(model_field.value_to_string(last), last.pk)
+
+    return KeysetPage(object_list, next_cursor)
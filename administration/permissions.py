@@ -0,0 +1,257 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+from .models import CustomPermission, Role
+from .versions import bump_version, get_version
+
+# Rollen und ihre Rechte ändern sich selten, die Prüfungen laufen aber bei
+# jedem Seitenaufruf mehrfach. Die Rechte einer Rolle werden deshalb pro
+# Version im gemeinsamen Cache abgelegt und zusätzlich pro Request am
+# Benutzerobjekt gemerkt. Signale auf AdvancedUser, Role und der
+# Zwischentabelle halten den Cache auch bei Änderungen im Django-Admin oder
+# in der Shell aktuell; gelöscht bzw. hochgezählt wird erst nach dem Commit.
+PERMISSIONS_CACHE_TIMEOUT = 60 * 60
+NO_ROLE = 0
+
+# Katalog aller Rechte. "manage.py setup_permissions" gleicht ihn mit der
+# Datenbank ab, die Rollenseiten lesen die Rechte gruppiert nach dem ersten
+# Teil des Namens aus der Registry, die jeder Prozess einmal pro Version lädt.
+REGISTRY_VERSION = "permissions:registry"
+PERMISSIONS = [
+    ("system.access", "Darf auf Administration zugreifen"),
+    ("system.communication.signature", "Darf Signatur ändern"),
+    ("system.config.logo", "Darf das Logo verändern"),
+    ("system.config.app", "Darf den Appname verändern"),
+    ("system.logs.access", "Darf Protokolle einsehen"),
+    ("system.roles.create", "Darf Rollen erstellen"),
+    ("system.roles.rename", "Darf Rollen umbenennen"),
+    ("system.roles.perm", "Darf Rollen Rechte zuweisen"),
+    ("system.roles.delete", "Darf Rollen löschen"),
+    ("system.users.access", "Darf die Benutzerliste einsehen"),
+    ("system.users.import", "Darf Benutzer importieren"),
+    ("management.access", "Darf auf Verwaltung zugreifen"),
+    ("management.request.access", "Darf Anfragen zugreifen"),
+    ("management.request.accept", "Darf Anfragen genehmigen"),
+    ("management.request.decline", "Darf Anfragen ablehnen"),
+    ("management.payroll.access", "Darf die Lohnübersicht einsehen"),
+    ("management.absences.access", "Darf den Abwesenheitskalender einsehen"),
+    ("management.vacation.access", "Darf die Urlaubskonten einsehen"),
+    ("management.performance.access", "Darf die Leistungsauswertung einsehen"),
+    ("management.time.access", "Darf die Zeiterfassung einsehen"),
+    ("management.time.manage", "Darf Überstunden korrigieren"),
+    ("disposition.access", "Darf auf Disposition zugreifen"),
+    ("disposition.location.create", "Darf Standorte erstellen"),
+    ("disposition.location.update", "Darf Standorte verändern"),
+    ("disposition.location.delete", "Darf Standorte löschen"),
+    ("disposition.tour.assign", "Darf Touren personen zuweisen"),
+    ("disposition.tour.create", "Darf Touren erstellen"),
+    ("disposition.tour.vehicle", "Darf Fahrzeuge zu den Touren zuordnen"),
+    ("disposition.vehicle.create", "Darf Fahrzeuge erstellen"),
+    ("disposition.vehicle.update", "Darf Fahrzeuge verändern"),
+    ("disposition.vehicle.delete", "Darf Fahrzeuge löschen"),
+    ("communication.announcement.create", "Darf Ankündigungen erstellen"),
+]
+
+_registry = None
+
+
+def _role_version_name(role_id):
+    return f"permissions:role:{role_id}"
+
+
+def _role_permissions_key(role_id, version):
+    return f"permissions:role:{role_id}:v{version}"
+
+
+def _user_role_key(user_id):
+    return f"permissions:user:{user_id}:role"
+
+
+def get_role_version(role_id):
+    return get_version(_role_version_name(role_id))
+
+
+def get_role_id(user):
+    key = _user_role_key(user.pk)
+    role_id = cache.get(key)
+    if role_id is None:
+        from authentication.models import AdvancedUser
+
+        role_id = (
+            AdvancedUser.objects.filter(user_id=user.pk)
+            .values_list("role_id", flat=True)
+            .first()
+        ) or NO_ROLE
+        cache.set(key, role_id, PERMISSIONS_CACHE_TIMEOUT)
+    return role_id
+
+
+def get_role_permissions(role_id):
+    if not role_id:
+        return frozenset()
+
+    key = _role_permissions_key(role_id, get_role_version(role_id))
+    permissions = cache.get(key)
+    if permissions is None:
+        permissions = frozenset(
+            CustomPermission.objects.filter(roles__id=role_id).values_list(
+                "permission", flat=True
+            )
+        )
+        cache.set(key, permissions, PERMISSIONS_CACHE_TIMEOUT)
+    return permissions
+
+
+def get_user_permissions(user):
+    if not user.is_authenticated:
+        return frozenset()
+
+    permissions = getattr(user, "_role_permissions", None)
+    if permissions is None:
+        permissions = get_role_permissions(get_role_id(user))
+        user._role_permissions = permissions
+    return permissions
+
+
+def has_permission(user, permission):
+    return permission in get_user_permissions(user)
+
+
+def _bump_role_version(role_id):
+    version = bump_version(_role_version_name(role_id))
+    cache.delete(_role_permissions_key(role_id, version - 1))
+
+
+def invalidate_role_permissions(role):
+    role_id = role.pk
+    transaction.on_commit(lambda: _bump_role_version(role_id))
+
+
+def invalidate_user_roles(user_ids):
+    keys = [_user_role_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def get_permission_registry():
+    global _registry
+    version = get_version(REGISTRY_VERSION)
+    if _registry is not None and _registry[0] == version:
+        return _registry[1]
+
+    registry = {}
+    for permission in CustomPermission.objects.order_by("permission"):
+        domain = permission.permission.split(".", 1)[0]
+        registry.setdefault(domain, []).append(permission)
+    registry = {domain: tuple(items) for domain, items in registry.items()}
+    _registry = (version, registry)
+    return registry
+
+
+def get_permission_group(domain):
+    return get_permission_registry().get(domain, ())
+
+
+def reset_permission_registry(**kwargs):
+    global _registry
+    _registry = None
+    transaction.on_commit(lambda: bump_version(REGISTRY_VERSION))
+
+
+def sync_permissions(permissions=PERMISSIONS):
+    existing = {
+        permission.permission: permission
+        for permission in CustomPermission.objects.all()
+    }
+
+    created = [
+        CustomPermission(permission=codename, description=description)
+        for codename, description in permissions
+        if codename not in existing
+    ]
+    updated = []
+    for codename, description in permissions:
+        permission = existing.get(codename)
+        if permission is not None and permission.description != description:
+            permission.description = description
+            updated.append(permission)
+
+    # Django 3.2 kennt bei bulk_create noch kein update_conflicts, neue Rechte
+    # und geänderte Beschreibungen werden deshalb getrennt geschrieben.
+    CustomPermission.objects.bulk_create(created, ignore_conflicts=True)
+    CustomPermission.objects.bulk_update(updated, ["description"])
+    reset_permission_registry()
+    return len(created), len(updated)
+
+
+def _advanced_user_changed(sender, instance, **kwargs):
+    invalidate_user_roles([instance.user_id])
+
+
+def _role_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        # Beim Leeren von der Rechteseite aus fehlen in post_clear die Rollen.
+        instance._cleared_role_ids = list(instance.roles.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        invalidate_role_permissions(instance)
+        return
+    if action == "post_clear":
+        role_ids = getattr(instance, "_cleared_role_ids", ())
+    else:
+        role_ids = pk_set or ()
+    for role_id in role_ids:
+        invalidate_role_permissions(Role(pk=role_id))
+
+
+def _permission_pre_delete(sender, instance, **kwargs):
+    # Die Zeilen der Zwischentabelle verschwinden ohne m2m_changed.
+    for role_id in instance.roles.values_list("pk", flat=True):
+        invalidate_role_permissions(Role(pk=role_id))
+
+
+def _role_deleted(sender, instance, **kwargs):
+    invalidate_role_permissions(instance)
+
+
+def connect_signals():
+    from authentication.models import AdvancedUser
+
+    post_save.connect(
+        reset_permission_registry,
+        sender=CustomPermission,
+        dispatch_uid="administration.permissions.registry_save",
+    )
+    post_delete.connect(
+        reset_permission_registry,
+        sender=CustomPermission,
+        dispatch_uid="administration.permissions.registry_delete",
+    )
+    pre_delete.connect(
+        _permission_pre_delete,
+        sender=CustomPermission,
+        dispatch_uid="administration.permissions.permission_pre_delete",
+    )
+    post_save.connect(
+        _advanced_user_changed,
+        sender=AdvancedUser,
+        dispatch_uid="administration.permissions.advanced_user_save",
+    )
+    post_delete.connect(
+        _advanced_user_changed,
+        sender=AdvancedUser,
+        dispatch_uid="administration.permissions.advanced_user_delete",
+    )
+    m2m_changed.connect(
+        _role_permissions_changed,
+        sender=Role.permissions.through,
+        dispatch_uid="administration.permissions.role_permissions",
+    )
+    post_delete.connect(
+        _role_deleted,
+        sender=Role,
+        dispatch_uid="administration.permissions.role_delete",
+    )
@@ -0,0 +1,156 @@
+from django.db import transaction
+from django.db.models import Q
+
+from authentication.directory import refresh_directory
+from authentication.models import AdvancedUser
+
+from .audit import write_log
+from .models import CustomPermission, Role
+from .permissions import invalidate_role_permissions, invalidate_user_roles
+
+# Mitgliedschaften und Rechte einer Rolle werden als Mengendifferenz
+# berechnet und gesammelt geschrieben: Mitglieder mit je einem UPDATE für neue
+# und entfernte Benutzer, Rechte mit einem bulk_create und einem DELETE auf
+# der Zwischentabelle. Entfernte Benutzer fallen auf die Standardrolle zurück.
+STANDARD_ROLE = "Standard"
+RolePermission = Role.permissions.through
+
+
+def get_standard_role():
+    return Role.objects.filter(name=STANDARD_ROLE).first()
+
+
+def assign_role_users(role, user_ids, user=None, fallback_role=None):
+    selected_user_ids = set(user_ids)
+    if fallback_role is None:
+        fallback_role = get_standard_role()
+
+    with transaction.atomic():
+        # Aktuelle Mitglieder und die vorhandenen ausgewählten Benutzer in
+        # einer Abfrage, unbekannte IDs fallen dabei heraus.
+        rows = (
+            AdvancedUser.objects.select_for_update()
+            .filter(Q(role=role) | Q(user_id__in=selected_user_ids))
+            .values_list("user_id", "role_id")
+        )
+        current_user_ids = set()
+        existing_user_ids = set()
+        for user_id, role_id in rows:
+            existing_user_ids.add(user_id)
+            if role_id == role.pk:
+                current_user_ids.add(user_id)
+        selected_user_ids &= existing_user_ids
+        added_user_ids = selected_user_ids - current_user_ids
+        removed_user_ids = current_user_ids - selected_user_ids
+
+        if added_user_ids:
+            AdvancedUser.objects.filter(user_id__in=added_user_ids).update(role=role)
+        if removed_user_ids:
+            AdvancedUser.objects.filter(user_id__in=removed_user_ids).update(
+                role=fallback_role
+            )
+
+    changed_user_ids = added_user_ids | removed_user_ids
+    if not changed_user_ids:
+        return added_user_ids, removed_user_ids
+
+    # Die UPDATEs lösen keine Signale aus, Rechte-Cache und Verzeichnis
+    # werden deshalb hier nachgezogen.
+    invalidate_user_roles(changed_user_ids)
+    refresh_directory(changed_user_ids)
+
+    if user is not None:
+        write_log(
+            user=user,
+            action="UPDATE",
+            category="ADMINISTRATION",
+            content_object=role,
+            message=(
+                f"@{user} fügte {len(added_user_ids)} Benutzer zu '{role.name}' "
+                f"hinzu und entfernte {len(removed_user_ids)}."
+            ),
+        )
+
+    return added_user_ids, removed_user_ids
+
+
+def _set_permissions(role, permission_ids):
+    current_ids = set(
+        RolePermission.objects.filter(role=role).values_list(
+            "custompermission_id", flat=True
+        )
+    )
+    added_ids = permission_ids - current_ids
+    removed_ids = current_ids - permission_ids
+
+    if added_ids:
+        RolePermission.objects.bulk_create(
+            [
+                RolePermission(role_id=role.pk, custompermission_id=permission_id)
+                for permission_id in added_ids
+            ]
+        )
+    if removed_ids:
+        RolePermission.objects.filter(
+            role=role, custompermission_id__in=removed_ids
+        ).delete()
+    return added_ids, removed_ids
+
+
+def set_role_permissions(role, permission_ids, user=None):
+    with transaction.atomic():
+        # Unbekannte IDs werden mit einer Abfrage aussortiert.
+        permission_ids = set(
+            CustomPermission.objects.filter(pk__in=set(permission_ids)).values_list(
+                "pk", flat=True
+            )
+        )
+        added_ids, removed_ids = _set_permissions(role, permission_ids)
+
+    if not added_ids and not removed_ids:
+        return added_ids, removed_ids
+
+    invalidate_role_permissions(role)
+    if user is not None:
+        write_log(
+            user=user,
+            action="UPDATE",
+            category="ADMINISTRATION",
+            content_object=role,
+            message=f"{user} hat bei '{role.name}' die Rechte angepasst.",
+        )
+
+    return added_ids, removed_ids
+
+
+def copy_role_permissions(source, targets, user=None):
+    permission_ids = set(
+        RolePermission.objects.filter(role=source).values_list(
+            "custompermission_id", flat=True
+        )
+    )
+
+    changed = []
+    with transaction.atomic():
+        for target in targets:
+            if target.pk == source.pk:
+                continue
+            added_ids, removed_ids = _set_permissions(target, permission_ids)
+            if added_ids or removed_ids:
+                changed.append(target)
+
+    for target in changed:
+        invalidate_role_permissions(target)
+        if user is not None:
+            write_log(
+                user=user,
+                action="UPDATE",
+                category="ADMINISTRATION",
+                content_object=target,
+                message=(
+                    f"{user} hat die Rechte von '{source.name}' auf "
+                    f"'{target.name}' übertragen."
+                ),
+            )
+
+    return changed
@@ -0,0 +1,23 @@
+# Hilfen für gestreamte Exporte (CSV, JSON, iCalendar). Die Zeilen werden
+# einzeln erzeugt und zu größeren Blöcken zusammengefasst, damit nicht jede
+# Zeile einzeln an den Client geschickt wird.
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+class Echo:
+    # Dateiersatz für csv.writer: writerow() gibt die Zeile direkt zurück.
+    def write(self, value):
+        return value
+
+
+def buffered(lines, buffer_size=STREAM_BUFFER_SIZE):
+    buffer, size = [], 0
+    for line in lines:
+        data = line.encode("utf-8")
+        buffer.append(data)
+        size += len(data)
+        if size >= buffer_size:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
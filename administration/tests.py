@@ -1,3 +1,780 @@
-from django.test import TestCase
+import base64
+import csv
+import datetime
+import gzip
+import io
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from authentication.models import (
+    AdvancedUser,
+    DirectoryEntry,
+    Health,
+    Meta,
+    UserCustomInterface,
+)
+
+from . import permissions
+from .archive import archive_logs, get_log_activity
+from .audit import LogBuffer, write_log
+from .logs import export_logs, filter_logs
+from .models import CustomPermission, Log, LogDailySummary, Role
+from .pagination import encode_cursor, paginate_keyset
+from .roles import (
+    assign_role_users,
+    copy_role_permissions,
+    get_standard_role,
+    set_role_permissions,
+)
+from .permissions import (
+    PERMISSIONS,
+    get_permission_group,
+    get_permission_registry,
+    get_role_permissions,
+    has_permission,
+    sync_permissions,
+)
+from .admin import LogAdmin
+from .streaming import buffered
+from .versions import bump_version, get_version
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CacheVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_version_survives_expired_cache_key(self):
+        self.assertEqual(get_version("test"), 1)
+        self.assertEqual(bump_version("test"), 2)
+        self.assertEqual(bump_version("test"), 3)
+        cache.delete("version:test")
+        self.assertEqual(get_version("test"), 3)
+
+    def test_version_survives_cleared_cache(self):
+        bump_version("test")
+        cache.clear()
+        self.assertEqual(get_version("test"), 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RolePermissionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.role = Role.objects.create(name="Test")
+        self.permission = CustomPermission.objects.create(
+            permission="test.access", description="Test"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.permissions.add(self.permission)
+
+    def user_with_role(self, role):
+        user = get_user_model().objects.create_user("rolle")
+        with self.captureOnCommitCallbacks(execute=True):
+            AdvancedUser.objects.create(user=user, role=role)
+        return get_user_model().objects.get(pk=user.pk)
+
+    def test_revoked_permission_stays_revoked_after_version_expiry(self):
+        self.assertIn("test.access", get_role_permissions(self.role.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.permissions.remove(self.permission)
+        self.assertNotIn("test.access", get_role_permissions(self.role.pk))
+
+        # Verfallener Versionsschlüssel wie nach dem Ablauf im Dateicache.
+        cache.delete(f"version:permissions:role:{self.role.pk}")
+        self.assertNotIn("test.access", get_role_permissions(self.role.pk))
+
+    def test_clearing_from_permission_side_invalidates_roles(self):
+        self.assertIn("test.access", get_role_permissions(self.role.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.permission.roles.clear()
+        self.assertNotIn("test.access", get_role_permissions(self.role.pk))
+
+    def test_deleted_permission_not_granted(self):
+        self.assertIn("test.access", get_role_permissions(self.role.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.permission.delete()
+        self.assertEqual(get_role_permissions(self.role.pk), frozenset())
+
+    def test_changed_user_role_applies(self):
+        user = self.user_with_role(None)
+        self.assertFalse(has_permission(user, "test.access"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            advanced = AdvancedUser.objects.get(user=user)
+            advanced.role = self.role
+            advanced.save()
+        user = get_user_model().objects.get(pk=user.pk)
+        self.assertTrue(has_permission(user, "test.access"))
+
+    def test_deleted_role_grants_nothing(self):
+        user = self.user_with_role(self.role)
+        self.assertTrue(has_permission(user, "test.access"))
+        role_id = self.role.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.delete()
+        self.assertEqual(get_role_permissions(role_id), frozenset())
+        user = get_user_model().objects.get(pk=user.pk)
+        self.assertFalse(has_permission(user, "test.access"))
+
+    def test_registry_reloaded_in_other_processes(self):
+        self.assertNotIn("neu.access", self.codenames())
+        # Stand eines anderen Prozesses vor dem neuen Recht.
+        stale = permissions._registry
+        with self.captureOnCommitCallbacks(execute=True):
+            CustomPermission.objects.create(permission="neu.access", description="")
+        permissions._registry = stale
+        self.assertIn("neu.access", self.codenames())
+
+    def codenames(self):
+        return {
+            permission.permission
+            for group in get_permission_registry().values()
+            for permission in group
+        }
+
+
+class LogBufferTests(TransactionTestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("anna")
+
+    def entry(self, user_id, message):
+        return Log(user_id=user_id, action="READ", category="SYSTEM", message=message)
+
+    def test_failing_entry_does_not_block_the_buffer(self):
+        buffer = LogBuffer(batch_size=10, flush_interval=60)
+        buffer._stopped = True
+        buffer.add(self.entry(self.user.pk, "vorher"))
+        # Benutzer vor dem Schreiben gelöscht.
+        buffer.add(self.entry(self.user.pk + 1000, "verwaist"))
+        buffer.add(self.entry(self.user.pk, "nachher"))
+
+        with self.assertLogs("administration.audit", "ERROR"):
+            self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(buffer._entries, [])
+        self.assertEqual(
+            set(Log.objects.values_list("message", flat=True)), {"vorher", "nachher"}
+        )
+
+        buffer.add(self.entry(self.user.pk, "später"))
+        self.assertEqual(buffer.flush(), 1)
+        # Verworfene Einträge zählen auch in der Tagesübersicht nicht mit.
+        self.assertEqual(
+            list(LogDailySummary.objects.values_list("action", "count")),
+            [("READ", 3)],
+        )
+
+    @override_settings(AUDIT_LOG_SYNCHRONOUS=True)
+    def test_synchronous_setting_writes_immediately(self):
+        write_log(self.user, "READ", "SYSTEM", message="sofort")
+        self.assertTrue(Log.objects.filter(message="sofort").exists())
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("anna")
+        Log.objects.bulk_create(
+            [
+                Log(user=user, action="READ", category="SYSTEM", object_id=number)
+                for number in range(5)
+            ]
+        )
+
+    def raw_cursor(self, value, pk=1):
+        return base64.urlsafe_b64encode(json.dumps([value, pk]).encode()).decode()
+
+    def test_next_page_continues_after_cursor(self):
+        first = paginate_keyset(Log.objects.all(), field="object_id", per_page=2)
+        second = paginate_keyset(
+            Log.objects.all(), first.next_cursor, field="object_id", per_page=2
+        )
+        self.assertEqual([log.object_id for log in first], [4, 3])
+        self.assertEqual([log.object_id for log in second], [2, 1])
+
+    def test_bad_cursor_is_treated_as_no_cursor(self):
+        cursors = [
+            "garbage",
+            self.raw_cursor("garbage"),
+            self.raw_cursor(None),
+            self.raw_cursor(2**80),
+            self.raw_cursor(1, 2**80),
+            self.raw_cursor(1, "x"),
+            base64.urlsafe_b64encode(b"[Infinity, Infinity]").decode(),
+            base64.urlsafe_b64encode(b"5").decode(),
+        ]
+        for cursor in cursors:
+            for field in ("object_id", "timestamp"):
+                with self.subTest(cursor=cursor, field=field):
+                    page = paginate_keyset(
+                        Log.objects.all(), cursor, field=field, per_page=10
+                    )
+                    self.assertEqual(len(page), 5)
+
+    def test_cursor_roundtrip(self):
+        cursor = encode_cursor("3", Log.objects.get(object_id=3).pk)
+        page = paginate_keyset(Log.objects.all(), cursor, field="object_id")
+        self.assertEqual([log.object_id for log in page], [2, 1, 0])
+
+
+@override_settings(AUDIT_LOG_SYNCHRONOUS=True)
+class LogActivityTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("anna")
+
+    def test_written_logs_are_counted_per_day(self):
+        today = timezone.localdate()
+        yesterday = today - datetime.timedelta(days=1)
+        write_log(self.user, "READ", "SYSTEM")
+        write_log(self.user, "READ", "SYSTEM")
+        write_log(self.user, "CREATE", "MANAGEMENT")
+        LogDailySummary.objects.create(
+            date=yesterday, category="SYSTEM", action="READ", count=4
+        )
+
+        activity = get_log_activity(days=2)
+
+        self.assertEqual([day["date"] for day in activity], [today, yesterday])
+        self.assertEqual(activity[0]["total"], 3)
+        self.assertEqual(activity[0]["categories"], [("System", 2), ("Verwaltung", 1)])
+        self.assertEqual(activity[1]["total"], 4)
+
+    def test_dashboard_does_not_read_the_log_table(self):
+        write_log(self.user, "READ", "SYSTEM")
+        with CaptureQueriesContext(connection) as queries:
+            get_log_activity()
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"administration_log"', queries[0]["sql"])
+
+    def test_archiving_keeps_counts(self):
+        write_log(self.user, "READ", "SYSTEM")
+        with TemporaryDirectory() as directory, self.settings(
+            LOG_ARCHIVE_DIR=Path(directory)
+        ):
+            self.assertEqual(archive_logs(timezone.now() + datetime.timedelta(1)), 1)
+        self.assertFalse(Log.objects.exists())
+        self.assertEqual(get_log_activity(days=1)[0]["total"], 1)
+
+
+class StreamingTests(TestCase):
+    def test_buffered_joins_lines_into_blocks(self):
+        lines = ["ä" * 5 + "\n" for _ in range(10)]
+        chunks = list(buffered(lines, buffer_size=30))
+        self.assertEqual(b"".join(chunks).decode("utf-8"), "".join(lines))
+        self.assertEqual([len(chunk) for chunk in chunks], [33, 33, 33, 11])
+
+    def test_buffered_empty(self):
+        self.assertEqual(list(buffered([])), [])
+
+
+def grant_system(user, *permissions):
+    sync_permissions()
+    role = Role.objects.create(name="System")
+    role.permissions.set(CustomPermission.objects.filter(permission__in=permissions))
+    AdvancedUser.objects.update_or_create(
+        user=user,
+        defaults={"role": role, "privacy": True, "terms": True, "copyright": True},
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class LogExportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("anna", password="pw")
+        other = get_user_model().objects.create_user("bert")
+        day = timezone.make_aware(datetime.datetime(2025, 3, 3, 12))
+        Log.objects.bulk_create(
+            [
+                Log(user=self.user, action="READ", category="SYSTEM", timestamp=day),
+                Log(
+                    user=other,
+                    action="CREATE",
+                    category="SYSTEM",
+                    timestamp=day + datetime.timedelta(days=1),
+                    message='Zeile mit "Anführungszeichen",\nund Umbruch',
+                ),
+                Log(
+                    user=self.user,
+                    action="DELETE",
+                    category="MANAGEMENT",
+                    timestamp=day + datetime.timedelta(days=2),
+                ),
+            ]
+        )
+
+    def read(self, chunks, compress=False):
+        data = b"".join(chunks)
+        if compress:
+            data = gzip.decompress(data)
+        return data.decode("utf-8")
+
+    def test_csv_in_chronological_order(self):
+        text = self.read(export_logs(Log.objects.all(), "csv"))
+        rows = list(csv.reader(io.StringIO(text)))
+        self.assertEqual(rows[0][:4], ["id", "timestamp", "username", "action"])
+        self.assertEqual([row[3] for row in rows[1:]], ["READ", "CREATE", "DELETE"])
+        self.assertEqual(rows[2][7], 'Zeile mit "Anführungszeichen",\nund Umbruch')
+
+    def test_gzipped_jsonl(self):
+        chunks = export_logs(Log.objects.all(), "jsonl", compress=True)
+        records = [json.loads(line) for line in self.read(chunks, True).splitlines()]
+        self.assertEqual(
+            [record["username"] for record in records], ["anna", "bert", "anna"]
+        )
+        self.assertEqual(records[0]["timestamp"], "2025-03-03T12:00:00+00:00")
+
+    def test_empty_export(self):
+        empty = Log.objects.none()
+        self.assertEqual(self.read(export_logs(empty, "csv")).count("\n"), 1)
+        self.assertEqual(self.read(export_logs(empty, "jsonl")), "")
+        self.assertEqual(
+            self.read(export_logs(empty, "jsonl", compress=True), True), ""
+        )
+
+    def test_rows_read_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.read(export_logs(Log.objects.all(), "jsonl"))
+        self.assertEqual(len(queries), 1)
+
+    def test_filters(self):
+        params = {"user": "anna", "date_from": "2025-03-04", "date_to": "2025-03-05"}
+        self.assertEqual(
+            list(
+                filter_logs(Log.objects.all(), params).values_list("action", flat=True)
+            ),
+            ["DELETE"],
+        )
+        # Ungültige oder fehlende Datumsangaben schränken nicht ein.
+        params = {"date_from": "gestern", "date_to": "", "action": ""}
+        self.assertEqual(filter_logs(Log.objects.all(), params).count(), 3)
+
+    def test_view_requires_logs_access(self):
+        url = reverse("logs_export")
+        grant_system(self.user, "system.access")
+        self.client.login(username="anna", password="pw")
+        response = self.client.get(url)
+        self.assertRedirects(response, reverse("denied"), fetch_redirect_response=False)
+
+    def test_view_streams_filtered_export(self):
+        grant_system(self.user, "system.access", "system.logs.access")
+        self.client.login(username="anna", password="pw")
+
+        response = self.client.get(
+            reverse("logs_export"), {"category": "SYSTEM", "format": "unbekannt"}
+        )
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn(".csv", response["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(self.read(response.streaming_content))))
+        self.assertEqual([row[3] for row in rows[1:]], ["READ", "CREATE"])
+
+        response = self.client.get(
+            reverse("logs_export"), {"format": "jsonl", "gzip": "1"}
+        )
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn(".jsonl.gz", response["Content-Disposition"])
+        self.assertEqual(
+            len(self.read(response.streaming_content, True).splitlines()), 3
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES, AUDIT_LOG_SYNCHRONOUS=True)
+class LogRelatedObjectTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_superuser("anna", password="pw")
+        Meta.objects.create(user=self.user, sex="Divers")
+        Health.objects.create(user=self.user)
+        UserCustomInterface.objects.create(user=self.user)
+        self.client.login(username="anna", password="pw")
+
+    def add_logs(self, count):
+        for number in range(count):
+            role = Role.objects.create(name=f"Rolle {Role.objects.count()}")
+            permission = CustomPermission.objects.create(
+                permission=f"test.{role.pk}", description="Test"
+            )
+            user = get_user_model().objects.create_user(f"benutzer{role.pk}")
+            for content_object in (role, permission, user):
+                write_log(user, "CREATE", "SYSTEM", content_object=content_object)
+
+    def count_queries(self, url):
+        # Erster Aufruf füllt die Caches (Berechtigungen, Einstellungen).
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_admin_changelist_query_count_independent_of_rows(self):
+        url = reverse("admin:administration_log_changelist")
+        self.add_logs(2)
+        few = self.count_queries(url)
+        self.add_logs(5)
+        self.assertEqual(self.count_queries(url), few)
+
+    def test_admin_queryset_resolves_content_objects_in_bulk(self):
+        self.add_logs(3)
+        Role.objects.get(pk=Log.objects.filter(model_name="role")[0].object_id).delete()
+        request = RequestFactory().get("/")
+        request.user = self.user
+        queryset = LogAdmin(Log, admin.site).get_queryset(request)
+
+        # Logs mit Benutzer + ein Abruf je Inhaltstyp (Rolle, Berechtigung, Benutzer).
+        with self.assertNumQueries(4):
+            logs = list(queryset)
+            text = [str(log) for log in logs]
+        self.assertEqual(len(text), 9)
+        self.assertEqual(sum(log.content_object is None for log in logs), 1)
+
+    def test_log_page_query_count_independent_of_rows(self):
+        AdvancedUser.objects.update_or_create(
+            user=self.user,
+            defaults={"privacy": True, "terms": True, "copyright": True},
+        )
+        grant_system(self.user, "system.access", "system.logs.access")
+        url = reverse("logs")
+        self.add_logs(2)
+        few = self.count_queries(url)
+        self.add_logs(5)
+        self.assertEqual(self.count_queries(url), few)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, AUDIT_LOG_SYNCHRONOUS=True)
+class RoleUsersTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.standard = get_standard_role()
+        self.role = Role.objects.create(name="Lager")
+        permission = CustomPermission.objects.create(
+            permission="lager.access", description="Lager"
+        )
+        self.role.permissions.add(permission)
+        self.admin = get_user_model().objects.create_user("admin", password="pw")
+
+    def create_users(self, count, role=None):
+        users = []
+        for number in range(count):
+            user = get_user_model().objects.create_user(
+                f"benutzer{get_user_model().objects.count()}"
+            )
+            AdvancedUser.objects.create(user=user, role=role or self.standard)
+            users.append(user)
+        return users
+
+    def assign(self, users, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return assign_role_users(self.role, [user.pk for user in users], **kwargs)
+
+    def roles(self, users):
+        return list(
+            AdvancedUser.objects.filter(user__in=users)
+            .order_by("user_id")
+            .values_list("role__name", flat=True)
+        )
+
+    def test_applies_set_difference(self):
+        kept, removed = self.create_users(2, role=self.role)
+        added = self.create_users(1)
+
+        result = self.assign([kept, *added])
+
+        self.assertEqual(result, ({added[0].pk}, {removed.pk}))
+        self.assertEqual(
+            self.roles([kept, removed, added[0]]), ["Lager", "Standard", "Lager"]
+        )
+        self.assertTrue(has_permission(added[0], "lager.access"))
+        self.assertFalse(has_permission(removed, "lager.access"))
+        self.assertEqual(
+            DirectoryEntry.objects.get(user=added[0]).role_id, self.role.pk
+        )
+        self.assertEqual(
+            DirectoryEntry.objects.get(user=removed).role_id, self.standard.pk
+        )
+
+    def test_unchanged_selection_writes_nothing(self):
+        members = self.create_users(3, role=self.role)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.assign(members, user=self.admin), (set(), set()))
+        self.assertFalse(
+            [
+                q
+                for q in queries
+                if not q["sql"].startswith(("SELECT", "SAVEPOINT", "RELEASE"))
+            ]
+        )
+        self.assertFalse(Log.objects.exists())
+
+    def test_unknown_and_empty_selection(self):
+        members = self.create_users(2, role=self.role)
+        without_profile = get_user_model().objects.create_user("ohneprofil")
+        added, removed = assign_role_users(
+            self.role, [without_profile.pk, 10**9], user=self.admin
+        )
+        self.assertEqual((added, removed), (set(), {user.pk for user in members}))
+        self.assertEqual(
+            Log.objects.get().message,
+            "@admin fügte 0 Benutzer zu 'Lager' hinzu und entfernte 2.",
+        )
+
+    def test_query_count_independent_of_selection_size(self):
+        def count_queries(count):
+            users = self.create_users(count)
+            with CaptureQueriesContext(connection) as queries:
+                self.assign(users)
+            self.assign([])
+            return len(queries)
+
+        self.assertEqual(count_queries(40), count_queries(3))
+
+    def test_view_ignores_invalid_ids(self):
+        grant_system(self.admin, "system.access")
+        member = self.create_users(1)[0]
+        self.client.login(username="admin", password="pw")
+
+        response = self.client.post(
+            reverse("role_users", kwargs={"name": "Lager"}),
+            {"selected_users": [member.pk, "x", "-1", ""]},
+        )
+        self.assertRedirects(
+            response,
+            reverse("role", kwargs={"name": "Lager"}),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(self.roles([member]), ["Lager"])
+
+
+@override_settings(CACHES=LOCMEM_CACHES, AUDIT_LOG_SYNCHRONOUS=True)
+class RolePermissionsSetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.role = Role.objects.create(name="Lager")
+        self.other = Role.objects.create(name="Einkauf")
+        self.permissions = [
+            CustomPermission.objects.create(permission=f"lager.{number}")
+            for number in range(4)
+        ]
+        self.member = get_user_model().objects.create_user("anna", password="pw")
+        AdvancedUser.objects.create(user=self.member, role=self.role)
+
+    def ids(self, *indexes):
+        return {self.permissions[index].pk for index in indexes}
+
+    def fresh_member(self):
+        # Die Rechte werden pro Request am Benutzerobjekt gemerkt.
+        return get_user_model().objects.get(pk=self.member.pk)
+
+    def granted(self, role):
+        return set(role.permissions.values_list("pk", flat=True))
+
+    def set_permissions(self, role, permission_ids, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return set_role_permissions(role, permission_ids, **kwargs)
+
+    def test_applies_set_difference(self):
+        self.set_permissions(self.role, self.ids(0, 1))
+        self.assertTrue(has_permission(self.fresh_member(), "lager.0"))
+
+        result = self.set_permissions(self.role, self.ids(1, 2))
+
+        self.assertEqual(result, (self.ids(2), self.ids(0)))
+        self.assertEqual(self.granted(self.role), self.ids(1, 2))
+        member = self.fresh_member()
+        self.assertFalse(has_permission(member, "lager.0"))
+        self.assertTrue(has_permission(member, "lager.2"))
+
+    def test_unknown_ids_dropped(self):
+        added, removed = self.set_permissions(self.role, {10**9, *self.ids(3)})
+        self.assertEqual((added, removed), (self.ids(3), set()))
+        self.assertEqual(self.set_permissions(self.role, set()), (set(), self.ids(3)))
+        self.assertEqual(self.granted(self.role), set())
+
+    def test_unchanged_permissions_write_nothing(self):
+        self.set_permissions(self.role, self.ids(0, 1))
+        admin = get_user_model().objects.create_user("admin")
+        version = get_version(f"permissions:role:{self.role.pk}")
+        with CaptureQueriesContext(connection) as queries:
+            self.set_permissions(self.role, self.ids(0, 1), user=admin)
+        self.assertEqual(
+            [q["sql"].split()[0] for q in queries if "SAVEPOINT" not in q["sql"]],
+            ["SELECT", "SELECT"],
+        )
+        self.assertEqual(get_version(f"permissions:role:{self.role.pk}"), version)
+        self.assertFalse(Log.objects.exists())
+
+    def test_query_count_independent_of_permission_count(self):
+        many = [
+            CustomPermission.objects.create(permission=f"viel.{number}")
+            for number in range(30)
+        ]
+
+        # Legt den Versionseintrag der Rolle an.
+        self.set_permissions(self.role, self.ids(3))
+
+        def count_queries(permission_ids):
+            self.set_permissions(self.role, set())
+            with CaptureQueriesContext(connection) as queries:
+                self.set_permissions(self.role, permission_ids)
+            return len(queries)
+
+        few = count_queries(self.ids(0, 1))
+        self.assertEqual(count_queries({permission.pk for permission in many}), few)
+
+    def test_copy_permissions(self):
+        self.set_permissions(self.role, self.ids(0, 1))
+        self.set_permissions(self.other, self.ids(3))
+        unchanged = Role.objects.create(name="Versand")
+        self.set_permissions(unchanged, self.ids(0, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            changed = copy_role_permissions(
+                self.role, [self.role, self.other, unchanged]
+            )
+
+        self.assertEqual(changed, [self.other])
+        self.assertEqual(self.granted(self.other), self.ids(0, 1))
+        self.assertEqual(self.granted(self.role), self.ids(0, 1))
+
+    def test_copy_command(self):
+        self.set_permissions(self.role, self.ids(2))
+        out = io.StringIO()
+        call_command("copy_role_permissions", "Lager", "Einkauf", stdout=out)
+        self.assertIn("1 changed roles", out.getvalue())
+        self.assertEqual(self.granted(self.other), self.ids(2))
+
+        with self.assertRaisesMessage(CommandError, "Unknown roles: Fehlt"):
+            call_command("copy_role_permissions", "Lager", "Fehlt")
+
+    def test_view_ignores_invalid_ids(self):
+        admin = get_user_model().objects.create_user("admin", password="pw")
+        grant_system(admin, "system.access", "system.roles.perm")
+        self.client.login(username="admin", password="pw")
+
+        response = self.client.post(
+            reverse("role_permission", kwargs={"name": "Lager"}),
+            {"selected_permissions": [self.permissions[0].pk, "x", "", "-3"]},
+        )
+        self.assertRedirects(
+            response,
+            reverse("role_manage", kwargs={"name": "Lager"}),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(self.granted(self.role), self.ids(0))
+
+    def test_view_requires_permission_right(self):
+        admin = get_user_model().objects.create_user("admin", password="pw")
+        grant_system(admin, "system.access")
+        self.client.login(username="admin", password="pw")
+        response = self.client.post(
+            reverse("role_permission", kwargs={"name": "Lager"}),
+            {"selected_permissions": [self.permissions[0].pk]},
+        )
+        self.assertRedirects(response, reverse("denied"), fetch_redirect_response=False)
+        self.assertEqual(self.granted(self.role), set())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PermissionCatalogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        permissions.reset_permission_registry()
+
+    def statements(self, queries):
+        return [q["sql"].split()[0] for q in queries if "SAVEPOINT" not in q["sql"]]
+
+    def test_sync_without_changes_only_reads(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(sync_permissions(), (0, 0))
+        self.assertEqual(self.statements(queries), ["SELECT"])
+
+        out = io.StringIO()
+        call_command("setup_permissions", stdout=out)
+        self.assertIn("0 permissions created, 0 updated.", out.getvalue())
+
+    def test_sync_writes_changes_in_bulk(self):
+        catalog = [
+            (codename, f"Neu: {description}") for codename, description in PERMISSIONS
+        ]
+        catalog += [(f"test.{number}", "Test") for number in range(20)]
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(sync_permissions(catalog), (20, len(PERMISSIONS)))
+        self.assertEqual(self.statements(queries), ["SELECT", "INSERT", "UPDATE"])
+        self.assertEqual(
+            CustomPermission.objects.get(permission="system.access").description,
+            "Neu: Darf auf Administration zugreifen",
+        )
+        self.assertEqual(sync_permissions(catalog), (0, 0))
+
+    def test_codename_unique(self):
+        with self.assertRaises(IntegrityError):
+            CustomPermission.objects.create(permission="system.access")
+
+    def test_registry_grouped_and_cached(self):
+        registry = get_permission_registry()
+        system = [permission.permission for permission in registry["system"]]
+        self.assertEqual(system, sorted(system))
+        self.assertIn("system.access", system)
+        self.assertEqual(
+            sum(len(group) for group in registry.values()), len(PERMISSIONS)
+        )
+        self.assertEqual(get_permission_group("unbekannt"), ())
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_permission_registry(), registry)
+
+    def test_registry_follows_saved_permissions(self):
+        get_permission_registry()
+        with self.captureOnCommitCallbacks(execute=True):
+            permission = CustomPermission.objects.create(permission="lager.access")
+        self.assertEqual(get_permission_group("lager"), (permission,))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            permission.delete()
+        self.assertEqual(get_permission_group("lager"), ())
+
+    def test_role_page_query_count_independent_of_permissions(self):
+        user = get_user_model().objects.create_user("anna", password="pw")
+        Meta.objects.create(user=user, sex="Divers")
+        Health.objects.create(user=user)
+        UserCustomInterface.objects.create(user=user)
+        grant_system(user, "system.access", "system.roles.perm")
+        self.client.login(username="anna", password="pw")
+        role = Role.objects.get(name="System")
+        url = reverse("role_manage", kwargs={"name": "System"})
+
+        def count_queries():
+            self.client.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        few = count_queries()
+        with self.captureOnCommitCallbacks(execute=True):
+            sync_permissions([(f"system.test{number}", "Test") for number in range(20)])
+            role.permissions.add(
+                *CustomPermission.objects.filter(permission__startswith="system.test")
+            )
+        self.assertEqual(count_queries(), few)
+        response = self.client.get(url)
+        self.assertIn("system.test19", response.context["role_permissions"])
+        self.assertEqual(
+            len(response.context["permissions_system"]),
+            len(get_permission_group("system")),
+        )
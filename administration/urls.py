@@ -7,6 +7,7 @@ from .views import (
     LogsCloudView,
     LogsCommunicationView,
     LogsDispositionView,
+    LogsExportView,
     LogsManagementView,
     LogsView,
     RoleCreateView,
@@ -20,6 +21,7 @@ from .views import (
     SignatureView,
     SystemView,
     UpdateSignatureView,
+    UsersImportView,
     UsersView,
 )
 
@@ -50,7 +52,9 @@ urlpatterns = [
         name="role_permission",
     ),
     path("users/", UsersView.as_view(), name="users"),
+    path("users/import", UsersImportView.as_view(), name="users_import"),
     path("logs/", LogsView.as_view(), name="logs"),
+    path("logs/export", LogsExportView.as_view(), name="logs_export"),
     path(
         "logs/administration",
         LogsAdministrationView.as_view(),
@@ -0,0 +1,45 @@
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import CacheVersion
+
+# Gemeinsame Versionszähler für versionierte Cache-Schlüssel. Gelesen wird
+# aus dem Cache, fehlt der Eintrag (abgelaufen oder verdrängt), aus der
+# Datenbank. Hochgezählt wird immer in der Datenbank, die neue Zahl wird
+# danach ohne Ablaufzeit in den Cache geschrieben.
+
+
+def _version_key(name):
+    return f"version:{name}"
+
+
+def _load_version(name):
+    return (
+        CacheVersion.objects.filter(name=name).values_list("version", flat=True).first()
+    ) or 1
+
+
+def get_version(name):
+    key = _version_key(name)
+    version = cache.get(key)
+    if version is None:
+        version = _load_version(name)
+        # add statt set: eine gleichzeitig hochgezählte Version wird nicht
+        # mit dem eben gelesenen älteren Stand überschrieben.
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(name):
+    updated = CacheVersion.objects.filter(name=name).update(version=F("version") + 1)
+    if not updated:
+        try:
+            with transaction.atomic():
+                CacheVersion.objects.create(name=name, version=2)
+        except IntegrityError:
+            CacheVersion.objects.filter(name=name).update(version=F("version") + 1)
+    version = _load_version(name)
+    cache.set(_version_key(name), version, timeout=None)
+    return version
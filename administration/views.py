@@ -1,17 +1,36 @@
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Case, CharField, F, Q, Value, When
-from django.db.models.functions import Lower
-from django.http import HttpResponse, HttpResponseRedirect
+from django.http import HttpResponse, HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
+from django.utils import timezone
 from django.views import generic
 
-from authentication.models import AdvancedUser, OfficeSync
-from communication.models import Announcement, Message, Signature
-
-from .models import CustomPermission, Log, Role
+from authentication.directory import paginate_directory, search_directory
+from authentication.models import OfficeSync
+from authentication.onboarding import get_import_format, import_employees
+from authentication.singletons import get_officesync, get_signature
+from communication.models import Message, Signature
+
+from .archive import get_log_activity
+from .audit import write_log
+from .logs import (
+    LOG_ACTIONS,
+    LOG_EXPORT_FORMATS,
+    export_logs,
+    filter_logs,
+    get_log_filters,
+    paginate_logs,
+)
+from .models import Log, Role
+from .permissions import (
+    get_permission_group,
+    get_role_permissions,
+    has_permission,
+    invalidate_user_roles,
+)
+from .roles import assign_role_users, set_role_permissions
 
 User = get_user_model()
 
@@ -21,25 +40,20 @@ class SystemView(LoginRequiredMixin, generic.ListView):
     template_name = "pages/system.html"
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_logo_config_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.config.logo"
-        ).exists()
+        return has_permission(user, "system.config.logo")
 
     def has_app_config_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.config.app"
-        ).exists()
+        return has_permission(user, "system.config.app")
+
+    def has_logs_access(self, user):
+        return has_permission(user, "system.logs.access")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         if self.request.user.is_authenticated:
             context["has_logo_config_permission"] = self.has_logo_config_permission(
                 self.request.user
@@ -47,18 +61,10 @@ class SystemView(LoginRequiredMixin, generic.ListView):
             context["has_app_config_permission"] = self.has_app_config_permission(
                 self.request.user
             )
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            if self.has_logs_access(self.request.user):
+                context["log_activity"] = get_log_activity()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -67,15 +73,6 @@ class SystemView(LoginRequiredMixin, generic.ListView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -91,7 +88,7 @@ class AppNameUpdateView(LoginRequiredMixin, generic.UpdateView):
         return reverse_lazy("system")
 
     def form_valid(self, form):
-        Log.objects.create(
+        write_log(
             user=self.request.user,
             action="UPDATE",
             category="ADMINISTRATION",
@@ -101,31 +98,16 @@ class AppNameUpdateView(LoginRequiredMixin, generic.UpdateView):
         return super().form_valid(form)
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_app_config_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.config.app"
-        ).exists()
+        return has_permission(user, "system.config.app")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
-        if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+        context["officesync"] = get_officesync()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -134,15 +116,6 @@ class AppNameUpdateView(LoginRequiredMixin, generic.UpdateView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -161,7 +134,7 @@ class AppLogoUpdateView(LoginRequiredMixin, generic.UpdateView):
         return reverse_lazy("system")
 
     def form_valid(self, form):
-        Log.objects.create(
+        write_log(
             user=self.request.user,
             action="UPDATE",
             category="ADMINISTRATION",
@@ -171,31 +144,16 @@ class AppLogoUpdateView(LoginRequiredMixin, generic.UpdateView):
         return super().form_valid(form)
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_logo_config_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.config.logo"
-        ).exists()
+        return has_permission(user, "system.config.logo")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
-        if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+        context["officesync"] = get_officesync()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -204,15 +162,6 @@ class AppLogoUpdateView(LoginRequiredMixin, generic.UpdateView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -232,34 +181,20 @@ class RolesView(LoginRequiredMixin, generic.ListView):
         return Role.objects.all()
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_create_role_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.roles.create"
-        ).exists()
+        return has_permission(user, "system.roles.create")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
             context["has_create_role_permission"] = self.has_create_role_permission(
                 self.request.user
             )
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -268,15 +203,6 @@ class RolesView(LoginRequiredMixin, generic.ListView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -294,7 +220,7 @@ class RoleCreateView(LoginRequiredMixin, generic.CreateView):
     def form_valid(self, form):
         response = super().form_valid(form)
 
-        Log.objects.create(
+        write_log(
             user=self.request.user,
             action="CREATE",
             category="ADMINISTRATION",
@@ -305,33 +231,16 @@ class RoleCreateView(LoginRequiredMixin, generic.CreateView):
         return response
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_create_role_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.roles.create"
-        ).exists()
+        return has_permission(user, "system.roles.create")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
-        if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -340,15 +249,6 @@ class RoleCreateView(LoginRequiredMixin, generic.CreateView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -374,18 +274,14 @@ class RoleDetailView(LoginRequiredMixin, generic.DetailView):
         return obj
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_rename_role_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.roles.rename"
-        ).exists()
+        return has_permission(user, "system.roles.rename")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
             context["has_rename_role_permission"] = self.has_rename_role_permission(
                 self.request.user
@@ -393,27 +289,11 @@ class RoleDetailView(LoginRequiredMixin, generic.DetailView):
             context["users"] = User.objects.filter(
                 advanced__role__name=self.kwargs.get(self.slug_url_kwarg)
             )
-            context["permissions_system"] = CustomPermission.objects.filter(
-                permission__contains="system"
-            )
-            context["permissions_disposition"] = CustomPermission.objects.filter(
-                permission__contains="disposition"
-            )
-            context["permissions_management"] = CustomPermission.objects.filter(
-                permission__contains="management"
-            )
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["permissions_system"] = get_permission_group("system")
+            context["permissions_disposition"] = get_permission_group("disposition")
+            context["permissions_management"] = get_permission_group("management")
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -422,15 +302,6 @@ class RoleDetailView(LoginRequiredMixin, generic.DetailView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -453,23 +324,17 @@ class RoleManageDetailView(LoginRequiredMixin, generic.DetailView):
         return obj
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_rename_role_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.roles.rename"
-        ).exists()
+        return has_permission(user, "system.roles.rename")
 
     def has_perm_role_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.roles.perm"
-        ).exists()
+        return has_permission(user, "system.roles.perm")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
             context["has_rename_role_permission"] = self.has_rename_role_permission(
                 self.request.user
@@ -477,27 +342,12 @@ class RoleManageDetailView(LoginRequiredMixin, generic.DetailView):
             context["has_perm_role_permission"] = self.has_perm_role_permission(
                 self.request.user
             )
-            context["permissions_system"] = CustomPermission.objects.filter(
-                permission__contains="system"
-            ).order_by("permission")
-            context["permissions_disposition"] = CustomPermission.objects.filter(
-                permission__contains="disposition"
-            ).order_by("permission")
-            context["permissions_management"] = CustomPermission.objects.filter(
-                permission__contains="management"
-            ).order_by("permission")
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["permissions_system"] = get_permission_group("system")
+            context["permissions_disposition"] = get_permission_group("disposition")
+            context["permissions_management"] = get_permission_group("management")
+            context["role_permissions"] = get_role_permissions(self.object.pk)
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -506,15 +356,6 @@ class RoleManageDetailView(LoginRequiredMixin, generic.DetailView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -549,7 +390,7 @@ class RoleUpdateView(LoginRequiredMixin, generic.UpdateView):
             )
 
         for message in messages:
-            Log.objects.create(
+            write_log(
                 user=self.request.user,
                 action="UPDATE",
                 category="ADMINISTRATION",
@@ -568,48 +409,26 @@ class RoleUpdateView(LoginRequiredMixin, generic.UpdateView):
         return obj
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_rename_role_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.roles.rename"
-        ).exists()
+        return has_permission(user, "system.roles.rename")
 
     def has_delete_role_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.roles.delete"
-        ).exists()
+        return has_permission(user, "system.roles.delete")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
             context["has_delete_role_permission"] = self.has_delete_role_permission(
                 self.request.user
             )
-            context["permissions_system"] = CustomPermission.objects.filter(
-                permission__contains="system"
-            )
-            context["permissions_disposition"] = CustomPermission.objects.filter(
-                permission__contains="disposition"
-            )
-            context["permissions_management"] = CustomPermission.objects.filter(
-                permission__contains="management"
-            )
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["permissions_system"] = get_permission_group("system")
+            context["permissions_disposition"] = get_permission_group("disposition")
+            context["permissions_management"] = get_permission_group("management")
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -618,15 +437,6 @@ class RoleUpdateView(LoginRequiredMixin, generic.UpdateView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -662,7 +472,7 @@ class RoleDeleteView(LoginRequiredMixin, generic.DeleteView):
         old_role_name = role.name
 
         # Create the log entry
-        Log.objects.create(
+        write_log(
             user=request.user,
             action="DELETE",
             category="ADMINISTRATION",
@@ -670,37 +480,26 @@ class RoleDeleteView(LoginRequiredMixin, generic.DeleteView):
             message=f"{request.user} hat '{old_role_name}' gelöscht.",
         )
 
+        assigned_user_ids = list(role.users.values_list("user_id", flat=True))
+
         role.delete()  # Löschen Sie die Rolle nach Erstellung des Log-Eintrags
 
+        invalidate_user_roles(assigned_user_ids)
+
         messages.success(request, f"{old_role_name} wurde erfolgreich gelöscht.")
         return HttpResponseRedirect(reverse_lazy("roles"))
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_delete_role_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.roles.delete"
-        ).exists()
+        return has_permission(user, "system.roles.delete")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
-        if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+        context["officesync"] = get_officesync()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -709,15 +508,6 @@ class RoleDeleteView(LoginRequiredMixin, generic.DeleteView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -738,78 +528,39 @@ class RolePermissionsUpdateView(LoginRequiredMixin, generic.UpdateView):
         return reverse_lazy("role_manage", kwargs={"name": self.object.name})
 
     def form_valid(self, form):
-        old_role_name = self.object.name
-        selected_permission_ids = self.request.POST.getlist("selected_permissions")
-
-        # Speichern der alten Berechtigungen der Rolle
-        old_permissions = list(self.object.permissions.all())
-
-        self.object.permissions.clear()
-
-        for permission_id in selected_permission_ids:
-            permission = CustomPermission.objects.get(id=permission_id)
-            self.object.permissions.add(permission)
-
-        new_permissions = list(self.object.permissions.all())
-
-        permissions_changed = old_permissions != new_permissions
-
-        response = super().form_valid(form)
-
-        if permissions_changed:
-            Log.objects.create(
-                user=self.request.user,
-                action="UPDATE",
-                category="ADMINISTRATION",
-                content_object=self.object,
-                message=f"{self.request.user} hat bei '{old_role_name}' die Rechte angepasst.",
-            )
+        selected_permission_ids = {
+            int(permission_id)
+            for permission_id in self.request.POST.getlist("selected_permissions")
+            if permission_id.isdigit()
+        }
+        set_role_permissions(
+            self.object, selected_permission_ids, user=self.request.user
+        )
 
-        return response
+        return HttpResponseRedirect(self.get_success_url())
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_rename_role_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.roles.rename"
-        ).exists()
+        return has_permission(user, "system.roles.rename")
 
     def has_perm_role_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.roles.perm"
-        ).exists()
+        return has_permission(user, "system.roles.perm")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
             context["has_rename_role_permission"] = self.has_rename_role_permission(
                 self.request.user
             )
-            context["permissions_system"] = CustomPermission.objects.filter(
-                permission__contains="system"
-            ).order_by("permission")
-            context["permissions_disposition"] = CustomPermission.objects.filter(
-                permission__contains="disposition"
-            ).order_by("permission")
-            context["permissions_management"] = CustomPermission.objects.filter(
-                permission__contains="management"
-            ).order_by("permission")
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["permissions_system"] = get_permission_group("system")
+            context["permissions_disposition"] = get_permission_group("disposition")
+            context["permissions_management"] = get_permission_group("management")
+            context["role_permissions"] = get_role_permissions(self.object.pk)
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -818,15 +569,6 @@ class RolePermissionsUpdateView(LoginRequiredMixin, generic.UpdateView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -847,45 +589,24 @@ class RoleUsersView(LoginRequiredMixin, generic.UpdateView):
         return reverse_lazy("role", kwargs={"name": self.object.name})
 
     def form_valid(self, form):
-        current_assigned_users = set(self.object.users.values_list("id", flat=True))
-
-        selected_user_ids = set(map(int, self.request.POST.getlist("selected_users")))
-
-        users_to_remove = current_assigned_users - selected_user_ids
-        standard_role = Role.objects.get(name="Standard")
-
-        self.object.users.clear()
+        selected_user_ids = {
+            int(user_id)
+            for user_id in self.request.POST.getlist("selected_users")
+            if user_id.isdigit()
+        }
+        assign_role_users(self.object, selected_user_ids, user=self.request.user)
 
-        for user_id in selected_user_ids:
-            user = User.objects.get(id=user_id)
-            advanced_user = AdvancedUser.objects.get(user=user)
-            self.object.users.add(advanced_user)
-
-        for user_id in users_to_remove:
-            user = User.objects.get(id=user_id)
-            advanced_user = AdvancedUser.objects.get(user=user)
-            advanced_user.role = standard_role
-            advanced_user.save()
-
-        return super().form_valid(form)
+        # Die Rolle selbst bleibt unverändert, ein save() würde nur das
+        # Verzeichnis aller Mitglieder erneut aufbauen.
+        return HttpResponseRedirect(self.get_success_url())
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
-            context["users"] = User.objects.all()
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["users"] = User.objects.select_related("advanced__role")
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -893,21 +614,10 @@ class RoleUsersView(LoginRequiredMixin, generic.UpdateView):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -921,78 +631,37 @@ class UsersView(LoginRequiredMixin, generic.ListView):
     context_object_name = "users"
 
     def get_queryset(self):
-        queryset = User.objects.all()
-
-        # Filter aus dem GET-Parameter holen
-        search_query = self.request.GET.get("search", "")
         role_query = self.request.GET.get("role", "")
-
-        if search_query:
-            # Teilen des Suchbegriffs in einzelne Worte
-            search_terms = search_query.split()
-
-            # Erstellen einer Q-Objekt für jedes Wort
-            q_objects = Q()
-
-            for term in search_terms:
-                q_objects |= (
-                    Q(first_name__icontains=term)
-                    | Q(last_name__icontains=term)
-                    | Q(username__icontains=term)
-                )
-
-            # Anwenden der Filter auf die Query
-            queryset = queryset.filter(q_objects)
-
-        if role_query:
-            # Filtern nach der Rolle
-            queryset = queryset.filter(advanced__role__id=role_query)
-
-        # Sortierung anpassen
-        queryset = queryset.annotate(
-            role_name_order=Case(
-                When(advanced__role__name__isnull=True, then=Value("ZZZZZZZZ")),
-                default=F("advanced__role__name"),
-                output_field=CharField(),
-            )
-        ).order_by(
-            Lower("role_name_order"),
-            Lower("first_name"),
-            Lower("last_name"),
-            Lower("username"),
+        return search_directory(
+            self.request.GET.get("search", ""),
+            role_id=role_query if role_query.isdigit() else None,
         )
 
-        return queryset
-
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_users_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.users.access"
-        ).exists()
+        return has_permission(user, "system.users.access")
+
+    def has_users_import_permission(self, user):
+        return has_permission(user, "system.users.import")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
+            context["has_users_import_permission"] = self.has_users_import_permission(
+                self.request.user
+            )
+            page = paginate_directory(self.object_list, self.request.GET.get("cursor"))
+            context["users"] = page
+            if page.has_next:
+                context["next_query"] = page.next_query(self.request.GET)
             context["roles"] = Role.objects.all()
             context["search_query"] = self.request.GET.get("search", "")
             context["role_query"] = self.request.GET.get("role", "")
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -1001,19 +670,52 @@ class UsersView(LoginRequiredMixin, generic.ListView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
+            if not self.has_administration_access(request.user):
+                return redirect("denied")
+
+            if not self.has_users_access(request.user):
+                return redirect("denied")
+
+        return super().dispatch(request, *args, **kwargs)
+
+
+class UsersImportView(LoginRequiredMixin, generic.TemplateView):
+    template_name = "pages/users/import.html"
+
+    def has_administration_access(self, user):
+        return has_permission(user, "system.access")
+
+    def has_users_import_permission(self, user):
+        return has_permission(user, "system.users.import")
+
+    def post(self, request, *args, **kwargs):
+        context = self.get_context_data(**kwargs)
+        upload = request.FILES.get("file")
+        if upload is None:
+            context["missing_file"] = True
+        else:
+            context["result"] = import_employees(
+                upload, format=get_import_format(upload.name), user=request.user
+            )
+        return self.render_to_response(context)
 
-            if not request.user.advanced.terms:
-                return redirect("terms")
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["officesync"] = get_officesync()
+        return context
 
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
+    def get_unread_messages(self):
+        return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
+    def get_read_messages(self):
+        return Message.objects.filter(receiver=self.request.user, receiver_read=True)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
-            if not self.has_users_access(request.user):
+            if not self.has_users_import_permission(request.user):
                 return redirect("denied")
 
         return super().dispatch(request, *args, **kwargs)
@@ -1025,35 +727,27 @@ class LogsView(LoginRequiredMixin, generic.ListView):
     template_name = "pages/logs.html"
 
     def get_queryset(self):
-        return Log.objects.filter(category="SYSTEM")
+        return filter_logs(Log.objects.filter(category="SYSTEM"), self.request.GET)
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_logs_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.logs.access"
-        ).exists()
+        return has_permission(user, "system.logs.access")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
-            context["logs"] = Log.objects.filter(category="SYSTEM")
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            page = paginate_logs(self.object_list, "SYSTEM", self.request.GET)
+            context["logs"] = page
+            context["log_category"] = "SYSTEM"
+            context["log_filters"] = get_log_filters(self.request.GET)
+            context["log_actions"] = LOG_ACTIONS
+            if page.has_next:
+                context["next_query"] = page.next_query(self.request.GET)
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -1062,15 +756,6 @@ class LogsView(LoginRequiredMixin, generic.ListView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -1086,35 +771,30 @@ class LogsAdministrationView(LoginRequiredMixin, generic.ListView):
     template_name = "pages/logs.html"
 
     def get_queryset(self):
-        return Log.objects.filter(category="ADMINISTRATION")
+        return filter_logs(
+            Log.objects.filter(category="ADMINISTRATION"),
+            self.request.GET,
+        )
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_logs_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.logs.access"
-        ).exists()
+        return has_permission(user, "system.logs.access")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
-            context["logs"] = Log.objects.filter(category="ADMINISTRATION")
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            page = paginate_logs(self.object_list, "ADMINISTRATION", self.request.GET)
+            context["logs"] = page
+            context["log_category"] = "ADMINISTRATION"
+            context["log_filters"] = get_log_filters(self.request.GET)
+            context["log_actions"] = LOG_ACTIONS
+            if page.has_next:
+                context["next_query"] = page.next_query(self.request.GET)
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -1123,15 +803,6 @@ class LogsAdministrationView(LoginRequiredMixin, generic.ListView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -1147,35 +818,30 @@ class LogsCommunicationView(LoginRequiredMixin, generic.ListView):
     template_name = "pages/logs.html"
 
     def get_queryset(self):
-        return Log.objects.filter(category="COMMUNICATION")
+        return filter_logs(
+            Log.objects.filter(category="COMMUNICATION"),
+            self.request.GET,
+        )
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_logs_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.logs.access"
-        ).exists()
+        return has_permission(user, "system.logs.access")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
-            context["logs"] = Log.objects.filter(category="COMMUNICATION")
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            page = paginate_logs(self.object_list, "COMMUNICATION", self.request.GET)
+            context["logs"] = page
+            context["log_category"] = "COMMUNICATION"
+            context["log_filters"] = get_log_filters(self.request.GET)
+            context["log_actions"] = LOG_ACTIONS
+            if page.has_next:
+                context["next_query"] = page.next_query(self.request.GET)
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -1184,15 +850,6 @@ class LogsCommunicationView(LoginRequiredMixin, generic.ListView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -1208,35 +865,27 @@ class LogsManagementView(LoginRequiredMixin, generic.ListView):
     template_name = "pages/logs.html"
 
     def get_queryset(self):
-        return Log.objects.filter(category="MANAGEMENT")
+        return filter_logs(Log.objects.filter(category="MANAGEMENT"), self.request.GET)
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_logs_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.logs.access"
-        ).exists()
+        return has_permission(user, "system.logs.access")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
-            context["logs"] = Log.objects.filter(category="MANAGEMENT")
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            page = paginate_logs(self.object_list, "MANAGEMENT", self.request.GET)
+            context["logs"] = page
+            context["log_category"] = "MANAGEMENT"
+            context["log_filters"] = get_log_filters(self.request.GET)
+            context["log_actions"] = LOG_ACTIONS
+            if page.has_next:
+                context["next_query"] = page.next_query(self.request.GET)
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -1245,15 +894,6 @@ class LogsManagementView(LoginRequiredMixin, generic.ListView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -1269,35 +909,27 @@ class LogsDispositionView(LoginRequiredMixin, generic.ListView):
     template_name = "pages/logs.html"
 
     def get_queryset(self):
-        return Log.objects.filter(category="DISPOSITION")
+        return filter_logs(Log.objects.filter(category="DISPOSITION"), self.request.GET)
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_logs_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.logs.access"
-        ).exists()
+        return has_permission(user, "system.logs.access")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
-            context["logs"] = Log.objects.filter(category="DISPOSITION")
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            page = paginate_logs(self.object_list, "DISPOSITION", self.request.GET)
+            context["logs"] = page
+            context["log_category"] = "DISPOSITION"
+            context["log_filters"] = get_log_filters(self.request.GET)
+            context["log_actions"] = LOG_ACTIONS
+            if page.has_next:
+                context["next_query"] = page.next_query(self.request.GET)
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -1306,15 +938,6 @@ class LogsDispositionView(LoginRequiredMixin, generic.ListView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -1330,35 +953,27 @@ class LogsCloudView(LoginRequiredMixin, generic.ListView):
     template_name = "pages/logs.html"
 
     def get_queryset(self):
-        return Log.objects.filter(category="CLOUD")
+        return filter_logs(Log.objects.filter(category="CLOUD"), self.request.GET)
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_logs_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.logs.access"
-        ).exists()
+        return has_permission(user, "system.logs.access")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
-            context["logs"] = Log.objects.filter(category="CLOUD")
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            page = paginate_logs(self.object_list, "CLOUD", self.request.GET)
+            context["logs"] = page
+            context["log_category"] = "CLOUD"
+            context["log_filters"] = get_log_filters(self.request.GET)
+            context["log_actions"] = LOG_ACTIONS
+            if page.has_next:
+                context["next_query"] = page.next_query(self.request.GET)
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -1367,15 +982,51 @@ class LogsCloudView(LoginRequiredMixin, generic.ListView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
+            if not self.has_administration_access(request.user):
+                return redirect("denied")
 
-            if not request.user.advanced.terms:
-                return redirect("terms")
+            if not self.has_logs_access(request.user):
+                return redirect("denied")
 
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
+        return super().dispatch(request, *args, **kwargs)
+
+
+class LogsExportView(LoginRequiredMixin, generic.View):
+    def has_administration_access(self, user):
+        return has_permission(user, "system.access")
+
+    def has_logs_access(self, user):
+        return has_permission(user, "system.logs.access")
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get("format", "csv")
+        if export_format not in LOG_EXPORT_FORMATS:
+            export_format = "csv"
+        content_type, extension = LOG_EXPORT_FORMATS[export_format]
+        compress = bool(request.GET.get("gzip"))
+
+        queryset = Log.objects.all()
+        category = request.GET.get("category")
+        if category:
+            queryset = queryset.filter(category=category)
+        queryset = filter_logs(queryset, request.GET)
+
+        filename = (
+            f"logs-{(category or 'all').lower()}-{timezone.now():%Y%m%d}.{extension}"
+        )
+        if compress:
+            content_type = "application/gzip"
+            filename += ".gz"
+
+        response = StreamingHttpResponse(
+            export_logs(queryset, export_format, compress=compress),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
 
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -1391,37 +1042,21 @@ class SignatureView(LoginRequiredMixin, generic.ListView):
     template_name = "pages/signature/index.html"
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_config_signature(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.communication.signature"
-        ).exists()
+        return has_permission(user, "system.communication.signature")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
-        context["signature"] = Signature.objects.first()
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
+        context["signature"] = get_signature()
         if self.request.user.is_authenticated:
             context["has_config_signature"] = self.has_config_signature(
                 self.request.user
             )
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -1430,15 +1065,6 @@ class SignatureView(LoginRequiredMixin, generic.ListView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -1470,14 +1096,10 @@ class UpdateSignatureView(LoginRequiredMixin, generic.UpdateView):
     template_name = "pages/signature/edit.html"
 
     def has_administration_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.access"
-        ).exists()
+        return has_permission(user, "system.access")
 
     def has_config_signature(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="system.communication.signature"
-        ).exists()
+        return has_permission(user, "system.communication.signature")
 
     def get_success_url(self):
         return reverse_lazy("signature")
@@ -1509,7 +1131,7 @@ class UpdateSignatureView(LoginRequiredMixin, generic.UpdateView):
 
         signature.save()
 
-        Log.objects.create(
+        write_log(
             user=self.request.user,
             action="UPDATE",
             category="ADMINISTRATION",
@@ -1521,24 +1143,14 @@ class UpdateSignatureView(LoginRequiredMixin, generic.UpdateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
-        context["signature"] = Signature.objects.first()
+        context["officesync"] = get_officesync()
+        context["signature"] = get_signature()
         if self.request.user.is_authenticated:
             context["has_config_signature"] = self.has_config_signature(
                 self.request.user
             )
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -1547,15 +1159,6 @@ class UpdateSignatureView(LoginRequiredMixin, generic.UpdateView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_administration_access(request.user):
                 return redirect("denied")
 
@@ -8,7 +8,11 @@ class AuthenticationConfig(AppConfig):
     name = "authentication"
 
     def ready(self):
+        from . import directory, singletons
+
         post_migrate.connect(self.run_after_migration, sender=self)
+        directory.connect_signals()
+        singletons.connect_signals()
 
     def run_after_migration(self, sender, **kwargs):
         call_command("setup_roles")
@@ -0,0 +1,240 @@
+import heapq
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from django.core.cache import cache
+from django.templatetags.static import static
+
+from administration.versions import bump_version, get_version
+
+from .directory import PREFIX_END, fold, tokenize
+from .models import AdvancedUser, DirectoryEntry
+
+# Kompakter Index für die Empfängersuche beim Verfassen von Nachrichten. Er
+# liegt im Speicher jedes Prozesses: Präfixe über eine sortierte Tokenliste
+# (bisect), Teilwörter über die aneinandergehängten gefalteten Namen. Änderungen
+# werden mit einer Version im gemeinsamen Cache angekündigt, jeder Prozess
+# lädt daraufhin nur die geänderten Benutzer nach.
+AUTOCOMPLETE_VERSION = "directory:autocomplete"
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 20
+AUTOCOMPLETE_CHANGES_TIMEOUT = 60 * 60 * 24
+PREFIX_SCAN_LIMIT = 2000
+NO_PROFILE = AdvancedUser.Profile.NONE
+
+RECORD_FIELDS = [
+    "user_id",
+    "sort_key",
+    "user__first_name",
+    "user__last_name",
+    "user__username",
+    "role__name",
+    "role__color",
+    "user__advanced__pp",
+]
+
+
+def _changes_key(version):
+    return f"{AUTOCOMPLETE_VERSION}:{version}:changes"
+
+
+def _avatar(pp):
+    if pp and pp != NO_PROFILE:
+        return static(f"svgs/{pp}.svg")
+    return static("svgs/profile_filled.svg")
+
+
+def _matches(tokens, terms):
+    return all(any(token.startswith(term) for token in tokens) for term in terms)
+
+
+class RecipientIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._records = {}
+        self._order = []
+        self._tokens = []
+        self._user_tokens = {}
+        self._haystack = None
+
+    def _add(self, row, keep_sorted=True):
+        user_id, sort_key, first_name, last_name, username, role, color, pp = row
+        self._records[user_id] = {
+            "id": user_id,
+            "name": f"{first_name} {last_name}".strip() or username,
+            "username": username,
+            "role": role,
+            "color": color,
+            "avatar": _avatar(pp),
+            "sort_key": sort_key,
+            "haystack": fold(f"{first_name} {last_name} {username}"),
+        }
+        tokens = tokenize(first_name, last_name, username)
+        self._user_tokens[user_id] = tokens
+        self._haystack = None
+        if keep_sorted:
+            insort(self._order, (sort_key, user_id))
+            for token in tokens:
+                insort(self._tokens, (token, user_id))
+        else:
+            self._order.append((sort_key, user_id))
+            self._tokens.extend((token, user_id) for token in tokens)
+
+    def _remove_sorted(self, items, item):
+        position = bisect_left(items, item)
+        if position < len(items) and items[position] == item:
+            del items[position]
+
+    def _remove(self, user_id):
+        record = self._records.pop(user_id, None)
+        if record is None:
+            return
+        self._haystack = None
+        self._remove_sorted(self._order, (record["sort_key"], user_id))
+        for token in self._user_tokens.pop(user_id, ()):
+            self._remove_sorted(self._tokens, (token, user_id))
+
+    def _rebuild(self, version):
+        self._records = {}
+        self._order = []
+        self._tokens = []
+        self._user_tokens = {}
+        self._haystack = None
+        for row in DirectoryEntry.objects.values_list(*RECORD_FIELDS).iterator():
+            self._add(row, keep_sorted=False)
+        self._order.sort()
+        self._tokens.sort()
+        self._version = version
+
+    def _apply(self, user_ids, version):
+        rows = DirectoryEntry.objects.filter(user_id__in=user_ids).values_list(
+            *RECORD_FIELDS
+        )
+        for user_id in user_ids:
+            self._remove(user_id)
+        for row in rows:
+            self._add(row)
+        self._version = version
+
+    def _ensure_current(self):
+        version = get_version(AUTOCOMPLETE_VERSION)
+        if version == self._version:
+            return
+
+        with self._lock:
+            if version == self._version:
+                return
+            # Liegen die Änderungen seit dem eigenen Stand noch im Cache,
+            # werden nur die betroffenen Benutzer nachgeladen.
+            if self._version is not None and 0 < version - self._version <= 100:
+                keys = [
+                    _changes_key(number)
+                    for number in range(self._version + 1, version + 1)
+                ]
+                changes = cache.get_many(keys)
+                if len(changes) == len(keys):
+                    user_ids = set()
+                    for changed in changes.values():
+                        user_ids.update(changed)
+                    self._apply(list(user_ids), version)
+                    return
+            self._rebuild(version)
+
+    def _build_haystack(self):
+        # Alle gefalteten Namen in Verzeichnisreihenfolge als eine
+        # Zeichenkette, damit str.find die Teilwortsuche übernimmt.
+        offsets = []
+        user_ids = []
+        parts = []
+        position = 0
+        for _, user_id in self._order:
+            haystack = self._records[user_id]["haystack"]
+            offsets.append(position)
+            user_ids.append(user_id)
+            parts.append(haystack)
+            position += len(haystack) + 1
+        self._haystack = ("\n".join(parts), offsets, user_ids)
+
+    def _search_infix(self, terms, limit, exclude):
+        if self._haystack is None:
+            self._build_haystack()
+        text, offsets, user_ids = self._haystack
+
+        results = []
+        position = text.find(terms[0])
+        while position != -1 and len(results) + len(exclude) < limit:
+            index = bisect_right(offsets, position) - 1
+            user_id = user_ids[index]
+            haystack = self._records[user_id]["haystack"]
+            if user_id not in exclude and all(term in haystack for term in terms):
+                results.append(user_id)
+            next_record = index + 1
+            if next_record >= len(offsets):
+                break
+            position = text.find(terms[0], offsets[next_record])
+        return results
+
+    def _token_range(self, term):
+        start = bisect_left(self._tokens, (term,))
+        return start, bisect_left(self._tokens, (term + PREFIX_END,), start)
+
+    def search(self, query, limit=AUTOCOMPLETE_LIMIT):
+        self._ensure_current()
+        terms = sorted(tokenize(query), key=len, reverse=True)
+        if not terms:
+            return []
+
+        with self._lock:
+            # Präfixtreffer: alle Wörter der Eingabe müssen als Wortanfang
+            # vorkommen, also die Schnittmenge der Tokenbereiche. Bei einem
+            # einzelnen, sehr häufigen Präfix reicht ein Durchlauf in
+            # Verzeichnisreihenfolge bis zum Limit.
+            ranges = sorted(
+                (self._token_range(term) for term in terms),
+                key=lambda bounds: bounds[1] - bounds[0],
+            )
+            start, end = ranges[0]
+            if len(ranges) == 1 and end - start > PREFIX_SCAN_LIMIT:
+                results = []
+                for _, user_id in self._order:
+                    if _matches(self._user_tokens[user_id], terms):
+                        results.append(user_id)
+                        if len(results) >= limit:
+                            break
+            else:
+                found = {user_id for _, user_id in self._tokens[start:end]}
+                for start, end in ranges[1:]:
+                    if not found:
+                        break
+                    found.intersection_update(
+                        user_id for _, user_id in self._tokens[start:end]
+                    )
+                results = heapq.nsmallest(
+                    limit, found, key=lambda user_id: self._records[user_id]["sort_key"]
+                )
+
+            # Teilworttreffer nur, wenn die Präfixe nicht reichen.
+            if len(results) < limit:
+                results.extend(self._search_infix(terms, limit, set(results)))
+
+            return [
+                {
+                    key: self._records[user_id][key]
+                    for key in ("id", "name", "username", "role", "color", "avatar")
+                }
+                for user_id in results
+            ]
+
+
+recipient_index = RecipientIndex()
+
+
+def search_recipients(query, limit=AUTOCOMPLETE_LIMIT):
+    return recipient_index.search(query, max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT)))
+
+
+def update_recipients(user_ids=None):
+    version = bump_version(AUTOCOMPLETE_VERSION)
+    if user_ids is not None:
+        cache.set(_changes_key(version), list(user_ids), AUTOCOMPLETE_CHANGES_TIMEOUT)
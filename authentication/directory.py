@@ -0,0 +1,191 @@
+import re
+import unicodedata
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete
+
+from administration.models import Role
+from administration.pagination import PAGE_SIZE, paginate_keyset
+
+from .models import AdvancedUser, DirectoryEntry, DirectoryToken
+
+User = get_user_model()
+
+# Benutzerverzeichnis für die Benutzerliste und die Empfängerauswahl. Namen
+# werden ohne Akzente und Groß-/Kleinschreibung in Tokens zerlegt und über
+# einen Index per Präfix gesucht. Die Sortierung steckt fertig im sort_key.
+# Benutzer ohne Rolle stehen wie bisher am Ende. Jeder Teil des sort_key wird
+# gekürzt, weil fold() Zeichen verlängern kann und der Schlüssel sonst über
+# die Feldlänge hinauswächst; die angehängte id hält ihn trotzdem eindeutig.
+SORT_KEY_SEPARATOR = "\x01"
+SORT_KEY_PART_LENGTH = 115
+NO_ROLE_SORT_VALUE = "\uffff"
+PREFIX_END = chr(0x10FFFF)
+REFRESH_BATCH_SIZE = 500
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fold(value):
+    value = unicodedata.normalize("NFKD", value or "")
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    return value.casefold()
+
+
+def tokenize(*values):
+    tokens = set()
+    for value in values:
+        tokens.update(_WORD_RE.findall(fold(value)))
+    return tokens
+
+
+def build_sort_key(role_name, first_name, last_name, username, pk):
+    parts = [
+        fold(role_name) if role_name else NO_ROLE_SORT_VALUE,
+        fold(first_name),
+        fold(last_name),
+        fold(username),
+    ]
+    return SORT_KEY_SEPARATOR.join(
+        [part[:SORT_KEY_PART_LENGTH] for part in parts] + [f"{pk:012d}"]
+    )
+
+
+def refresh_directory(user_ids=None):
+    users = User.objects.order_by("pk").values_list(
+        "pk",
+        "first_name",
+        "last_name",
+        "username",
+        "advanced__role_id",
+        "advanced__role__name",
+    )
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+        users = users.filter(pk__in=user_ids)
+
+    batch = []
+    for row in users.iterator(chunk_size=REFRESH_BATCH_SIZE):
+        batch.append(row)
+        if len(batch) >= REFRESH_BATCH_SIZE:
+            _write_entries(batch)
+            batch = []
+    if batch:
+        _write_entries(batch)
+
+    from .autocomplete import update_recipients
+
+    update_recipients(user_ids)
+
+
+def _write_entries(rows):
+    entries = []
+    tokens = []
+    for pk, first_name, last_name, username, role_id, role_name in rows:
+        entries.append(
+            DirectoryEntry(
+                user_id=pk,
+                role_id=role_id,
+                sort_key=build_sort_key(role_name, first_name, last_name, username, pk),
+            )
+        )
+        tokens.extend(
+            DirectoryToken(entry_id=pk, token=token[:150])
+            for token in tokenize(first_name, last_name, username)
+        )
+
+    with transaction.atomic():
+        DirectoryEntry.objects.filter(pk__in=[row[0] for row in rows]).delete()
+        DirectoryEntry.objects.bulk_create(entries)
+        DirectoryToken.objects.bulk_create(tokens)
+
+
+def search_directory(query="", role_id=None):
+    entries = DirectoryEntry.objects.all()
+    if role_id:
+        entries = entries.filter(role_id=role_id)
+
+    matches = Q()
+    for token in tokenize(query):
+        matches |= Q(token__gte=token, token__lt=token + PREFIX_END)
+    if matches:
+        entries = entries.filter(
+            pk__in=DirectoryToken.objects.filter(matches).values("entry_id")
+        )
+    return entries
+
+
+def paginate_directory(entries, cursor=None, per_page=PAGE_SIZE):
+    page = paginate_keyset(
+        entries.select_related("user__advanced__role"),
+        cursor,
+        field="sort_key",
+        per_page=per_page,
+        descending=False,
+    )
+    page.object_list = [entry.user for entry in page.object_list]
+    return page
+
+
+def _user_saved(sender, instance, update_fields=None, **kwargs):
+    # Beim Login wird nur last_login gespeichert, das ändert nichts am
+    # Verzeichnis.
+    if update_fields and set(update_fields) <= {"last_login", "password"}:
+        return
+    refresh_directory([instance.pk])
+
+
+def _user_deleted(sender, instance, **kwargs):
+    from .autocomplete import update_recipients
+
+    update_recipients([instance.pk])
+
+
+def _advanced_user_saved(sender, instance, **kwargs):
+    refresh_directory([instance.user_id])
+
+
+def _role_saved(sender, instance, created, **kwargs):
+    if not created:
+        refresh_directory(
+            AdvancedUser.objects.filter(role=instance).values_list("user_id", flat=True)
+        )
+
+
+def _role_pre_delete(sender, instance, **kwargs):
+    instance._directory_user_ids = list(
+        AdvancedUser.objects.filter(role=instance).values_list("user_id", flat=True)
+    )
+
+
+def _role_deleted(sender, instance, **kwargs):
+    refresh_directory(getattr(instance, "_directory_user_ids", []))
+
+
+def connect_signals():
+    post_save.connect(
+        _user_saved, sender=User, dispatch_uid="authentication.directory.user"
+    )
+    post_delete.connect(
+        _user_deleted, sender=User, dispatch_uid="authentication.directory.user_delete"
+    )
+    post_save.connect(
+        _advanced_user_saved,
+        sender=AdvancedUser,
+        dispatch_uid="authentication.directory.advanced_user",
+    )
+    post_save.connect(
+        _role_saved, sender=Role, dispatch_uid="authentication.directory.role"
+    )
+    pre_delete.connect(
+        _role_pre_delete,
+        sender=Role,
+        dispatch_uid="authentication.directory.role_pre_delete",
+    )
+    post_delete.connect(
+        _role_deleted, sender=Role, dispatch_uid="authentication.directory.role_delete"
+    )
@@ -0,0 +1,58 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.onboarding import (
+    IMPORT_CHUNK_SIZE,
+    IMPORT_FORMATS,
+    IMPORT_WORKERS,
+    get_import_format,
+    import_employees,
+)
+
+
+class Command(BaseCommand):
+    help = "Import employees with their roles from a CSV or JSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON file to import")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="File format, detected from the file extension by default",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help="Number of employees created per transaction",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=IMPORT_WORKERS,
+            help="Number of processes hashing passwords (default: all cores)",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        try:
+            file = open(path, "rb")
+        except OSError as error:
+            raise CommandError(f"Cannot open {path}: {error}")
+
+        with file:
+            result = import_employees(
+                file,
+                format=options["format"] or get_import_format(path),
+                chunk_size=options["chunk_size"],
+                workers=options["workers"] or os.cpu_count() or 1,
+            )
+
+        for line, message in result.errors:
+            self.stderr.write(f"Line {line}: {message}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Import: {result.created} employees created, {len(result.errors)} rows skipped."
+            )
+        )
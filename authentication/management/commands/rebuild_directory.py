@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from authentication.directory import refresh_directory
+from authentication.models import DirectoryEntry
+
+
+class Command(BaseCommand):
+    help = "Rebuild the user directory search index and sort keys"
+
+    def handle(self, *args, **options):
+        refresh_directory()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Directory: {DirectoryEntry.objects.count()} users indexed successfully."
+            )
+        )
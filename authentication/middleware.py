@@ -0,0 +1,67 @@
+from django.shortcuts import redirect
+
+from .models import AdvancedUser
+
+CONSENT_SESSION_KEY = "consent"
+CONSENT_FIELDS = ("privacy", "terms", "copyright")
+CONSENT_EXEMPT_URL_NAMES = {
+    "privacy",
+    "terms",
+    "copyright",
+    "login",
+    "logout",
+    "signup",
+}
+
+
+def get_consent(request):
+    consent = request.session.get(CONSENT_SESSION_KEY)
+    if consent is None or consent.get("user") != request.user.pk:
+        values = (
+            AdvancedUser.objects.filter(user_id=request.user.pk)
+            .values(*CONSENT_FIELDS)
+            .first()
+            or {}
+        )
+        consent = {"user": request.user.pk}
+        for field in CONSENT_FIELDS:
+            consent[field] = bool(values.get(field))
+        request.session[CONSENT_SESSION_KEY] = consent
+    return consent
+
+
+def record_consent(request, field):
+    AdvancedUser.objects.filter(user_id=request.user.pk).update(**{field: True})
+    consent = get_consent(request)
+    consent[field] = True
+    request.session[CONSENT_SESSION_KEY] = consent
+
+
+class ConsentMiddleware:
+    """
+    Leitet angemeldete Benutzer auf Datenschutz, Nutzungsbedingungen oder
+    Urheberrechtsreglement um, solange sie diesen nicht zugestimmt haben. Die
+    drei Zustimmungen liegen in der Session und werden nur beim ersten Aufruf
+    nach der Anmeldung aus AdvancedUser gelesen.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not request.user.is_authenticated:
+            return None
+
+        match = request.resolver_match
+        if match.app_name == "admin" or match.url_name in CONSENT_EXEMPT_URL_NAMES:
+            return None
+
+        consent = get_consent(request)
+        for field in CONSENT_FIELDS:
+            if not consent[field]:
+                return redirect(field)
+
+        return None
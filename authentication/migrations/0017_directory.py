@@ -0,0 +1,43 @@
+# Generated by Django 3.2.8 on 2026-10-17 20:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('administration', '0006_log_daily_summary'),
+        ('authentication', '0016_auto_20231228_1608'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirectoryEntry',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='directory', serialize=False, to='auth.user')),
+                ('sort_key', models.CharField(max_length=500, unique=True)),
+                ('role', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='administration.role')),
+            ],
+            options={
+                'ordering': ['sort_key'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DirectoryToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=150)),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to='authentication.directoryentry')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='directorytoken',
+            index=models.Index(fields=['token', 'entry'], name='directory_token_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='directoryentry',
+            index=models.Index(fields=['role', 'sort_key'], name='directory_role_sort_idx'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import migrations
+
+# Stand der Hilfsfunktionen aus authentication.directory zum Zeitpunkt dieser
+# Migration, damit spätere Änderungen dort die Migration nicht verändern.
+SORT_KEY_SEPARATOR = "\x01"
+SORT_KEY_PART_LENGTH = 115
+NO_ROLE_SORT_VALUE = "\uffff"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fold(value):
+    value = unicodedata.normalize("NFKD", value or "")
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    return value.casefold()
+
+
+def tokenize(*values):
+    tokens = set()
+    for value in values:
+        tokens.update(_WORD_RE.findall(fold(value)))
+    return tokens
+
+
+def build_sort_key(role_name, first_name, last_name, username, pk):
+    parts = [
+        fold(role_name) if role_name else NO_ROLE_SORT_VALUE,
+        fold(first_name),
+        fold(last_name),
+        fold(username),
+    ]
+    return SORT_KEY_SEPARATOR.join(
+        [part[:SORT_KEY_PART_LENGTH] for part in parts] + [f"{pk:012d}"]
+    )
+
+
+def populate_directory(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    DirectoryEntry = apps.get_model("authentication", "DirectoryEntry")
+    DirectoryToken = apps.get_model("authentication", "DirectoryToken")
+
+    entries = []
+    tokens = []
+    for pk, first_name, last_name, username, role_id, role_name in (
+        User.objects.values_list(
+            "pk",
+            "first_name",
+            "last_name",
+            "username",
+            "advanced__role_id",
+            "advanced__role__name",
+        ).iterator()
+    ):
+        entries.append(
+            DirectoryEntry(
+                user_id=pk,
+                role_id=role_id,
+                sort_key=build_sort_key(role_name, first_name, last_name, username, pk),
+            )
+        )
+        tokens.extend(
+            DirectoryToken(entry_id=pk, token=token[:150])
+            for token in tokenize(first_name, last_name, username)
+        )
+
+    DirectoryEntry.objects.bulk_create(entries, batch_size=500)
+    DirectoryToken.objects.bulk_create(tokens, batch_size=500)
+
+
+def clear_directory(apps, schema_editor):
+    apps.get_model("authentication", "DirectoryEntry").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("authentication", "0017_directory"),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_directory, clear_directory),
+    ]
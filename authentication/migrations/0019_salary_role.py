@@ -0,0 +1,35 @@
+# Generated by Django 3.2.8 on 2026-10-17 21:06
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def populate_salary_role(apps, schema_editor):
+    # Bestehende Lohnzahlungen übernehmen die aktuelle Rolle des Empfängers.
+    AdvancedUser = apps.get_model("authentication", "AdvancedUser")
+    Salary = apps.get_model("authentication", "Salary")
+    Salary.objects.update(
+        role_id=Subquery(
+            AdvancedUser.objects.filter(user_id=OuterRef("recipient_id")).values(
+                "role_id"
+            )[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0007_custompermission_unique'),
+        ('authentication', '0018_populate_directory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salary',
+            name='role',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='salaries', to='administration.role'),
+        ),
+        migrations.RunPython(populate_salary_role, migrations.RunPython.noop),
+    ]
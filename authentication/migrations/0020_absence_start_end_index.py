@@ -0,0 +1,17 @@
+# Generated by Django 3.2.8 on 2026-10-17 21:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0019_salary_role'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='absence',
+            index=models.Index(fields=['start', 'end'], name='authenticat_start_57fa56_idx'),
+        ),
+    ]
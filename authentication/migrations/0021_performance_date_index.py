@@ -0,0 +1,17 @@
+# Generated by Django 3.2.8 on 2026-10-17 21:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0020_absence_start_end_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='performance',
+            index=models.Index(fields=['date'], name='authenticat_date_c296db_idx'),
+        ),
+    ]
@@ -73,6 +73,8 @@ class AdvancedUser(models.Model):
     xbox_username = models.CharField(max_length=20, null=True, blank=True)
     xing_username = models.CharField(max_length=20, null=True, blank=True)
     youtube_username = models.CharField(max_length=20, null=True, blank=True)
+    # Abgeleiteter Saldo aus der Zeiterfassung (management.timetracking),
+    # wird nur per UPDATE auf diese Spalte nachgeführt.
     overtime_hours = models.FloatField(null=True, blank=True)
     privacy = models.BooleanField(default=False)
     terms = models.BooleanField(default=False)
@@ -186,6 +188,11 @@ class Salary(models.Model):
     beneficiary = models.ForeignKey(
         User, on_delete=models.SET_NULL, related_name="payrolls", null=True, blank=True
     )
+    # Rolle des Empfängers zum Zeitpunkt der Lohnzahlung, für die Auswertung
+    # nach Rollen in der Lohnübersicht.
+    role = models.ForeignKey(
+        Role, on_delete=models.SET_NULL, related_name="salaries", null=True, blank=True
+    )
 
     def format_date(self):
         if self.date is not None:
@@ -255,6 +262,8 @@ class Absence(models.Model):
 
     class Meta:
         ordering = ["-start"]
+        # Für Überschneidungsabfragen des Abwesenheitskalenders.
+        indexes = [models.Index(fields=["start", "end"])]
 
 
 class Performance(models.Model):
@@ -299,6 +308,7 @@ class Performance(models.Model):
 
     class Meta:
         ordering = ["-date"]
+        indexes = [models.Index(fields=["date"])]
 
 
 class Reprimant(models.Model):
@@ -377,3 +387,40 @@ class Warn(models.Model):
 
     def __str__(self):
         return f"{self.user.username} warned for: {self.reason}"
+
+
+class DirectoryEntry(models.Model):
+    # Vorberechneter Eintrag für das Benutzerverzeichnis. sort_key ergibt die
+    # Reihenfolge Rolle, Vorname, Nachname, Benutzername ohne Sortierung zur
+    # Laufzeit, die Tokens dienen der Präfixsuche über einen Index.
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="directory"
+    )
+    role = models.ForeignKey(
+        Role, null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    sort_key = models.CharField(max_length=500, unique=True)
+
+    def __str__(self):
+        return f"{self.user.username}"
+
+    class Meta:
+        ordering = ["sort_key"]
+        indexes = [
+            models.Index(fields=["role", "sort_key"], name="directory_role_sort_idx"),
+        ]
+
+
+class DirectoryToken(models.Model):
+    entry = models.ForeignKey(
+        DirectoryEntry, on_delete=models.CASCADE, related_name="tokens"
+    )
+    token = models.CharField(max_length=150)
+
+    def __str__(self):
+        return f"{self.entry} | {self.token}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["token", "entry"], name="directory_token_idx"),
+        ]
@@ -0,0 +1,343 @@
+import csv
+import datetime
+import io
+import json
+import os
+import re
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from administration.audit import write_log
+from administration.models import Role
+
+from .directory import refresh_directory
+from .models import AdvancedUser, Health, Meta, UserCustomInterface
+
+User = get_user_model()
+
+# Massenimport von Mitarbeitenden aus CSV oder JSON. Die Datei wird Zeile für
+# Zeile gelesen und geprüft, gültige Zeilen werden blockweise angelegt: erst
+# die Passwörter hashen, dann Benutzer und die vier zugehörigen Datensätze
+# per bulk_create in einer Transaktion je Block. Einen Prozesspool für das
+# Hashen startet nur der Befehl, im Webprozess wird nicht geforkt.
+IMPORT_CHUNK_SIZE = getattr(settings, "EMPLOYEE_IMPORT_CHUNK_SIZE", 500)
+IMPORT_WORKERS = getattr(settings, "EMPLOYEE_IMPORT_WORKERS", None)
+IMPORT_FORMATS = ["csv", "json"]
+DEFAULT_ROLE = "Standard"
+
+# Gleiche Regeln wie bei der Registrierung.
+USERNAME_RE = re.compile(r"^[a-z0-9_.]+$")
+NAME_MAX_LENGTH = 15
+SEXES = {choice.lower(): choice for choice in Meta.Sex.values}
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+
+def _init_worker():
+    django.setup()
+
+
+def _hash_password(password):
+    return make_password(password)
+
+
+class _HashPool:
+    def __init__(self, workers):
+        self.workers = workers
+        self._executor = None
+
+    def map(self, passwords):
+        # Der Pool wird erst gestartet, wenn es mehr als ein Passwort gibt.
+        if self.workers <= 1 or len(passwords) < 2:
+            return map(_hash_password, passwords)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker
+            )
+        return self._executor.map(_hash_password, passwords, chunksize=8)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+
+
+def get_import_format(name):
+    extension = os.path.splitext(name or "")[1].lower().lstrip(".")
+    if extension in ("json", "jsonl"):
+        return "json"
+    return "csv"
+
+
+def read_rows(file, format="csv"):
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    if format == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    # JSON als Liste von Objekten oder als ein Objekt pro Zeile.
+    first = text.read(1)
+    while first and first.isspace():
+        first = text.read(1)
+    if first == "[":
+        try:
+            rows = json.loads(first + text.read())
+        except ValueError as error:
+            yield 1, ValueError(f"Ungültiges JSON: {error}")
+            return
+        for number, row in enumerate(rows, start=1):
+            yield number, row
+        return
+
+    for number, line in enumerate(text, start=1):
+        if number == 1:
+            line = first + line
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as error:
+            yield number, ValueError(f"Ungültiges JSON: {error}")
+
+
+def _value(row, key):
+    value = row.get(key)
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def validate_row(row, roles, seen):
+    if isinstance(row, ValueError):
+        raise ValidationError(str(row))
+    if not isinstance(row, dict):
+        raise ValidationError("Zeile ist kein Objekt.")
+
+    username = _value(row, "username").lower()
+    if not username:
+        raise ValidationError("Benutzername fehlt.")
+    if len(username) > NAME_MAX_LENGTH or not USERNAME_RE.match(username):
+        raise ValidationError(f"Benutzername '{username}' ist ungültig.")
+    if username in seen:
+        raise ValidationError(f"Benutzername '{username}' kommt mehrfach vor.")
+
+    first_name = _value(row, "first_name")
+    last_name = _value(row, "last_name")
+    if len(first_name) > NAME_MAX_LENGTH or len(last_name) > NAME_MAX_LENGTH:
+        raise ValidationError("Vor- oder Nachname ist zu lang.")
+
+    email = _value(row, "email")
+    if email:
+        try:
+            validate_email(email)
+        except ValidationError:
+            raise ValidationError(f"E-Mail-Adresse '{email}' ist ungültig.")
+
+    role_name = _value(row, "role") or DEFAULT_ROLE
+    if role_name not in roles:
+        raise ValidationError(f"Rolle '{role_name}' existiert nicht.")
+
+    sex = _value(row, "sex")
+    if sex and sex.lower() not in SEXES:
+        raise ValidationError(f"Geschlecht '{sex}' ist ungültig.")
+
+    birthdate = _value(row, "birthdate")
+    if birthdate:
+        try:
+            date = parse_date(birthdate)
+        except ValueError:
+            date = None
+        if date is None:
+            raise ValidationError(f"Geburtsdatum '{birthdate}' ist ungültig.")
+        birthdate = timezone.make_aware(
+            datetime.datetime.combine(date, datetime.time())
+        )
+
+    password = _value(row, "password") or None
+    if password:
+        try:
+            validate_password(
+                password,
+                User(
+                    username=username,
+                    first_name=first_name,
+                    last_name=last_name,
+                    email=email,
+                ),
+            )
+        except ValidationError as error:
+            raise ValidationError(
+                f"Passwort für '{username}' ist ungültig: {' '.join(error.messages)}"
+            )
+
+    seen.add(username)
+    return {
+        "username": username,
+        "first_name": first_name,
+        "last_name": last_name,
+        "email": email,
+        "password": password,
+        "role_id": roles[role_name],
+        "sex": SEXES.get(sex.lower(), "") if sex else "",
+        "nationality": _value(row, "nationality") or None,
+        "citizenship": _value(row, "citizenship") or None,
+        "birthdate": birthdate or None,
+    }
+
+
+def _hash_passwords(passwords, pool):
+    # Ohne Passwort wird wie bei make_password(None) ein unbrauchbares
+    # Passwort gesetzt, nur ohne den Umweg über get_random_string.
+    hashed = [UNUSABLE_PASSWORD_PREFIX + secrets.token_urlsafe(30) for _ in passwords]
+    pending = [index for index, password in enumerate(passwords) if password]
+    results = pool.map([passwords[index] for index in pending])
+    for index, password in zip(pending, results):
+        hashed[index] = password
+    return hashed
+
+
+def _create_chunk(rows, pool, result):
+    existing = set(
+        User.objects.filter(
+            username__in=[data["username"] for _, data in rows]
+        ).values_list("username", flat=True)
+    )
+    for line, data in rows:
+        if data["username"] in existing:
+            result.add_error(
+                line, f"Benutzername '{data['username']}' ist bereits vergeben."
+            )
+    rows = [(line, data) for line, data in rows if data["username"] not in existing]
+    if not rows:
+        return []
+
+    passwords = _hash_passwords([data["password"] for _, data in rows], pool)
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(
+                [
+                    User(
+                        username=data["username"],
+                        first_name=data["first_name"],
+                        last_name=data["last_name"],
+                        email=data["email"],
+                        password=password,
+                    )
+                    for (_, data), password in zip(rows, passwords)
+                ]
+            )
+            # bulk_create liefert unter SQLite keine IDs zurück.
+            user_ids = dict(
+                User.objects.filter(
+                    username__in=[data["username"] for _, data in rows]
+                ).values_list("username", "pk")
+            )
+
+            AdvancedUser.objects.bulk_create(
+                [
+                    AdvancedUser(
+                        user_id=user_ids[data["username"]], role_id=data["role_id"]
+                    )
+                    for _, data in rows
+                ]
+            )
+            Meta.objects.bulk_create(
+                [
+                    Meta(
+                        user_id=user_ids[data["username"]],
+                        sex=data["sex"],
+                        nationality=data["nationality"],
+                        citizenship=data["citizenship"],
+                        birthdate=data["birthdate"],
+                    )
+                    for _, data in rows
+                ]
+            )
+            Health.objects.bulk_create(
+                [Health(user_id=user_ids[data["username"]]) for _, data in rows]
+            )
+            UserCustomInterface.objects.bulk_create(
+                [
+                    UserCustomInterface(user_id=user_ids[data["username"]])
+                    for _, data in rows
+                ]
+            )
+    except IntegrityError as error:
+        for line, _ in rows:
+            result.add_error(line, f"Konnte nicht angelegt werden: {error}")
+        return []
+
+    result.created += len(rows)
+    return list(user_ids.values())
+
+
+def import_employees(
+    file,
+    format="csv",
+    user=None,
+    chunk_size=IMPORT_CHUNK_SIZE,
+    workers=1,
+):
+    result = ImportResult()
+    roles = {}
+    for pk, name in Role.objects.order_by("pk").values_list("pk", "name"):
+        roles.setdefault(name, pk)
+
+    pool = _HashPool(workers)
+
+    created_user_ids = []
+    seen = set()
+    chunk = []
+    try:
+        for line, row in read_rows(file, format):
+            try:
+                chunk.append((line, validate_row(row, roles, seen)))
+            except ValidationError as error:
+                result.add_error(line, " ".join(error.messages))
+                continue
+            if len(chunk) >= chunk_size:
+                created_user_ids += _create_chunk(chunk, pool, result)
+                chunk = []
+        if chunk:
+            created_user_ids += _create_chunk(chunk, pool, result)
+    finally:
+        pool.shutdown()
+
+    result.errors.sort()
+
+    # bulk_create löst keine Signale aus, das Verzeichnis wird einmal für
+    # alle neuen Benutzer aufgebaut.
+    refresh_directory(created_user_ids)
+
+    if user is not None and result.created:
+        write_log(
+            user=user,
+            action="CREATE",
+            category="ADMINISTRATION",
+            message=(
+                f"@{user} importierte {result.created} Benutzer "
+                f"({len(result.errors)} fehlerhafte Zeilen)."
+            ),
+        )
+
+    return result
@@ -0,0 +1,76 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from administration.versions import bump_version, get_version
+from communication.models import Signature
+
+from .models import OfficeSync
+
+# OfficeSync und Signature bestehen aus genau einer Zeile, die sich kaum je
+# ändert, aber auf jeder Seite gebraucht wird. Jeder Prozess hält die Zeile
+# im Speicher; über den gemeinsamen Cache wird nur eine Versionsnummer
+# abgeglichen, damit Änderungen sofort in allen Worker-Prozessen ankommen.
+# Die Version wird bei jedem Speichern und Löschen erhöht, egal ob über die
+# Oberfläche, das Django-Admin, die Shell oder eine Migration.
+_instances = {}
+
+
+def _version_name(name):
+    return f"singleton:{name}"
+
+
+def _load(name, model):
+    version = get_version(_version_name(name))
+    cached = _instances.get(name)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    instance = model.objects.first()
+    if instance is not None:
+        _instances[name] = (version, instance)
+    return instance
+
+
+def _invalidate(name):
+    _instances.pop(name, None)
+    # Erst nach dem Commit, sonst lädt ein anderer Prozess noch die alte
+    # Zeile unter der neuen Version.
+    transaction.on_commit(lambda: bump_version(_version_name(name)))
+
+
+def get_officesync():
+    return _load("officesync", OfficeSync)
+
+
+def get_signature():
+    return _load("signature", Signature)
+
+
+def invalidate_officesync():
+    _invalidate("officesync")
+
+
+def invalidate_signature():
+    _invalidate("signature")
+
+
+def _officesync_changed(sender, **kwargs):
+    invalidate_officesync()
+
+
+def _signature_changed(sender, **kwargs):
+    invalidate_signature()
+
+
+def connect_signals():
+    for signal, suffix in ((post_save, "save"), (post_delete, "delete")):
+        signal.connect(
+            _officesync_changed,
+            sender=OfficeSync,
+            dispatch_uid=f"authentication.singletons.officesync_{suffix}",
+        )
+        signal.connect(
+            _signature_changed,
+            sender=Signature,
+            dispatch_uid=f"authentication.singletons.signature_{suffix}",
+        )
@@ -1,3 +1,219 @@
-from django.test import TestCase
+import io
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve, reverse
+
+from administration.models import Role
+from administration.versions import get_version
+from communication.models import Signature
+
+from . import singletons
+from .autocomplete import RecipientIndex
+from .directory import build_sort_key
+from .middleware import CONSENT_SESSION_KEY, ConsentMiddleware
+from .models import AdvancedUser, DirectoryEntry, OfficeSync
+from .onboarding import import_employees
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SingletonTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        singletons._instances.clear()
+        OfficeSync.objects.all().delete()
+        self.officesync = OfficeSync.objects.create(app="Alt")
+
+    def save_elsewhere(self, **changes):
+        # Änderung aus einem anderen Prozess (Admin, Shell, Migration): der
+        # eigene Prozess hält weiterhin die alte Zeile im Speicher.
+        stale = singletons._instances["officesync"]
+        with self.captureOnCommitCallbacks(execute=True):
+            for field, value in changes.items():
+                setattr(self.officesync, field, value)
+            self.officesync.save()
+        singletons._instances["officesync"] = stale
+
+    def test_model_save_reaches_other_processes(self):
+        self.assertEqual(singletons.get_officesync().app, "Alt")
+        self.save_elsewhere(app="Neu")
+        self.assertEqual(singletons.get_officesync().app, "Neu")
+
+    def test_stale_instance_not_served_after_version_expiry(self):
+        self.assertEqual(singletons.get_officesync().app, "Alt")
+        self.save_elsewhere(app="Neu")
+        cache.delete("version:singleton:officesync")
+        self.assertEqual(singletons.get_officesync().app, "Neu")
+
+    def test_version_bumped_only_after_commit(self):
+        version = get_version("singleton:officesync")
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.officesync.save()
+            self.assertEqual(get_version("singleton:officesync"), version)
+        self.assertEqual(len(callbacks), 1)
+
+    def test_deleted_signature_not_served(self):
+        Signature.objects.all().delete()
+        signature = Signature.objects.create()
+        self.assertEqual(singletons.get_signature(), signature)
+        with self.captureOnCommitCallbacks(execute=True):
+            signature.delete()
+        self.assertIsNone(singletons.get_signature())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RecipientIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            "anna", first_name="Anna", last_name="Muster"
+        )
+
+    def search(self, index, query):
+        return [result["username"] for result in index.search(query)]
+
+    def test_changes_applied_after_version_expiry(self):
+        index = RecipientIndex()
+        self.assertEqual(self.search(index, "anna"), ["anna"])
+
+        self.user.first_name = "Berta"
+        self.user.save()
+        cache.delete("version:directory:autocomplete")
+        self.assertEqual(self.search(index, "berta"), ["anna"])
+
+        self.user.delete()
+        cache.clear()
+        self.assertEqual(self.search(index, "berta"), [])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ImportEmployeesTests(TestCase):
+    def setUp(self):
+        Role.objects.get_or_create(name="Standard")
+
+    def run_import(self, text, **kwargs):
+        return import_employees(io.BytesIO(text.encode()), "csv", **kwargs)
+
+    def test_passwords_are_validated(self):
+        result = self.run_import(
+            "username,first_name,password\n"
+            "anna,Anna,12345678\n"
+            "bert,Bert,Tr4m-Gleis-Sonne\n"
+            "carl,Carl,\n"
+        )
+        self.assertEqual(result.created, 2)
+        self.assertEqual([line for line, _ in result.errors], [2])
+        self.assertFalse(get_user_model().objects.filter(username="anna").exists())
+        self.assertTrue(
+            get_user_model()
+            .objects.get(username="bert")
+            .check_password("Tr4m-Gleis-Sonne")
+        )
+
+    def test_web_import_hashes_in_process(self):
+        with mock.patch("authentication.onboarding.ProcessPoolExecutor") as pool:
+            result = self.run_import(
+                "username,password\nanna,Tr4m-Gleis-Sonne\nbert,Rad-Kiesel-Mond7\n"
+            )
+        self.assertEqual(result.created, 2)
+        pool.assert_not_called()
+
+
+class DirectorySortKeyTests(TestCase):
+    def test_sort_key_fits_field_for_long_names(self):
+        # "ﷺ" wird von fold() zu 18 Zeichen ausgeschrieben.
+        long_name = "\ufdfa" * 150
+        max_length = DirectoryEntry._meta.get_field("sort_key").max_length
+        key = build_sort_key(long_name, long_name, long_name, long_name, 10**11)
+        self.assertLessEqual(len(key), max_length)
+
+    def test_sort_key_keeps_order(self):
+        first = build_sort_key("Standard", "Anna", "Meier", "anna", 2)
+        second = build_sort_key("Standard", "Änne", "Meier", "aenne", 1)
+        without_role = build_sort_key(None, "Aaron", "Abt", "aaron", 3)
+        self.assertEqual(
+            sorted([without_role, second, first]), [first, second, without_role]
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES, AUDIT_LOG_SYNCHRONOUS=True)
+class ConsentMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("anna", password="pw")
+        self.advanced = AdvancedUser.objects.create(user=self.user)
+        self.middleware = ConsentMiddleware(lambda request: None)
+        self.session = SessionStore()
+
+    def process(self, url_name, user=None):
+        url = reverse(url_name)
+        request = RequestFactory().get(url)
+        request.user = user or self.user
+        request.session = self.session
+        request.resolver_match = resolve(url)
+        return self.middleware.process_view(request, None, (), {})
+
+    def test_redirects_to_first_missing_consent(self):
+        self.assertEqual(self.process("home").url, reverse("privacy"))
+        AdvancedUser.objects.filter(pk=self.advanced.pk).update(privacy=True)
+        self.session.flush()
+        self.assertEqual(self.process("home").url, reverse("terms"))
+
+    def test_consent_pages_and_login_exempt(self):
+        for url_name in ("privacy", "terms", "copyright", "logout"):
+            with self.assertNumQueries(0):
+                self.assertIsNone(self.process(url_name))
+
+    def test_anonymous_user_not_checked(self):
+        from django.contrib.auth.models import AnonymousUser
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.process("home", user=AnonymousUser()))
+
+    def test_flags_read_once_per_session(self):
+        AdvancedUser.objects.filter(pk=self.advanced.pk).update(
+            privacy=True, terms=True, copyright=True
+        )
+        with self.assertNumQueries(1):
+            self.assertIsNone(self.process("home"))
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.process("home"))
+            self.assertIsNone(self.process("time_punch"))
+
+    def test_session_of_other_user_reloaded(self):
+        self.session[CONSENT_SESSION_KEY] = {
+            "user": self.user.pk + 1,
+            "privacy": True,
+            "terms": True,
+            "copyright": True,
+        }
+        self.assertEqual(self.process("home").url, reverse("privacy"))
+
+    def test_missing_advanced_user_redirects(self):
+        self.advanced.delete()
+        self.assertEqual(self.process("home").url, reverse("privacy"))
+
+    def test_accepting_updates_session(self):
+        self.client.login(username="anna", password="pw")
+        response = self.client.get(reverse("home"))
+        self.assertRedirects(
+            response, reverse("privacy"), fetch_redirect_response=False
+        )
+
+        response = self.client.post(reverse("privacy"))
+        self.assertRedirects(response, reverse("terms"), fetch_redirect_response=False)
+        self.advanced.refresh_from_db()
+        self.assertTrue(self.advanced.privacy)
+        self.assertFalse(self.advanced.terms)
+
+        # Die Zustimmung steht sofort in der Session, ohne neuen Abruf.
+        response = self.client.get(reverse("home"))
+        self.assertRedirects(response, reverse("terms"), fetch_redirect_response=False)
+        self.assertTrue(self.client.session[CONSENT_SESSION_KEY]["privacy"])
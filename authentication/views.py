@@ -7,11 +7,14 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
 from django.views import generic
 
-from administration.models import Log, Role
-from communication.models import Announcement, Message
+from administration.audit import write_log
+from administration.models import Role
+from communication.models import Message
 
 from .forms import LoginForm, SignUpForm
-from .models import AdvancedUser, Health, Meta, OfficeSync, UserCustomInterface
+from .middleware import get_consent, record_consent
+from .models import AdvancedUser, Health, Meta, UserCustomInterface
+from .singletons import get_officesync
 
 User = get_user_model()
 
@@ -40,7 +43,7 @@ class SignUpView(generic.CreateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         return context
 
 
@@ -50,7 +53,7 @@ def sign_in(request):
             return redirect("/")
         form = LoginForm()
 
-        office_sync = OfficeSync.objects.first()
+        office_sync = get_officesync()
         context = {
             "form": form,
             "officesync": office_sync,
@@ -70,7 +73,7 @@ def sign_in(request):
                 messages.success(request, f"Erfolgreich angemeldet!")
                 return redirect("home")
 
-        office_sync = OfficeSync.objects.first()
+        office_sync = get_officesync()
         context = {
             "form": form,
             "officesync": office_sync,
@@ -92,41 +95,15 @@ class HomeView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
-        if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
     def get_read_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
-
 
 class AccessDenied(LoginRequiredMixin, generic.ListView):
     model = User
@@ -134,38 +111,15 @@ class AccessDenied(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
-        context["unread_announcements_count"] = self.get_unread_announcements().count()
-        context["unread_messages_count"] = self.get_unread_messages().count()
-        context["unread_count"] = (
-            context["unread_announcements_count"] + context["unread_messages_count"]
-        )
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
     def get_read_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
-
 
 class MaintenanceView(LoginRequiredMixin, generic.ListView):
     model = User
@@ -173,38 +127,15 @@ class MaintenanceView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
-        context["unread_announcements_count"] = self.get_unread_announcements().count()
-        context["unread_messages_count"] = self.get_unread_messages().count()
-        context["unread_count"] = (
-            context["unread_announcements_count"] + context["unread_messages_count"]
-        )
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
     def get_read_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
-
 
 class AccountView(LoginRequiredMixin, generic.UpdateView):
     model = User
@@ -231,41 +162,15 @@ class AccountView(LoginRequiredMixin, generic.UpdateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
-        if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
     def get_read_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
-
 
 class PrivacyView(generic.ListView):
     model = User
@@ -273,22 +178,9 @@ class PrivacyView(generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
-        if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -297,21 +189,21 @@ class PrivacyView(generic.ListView):
 
     def post(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            request.user.advanced.privacy = True
-            request.user.advanced.save()
+            record_consent(request, "privacy")
 
-        Log.objects.create(
+        write_log(
             user=request.user,
             action="READ",
             category="SYSTEM",
             message=f"@{request.user} hat die Datenschutzerklärung zugestimmt.",
         )
 
-        if request.user.advanced.terms:
-            if request.user.advanced.copyright:
+        consent = get_consent(request)
+        if consent["terms"]:
+            if consent["copyright"]:
                 return redirect("home")
             return redirect("copyright")
-        if request.user.advanced.copyright:
+        if consent["copyright"]:
             return redirect("home")
         return redirect("terms")
 
@@ -322,22 +214,9 @@ class TermsView(generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
-        if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -346,17 +225,16 @@ class TermsView(generic.ListView):
 
     def post(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            request.user.advanced.terms = True
-            request.user.advanced.save()
+            record_consent(request, "terms")
 
-        Log.objects.create(
+        write_log(
             user=request.user,
             action="READ",
             category="SYSTEM",
             message=f"@{request.user} hat die Nutzungsbedingungen zugestimmt.",
         )
 
-        if request.user.advanced.copyright:
+        if get_consent(request)["copyright"]:
             return redirect("home")
         return redirect("copyright")
 
@@ -367,22 +245,9 @@ class CopyrightView(generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
-        if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -391,10 +256,9 @@ class CopyrightView(generic.ListView):
 
     def post(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            request.user.advanced.copyright = True
-            request.user.advanced.save()
+            record_consent(request, "copyright")
 
-        Log.objects.create(
+        write_log(
             user=request.user,
             action="READ",
             category="SYSTEM",
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CommunicationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'communication'
+
+    def ready(self):
+        from .unread import connect_signals
+
+        connect_signals()
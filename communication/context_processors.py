@@ -0,0 +1,15 @@
+from django.utils.functional import SimpleLazyObject
+
+from .unread import get_unread_counts
+
+
+def unread_counts(request):
+    if not request.user.is_authenticated:
+        return {}
+
+    counts = SimpleLazyObject(lambda: get_unread_counts(request.user))
+    return {
+        "unread_announcements_count": SimpleLazyObject(lambda: counts["announcements"]),
+        "unread_messages_count": SimpleLazyObject(lambda: counts["messages"]),
+        "unread_count": SimpleLazyObject(lambda: counts["total"]),
+    }
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from communication.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for messages"
+
+    def handle(self, *args, **options):
+        if rebuild_search_index():
+            self.stdout.write(
+                self.style.SUCCESS("Search: Message index rebuilt successfully.")
+            )
+        else:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Search: Full-text index is only available on SQLite."
+                )
+            )
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.8 on 2026-10-17 20:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('communication', '0016_rename_show_location_signature_show_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnnouncementReadState',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='announcement_read_state', serialize=False, to='auth.user')),
+                ('read_until', models.PositiveBigIntegerField(default=0)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
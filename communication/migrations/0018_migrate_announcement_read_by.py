@@ -0,0 +1,74 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations
+
+
+def forwards(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Announcement = apps.get_model("communication", "Announcement")
+    AnnouncementReadState = apps.get_model("communication", "AnnouncementReadState")
+    ReadBy = Announcement.read_by.through
+
+    announcement_ids = list(
+        Announcement.objects.order_by("pk").values_list("pk", flat=True)
+    )
+    read = defaultdict(set)
+    for user_id, announcement_id in ReadBy.objects.values_list(
+        "user_id", "announcement_id"
+    ).iterator():
+        read[user_id].add(announcement_id)
+
+    states = []
+    for user_id in User.objects.values_list("pk", flat=True).iterator():
+        user_read = read.get(user_id, set())
+        read_until = 0
+        for announcement_id in announcement_ids:
+            if announcement_id not in user_read:
+                break
+            read_until = announcement_id
+        states.append(
+            AnnouncementReadState(
+                user_id=user_id,
+                read_until=read_until,
+                unread_count=len(announcement_ids) - len(user_read),
+            )
+        )
+    AnnouncementReadState.objects.bulk_create(states, batch_size=500)
+
+    for state in states:
+        if state.read_until:
+            ReadBy.objects.filter(
+                user_id=state.user_id, announcement_id__lte=state.read_until
+            ).delete()
+
+
+def backwards(apps, schema_editor):
+    Announcement = apps.get_model("communication", "Announcement")
+    AnnouncementReadState = apps.get_model("communication", "AnnouncementReadState")
+    ReadBy = Announcement.read_by.through
+
+    for state in AnnouncementReadState.objects.filter(read_until__gt=0).iterator():
+        ReadBy.objects.bulk_create(
+            [
+                ReadBy(user_id=state.user_id, announcement_id=announcement_id)
+                for announcement_id in Announcement.objects.filter(
+                    pk__lte=state.read_until
+                ).values_list("pk", flat=True)
+            ],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+    AnnouncementReadState.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("communication", "0017_announcement_read_state"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.8 on 2026-10-17 20:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0018_migrate_announcement_read_by'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['receiver', 'receiver_read', '-created_at', '-id'], name='message_receiver_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['sender', '-created_at', '-id'], name='message_sender_idx'),
+        ),
+    ]
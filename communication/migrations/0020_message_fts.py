@@ -0,0 +1,73 @@
+from django.db import migrations
+
+# Volltextindex für Nachrichten. FTS5 gibt es nur unter SQLite, auf anderen
+# Datenbanken wird die Migration übersprungen und die Suche fällt auf
+# icontains zurück.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE communication_message_fts USING fts5(
+        title,
+        content,
+        content='communication_message',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER communication_message_fts_insert
+    AFTER INSERT ON communication_message BEGIN
+        INSERT INTO communication_message_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER communication_message_fts_delete
+    AFTER DELETE ON communication_message BEGIN
+        INSERT INTO communication_message_fts(communication_message_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER communication_message_fts_update
+    AFTER UPDATE OF title, content ON communication_message BEGIN
+        INSERT INTO communication_message_fts(communication_message_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO communication_message_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    "INSERT INTO communication_message_fts(communication_message_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS communication_message_fts_update",
+    "DROP TRIGGER IF EXISTS communication_message_fts_delete",
+    "DROP TRIGGER IF EXISTS communication_message_fts_insert",
+    "DROP TABLE IF EXISTS communication_message_fts",
+]
+
+
+def _execute(schema_editor, statements):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_fts(apps, schema_editor):
+    _execute(schema_editor, CREATE_SQL)
+
+
+def drop_fts(apps, schema_editor):
+    _execute(schema_editor, DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("communication", "0019_message_mailbox_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,115 @@
+import importlib
+
+from django.db import migrations
+
+# Der Volltextindex bekommt eine zusätzliche Spalte mit den Besitzern einer
+# Nachricht ("r<Empfänger-ID> s<Absender-ID>"). Die Suche schränkt damit schon
+# im Index auf das eigene Postfach ein, statt alle Nachrichten zu bewerten.
+# Quelle des Index ist eine View, weil die Spalte in der Tabelle nicht existiert.
+CREATE_SQL = [
+    """
+    CREATE VIEW communication_message_fts_source AS
+    SELECT id,
+           title,
+           content,
+           'r' || coalesce(receiver_id, 0) || ' s' || coalesce(sender_id, 0) AS owners
+    FROM communication_message
+    """,
+    """
+    CREATE VIRTUAL TABLE communication_message_fts USING fts5(
+        title,
+        content,
+        owners,
+        content='communication_message_fts_source',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER communication_message_fts_insert
+    AFTER INSERT ON communication_message BEGIN
+        INSERT INTO communication_message_fts(rowid, title, content, owners)
+        VALUES (
+            new.id,
+            new.title,
+            new.content,
+            'r' || coalesce(new.receiver_id, 0) || ' s' || coalesce(new.sender_id, 0)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER communication_message_fts_delete
+    AFTER DELETE ON communication_message BEGIN
+        INSERT INTO communication_message_fts(
+            communication_message_fts, rowid, title, content, owners
+        )
+        VALUES (
+            'delete',
+            old.id,
+            old.title,
+            old.content,
+            'r' || coalesce(old.receiver_id, 0) || ' s' || coalesce(old.sender_id, 0)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER communication_message_fts_update
+    AFTER UPDATE OF title, content, sender_id, receiver_id
+    ON communication_message BEGIN
+        INSERT INTO communication_message_fts(
+            communication_message_fts, rowid, title, content, owners
+        )
+        VALUES (
+            'delete',
+            old.id,
+            old.title,
+            old.content,
+            'r' || coalesce(old.receiver_id, 0) || ' s' || coalesce(old.sender_id, 0)
+        );
+        INSERT INTO communication_message_fts(rowid, title, content, owners)
+        VALUES (
+            new.id,
+            new.title,
+            new.content,
+            'r' || coalesce(new.receiver_id, 0) || ' s' || coalesce(new.sender_id, 0)
+        );
+    END
+    """,
+    "INSERT INTO communication_message_fts(communication_message_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS communication_message_fts_update",
+    "DROP TRIGGER IF EXISTS communication_message_fts_delete",
+    "DROP TRIGGER IF EXISTS communication_message_fts_insert",
+    "DROP TABLE IF EXISTS communication_message_fts",
+    "DROP VIEW IF EXISTS communication_message_fts_source",
+]
+
+_previous = importlib.import_module("communication.migrations.0020_message_fts")
+
+
+def _execute(schema_editor, statements):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def add_owners(apps, schema_editor):
+    _execute(schema_editor, DROP_SQL + CREATE_SQL)
+
+
+def remove_owners(apps, schema_editor):
+    _execute(schema_editor, DROP_SQL + _previous.CREATE_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("communication", "0020_message_fts"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_owners, remove_owners),
+    ]
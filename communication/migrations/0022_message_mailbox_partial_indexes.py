@@ -0,0 +1,25 @@
+# Generated by Django 3.2.8 on 2026-10-17 22:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0021_message_fts_owners'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='message',
+            name='message_receiver_idx',
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('receiver_read', False)), fields=['receiver', '-created_at', '-id'], name='message_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('receiver_read', True)), fields=['receiver', '-created_at', '-id'], name='message_archive_idx'),
+        ),
+    ]
@@ -126,6 +126,23 @@ class Announcement(models.Model):
         return f"Sender: {self.sender} | Titel: {self.title}"
 
 
+class AnnouncementReadState(models.Model):
+    # Alle Ankündigungen bis einschließlich read_until gelten als gelesen.
+    # Neuere gelesene Ankündigungen stehen als Ausnahmen weiterhin in
+    # Announcement.read_by. unread_count wird bei jeder Änderung mitgeführt.
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="announcement_read_state",
+    )
+    read_until = models.PositiveBigIntegerField(default=0)
+    unread_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Benutzer: {self.user} | Gelesen bis: {self.read_until} | Ungelesen: {self.unread_count}"
+
+
 class Message(models.Model):
     title = models.CharField(max_length=100, verbose_name=_("Title"))
     content = models.TextField(max_length=500, verbose_name=_("Content"))
@@ -174,6 +191,26 @@ class Message(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        # Posteingang und Archiv je als Teilindex: Django schreibt den Filter
+        # auf receiver_read als "NOT receiver_read" statt als Vergleich, ein
+        # gemeinsamer Index könnte deshalb nicht in Sortierreihenfolge gelesen
+        # werden.
+        indexes = [
+            models.Index(
+                fields=["receiver", "-created_at", "-id"],
+                condition=models.Q(receiver_read=False),
+                name="message_inbox_idx",
+            ),
+            models.Index(
+                fields=["receiver", "-created_at", "-id"],
+                condition=models.Q(receiver_read=True),
+                name="message_archive_idx",
+            ),
+            models.Index(
+                fields=["sender", "-created_at", "-id"],
+                name="message_sender_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Sender: {self.sender} | Empfänger: {self.receiver} | Gelesen: {self.receiver_read} | Titel: {self.title}"
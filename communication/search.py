@@ -0,0 +1,148 @@
+import math
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from administration.pagination import (
+    PAGE_SIZE,
+    KeysetPage,
+    decode_cursor,
+    encode_cursor,
+)
+
+from .models import Message
+
+# Suche in Titel und Inhalt der Nachrichten über den FTS5-Index aus Migration
+# 0020/0021. Der Index enthält je Nachricht die Besitzer als Token ("r<id>"
+# für den Empfänger, "s<id>" für den Absender), MATCH liefert damit nur
+# Treffer aus dem eigenen Postfach. Die Treffer werden nach bm25 sortiert
+# (Titel zählt stärker, die Besitzerspalte gar nicht) und über (Rang, id)
+# seitenweise geblättert.
+FTS_TABLE = "communication_message_fts"
+FTS_RANK = f"bm25({FTS_TABLE}, 10.0, 1.0, 0.0)"
+SEARCH_BOXES = {
+    "inbox": ("r", "message.receiver_id = %s AND message.receiver_read = 0"),
+    "outbox": ("s", "message.sender_id = %s"),
+    "archive": ("r", "message.receiver_id = %s AND message.receiver_read = 1"),
+}
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+SNIPPET_TOKENS = 12
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_query(query):
+    # Jede Eingabe wird in einzelne Wörter zerlegt und als Zeichenkette
+    # gequotet, damit FTS5-Operatoren aus der Eingabe nicht ausgewertet
+    # werden. Das letzte Wort wird als Präfix gesucht.
+    terms = _TERM_RE.findall(query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _highlight(snippet):
+    return mark_safe(
+        escape(snippet).replace(SNIPPET_START, "<mark>").replace(SNIPPET_END, "</mark>")
+    )
+
+
+def _search_fts(user, match, box, position, per_page):
+    owner, box_filter = SEARCH_BOXES[box]
+    params = [
+        SNIPPET_START,
+        SNIPPET_END,
+        SNIPPET_TOKENS,
+        f'owners : "{owner}{user.pk}" AND {{title content}} : ({match})',
+        user.pk,
+    ]
+    sql = f"""
+        SELECT message.id,
+               {FTS_RANK} AS search_rank,
+               snippet({FTS_TABLE}, 1, %s, %s, '…', %s) AS search_snippet
+        FROM {FTS_TABLE}
+        JOIN communication_message AS message ON message.id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH %s AND {box_filter}
+    """
+    if position is not None:
+        sql += f"""
+            AND ({FTS_RANK} > %s
+                 OR ({FTS_RANK} = %s AND message.id > %s))
+        """
+        params += [position[0], position[0], position[1]]
+    sql += " ORDER BY search_rank, message.id LIMIT %s"
+    params.append(per_page + 1)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _search_fallback(user, query, box, position, per_page):
+    box_filter = {
+        "inbox": Q(receiver=user, receiver_read=False),
+        "outbox": Q(sender=user),
+        "archive": Q(receiver=user, receiver_read=True),
+    }[box]
+    messages = Message.objects.filter(box_filter)
+    for term in _TERM_RE.findall(query):
+        messages = messages.filter(
+            Q(title__icontains=term) | Q(content__icontains=term)
+        )
+    if position is not None:
+        messages = messages.filter(pk__gt=position[1])
+    rows = messages.order_by("pk").values_list("pk", "content")[: per_page + 1]
+    return [(pk, 0.0, content[:120]) for pk, content in rows]
+
+
+def search_messages(user, query, box="inbox", cursor=None, per_page=PAGE_SIZE):
+    if box not in SEARCH_BOXES:
+        box = "inbox"
+    match = build_match_query(query or "")
+    if match is None:
+        return KeysetPage([], None)
+
+    position = decode_cursor(cursor) if cursor else None
+    if position is not None:
+        try:
+            position = (float(position[0]), position[1])
+        except (TypeError, ValueError):
+            position = None
+        if position is not None and not math.isfinite(position[0]):
+            position = None
+
+    if connection.vendor == "sqlite":
+        rows = _search_fts(user, match, box, position, per_page)
+    else:
+        rows = _search_fallback(user, query, box, position, per_page)
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+
+    messages = Message.objects.in_bulk([row[0] for row in rows])
+    results = []
+    for pk, rank, snippet in rows:
+        message = messages.get(pk)
+        if message is None:
+            continue
+        message.search_rank = rank
+        message.search_snippet = _highlight(snippet or "")
+        results.append(message)
+
+    return KeysetPage(results, next_cursor)
+
+
+def rebuild_search_index():
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
@@ -1,3 +1,358 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
 
-# Create your tests here.
+from administration.versions import get_version
+from administration.pagination import PAGE_SIZE, encode_cursor
+from authentication.models import AdvancedUser, Health, Meta, UserCustomInterface
+
+from .models import Announcement, AnnouncementReadState, Message
+from .search import search_messages
+from .unread import (
+    ANNOUNCEMENTS_VERSION,
+    announcement_published,
+    get_read_state,
+    get_unread_counts,
+    is_announcement_read,
+    mark_all_announcements_read,
+    mark_announcement_read,
+    read_announcements,
+    unread_announcements,
+)
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class UnreadCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("anna")
+        get_read_state(self.user)
+
+    def test_published_announcement_counted_after_version_expiry(self):
+        self.assertEqual(get_unread_counts(self.user)["announcements"], 0)
+        announcement = Announcement.objects.create(title="Neu", content="Text")
+        announcement_published(announcement)
+        cache.delete("version:unread:announcements")
+        self.assertEqual(get_unread_counts(self.user)["announcements"], 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AnnouncementReadStateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.anna = get_user_model().objects.create_user("anna", password="pw")
+        self.bert = get_user_model().objects.create_user("bert")
+        get_read_state(self.anna)
+        get_read_state(self.bert)
+
+    def publish(self, count=1):
+        announcements = []
+        for number in range(count):
+            announcement = Announcement.objects.create(title=f"A{number}", content="")
+            announcement_published(announcement)
+            announcements.append(announcement)
+        return announcements
+
+    def state(self, user):
+        return AnnouncementReadState.objects.get(user=user)
+
+    def assertConsistent(self, user):
+        # Der mitgeführte Zähler muss immer einer vollständigen Zählung entsprechen.
+        state = self.state(user)
+        self.assertEqual(state.unread_count, unread_announcements(user).count())
+        self.assertEqual(
+            read_announcements(user).count() + state.unread_count,
+            Announcement.objects.count(),
+        )
+
+    def test_new_user_state_counts_existing_announcements(self):
+        self.publish(3)
+        carl = get_user_model().objects.create_user("carl")
+        self.assertEqual(get_read_state(carl).unread_count, 3)
+        self.assertEqual(get_read_state(carl).read_until, 0)
+
+    def test_reading_single_announcement_keeps_exception(self):
+        first, second = self.publish(2)
+        mark_announcement_read(self.anna, second)
+        mark_announcement_read(self.anna, second)
+
+        state = self.state(self.anna)
+        self.assertEqual((state.read_until, state.unread_count), (0, 1))
+        self.assertTrue(is_announcement_read(self.anna, second))
+        self.assertFalse(is_announcement_read(self.anna, first))
+        self.assertEqual(list(unread_announcements(self.anna)), [first])
+        self.assertConsistent(self.anna)
+        self.assertEqual(self.state(self.bert).unread_count, 2)
+
+    def test_reading_last_unread_moves_watermark(self):
+        first, second = self.publish(2)
+        mark_announcement_read(self.anna, second)
+        mark_announcement_read(self.anna, first)
+
+        state = self.state(self.anna)
+        self.assertEqual((state.read_until, state.unread_count), (second.pk, 0))
+        self.assertFalse(Announcement.read_by.through.objects.exists())
+        self.assertConsistent(self.anna)
+
+    def test_mark_all_read(self):
+        announcements = self.publish(3)
+        mark_announcement_read(self.anna, announcements[0])
+        with CaptureQueriesContext(connection) as queries:
+            mark_all_announcements_read(self.anna)
+        statements = [
+            query["sql"].split()[0]
+            for query in queries
+            if "SAVEPOINT" not in query["sql"]
+        ]
+        # Unabhängig von der Anzahl Ankündigungen: ein UPDATE, ein DELETE.
+        self.assertEqual(statements, ["SELECT", "SELECT", "UPDATE", "DELETE"])
+        self.assertEqual(self.state(self.anna).read_until, announcements[-1].pk)
+        self.assertConsistent(self.anna)
+
+        (newer,) = self.publish()
+        self.assertEqual(list(unread_announcements(self.anna)), [newer])
+        self.assertConsistent(self.anna)
+
+    def test_mark_all_read_without_announcements(self):
+        mark_all_announcements_read(self.anna)
+        state = self.state(self.anna)
+        self.assertEqual((state.read_until, state.unread_count), (0, 0))
+
+    def test_deleting_announcements_adjusts_counts(self):
+        below, read, unread = self.publish(3)
+        mark_all_announcements_read(self.anna)
+        self.publish()
+        mark_announcement_read(self.bert, read)
+
+        below.delete()
+        read.delete()
+        self.assertEqual(self.state(self.anna).unread_count, 1)
+        self.assertEqual(self.state(self.bert).unread_count, 2)
+        self.assertConsistent(self.anna)
+        self.assertConsistent(self.bert)
+
+        unread.delete()
+        self.assertEqual(self.state(self.bert).unread_count, 1)
+        self.assertConsistent(self.bert)
+
+    def test_counts_cached_and_invalidated(self):
+        (announcement,) = self.publish()
+        get_version(ANNOUNCEMENTS_VERSION)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_unread_counts(self.anna)["announcements"], 1)
+        with self.assertNumQueries(0):
+            get_unread_counts(self.anna)
+
+        mark_announcement_read(self.anna, announcement)
+        self.assertEqual(get_unread_counts(self.anna)["announcements"], 0)
+        self.assertEqual(get_unread_counts(self.bert)["announcements"], 1)
+
+        self.publish()
+        self.assertEqual(get_unread_counts(self.anna)["total"], 1)
+        self.assertEqual(get_unread_counts(self.bert)["total"], 2)
+
+    def test_read_all_view(self):
+        AdvancedUser.objects.create(
+            user=self.anna, privacy=True, terms=True, copyright=True
+        )
+        self.publish(2)
+        self.client.login(username="anna", password="pw")
+        response = self.client.post(reverse("announcements_read"))
+        self.assertRedirects(
+            response, reverse("announcements"), fetch_redirect_response=False
+        )
+        self.assertEqual(self.state(self.anna).unread_count, 0)
+        self.assertEqual(self.state(self.bert).unread_count, 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class MailboxTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.anna = User.objects.create_user("anna", password="pw")
+        AdvancedUser.objects.create(
+            user=self.anna, privacy=True, terms=True, copyright=True
+        )
+        Meta.objects.create(user=self.anna, sex="Divers")
+        Health.objects.create(user=self.anna)
+        UserCustomInterface.objects.create(user=self.anna)
+        self.bert = User.objects.create_user("bert")
+        self.client.login(username="anna", password="pw")
+
+    def send(self, count, sender=None, receiver=None, **fields):
+        Message.objects.bulk_create(
+            Message(
+                title=f"Nachricht {number}",
+                content="",
+                sender=sender or self.bert,
+                receiver=receiver or self.anna,
+                **fields,
+            )
+            for number in range(count)
+        )
+
+    def walk(self, url_name, params=""):
+        seen = []
+        query = QueryDict(params)
+        while True:
+            response = self.client.get(reverse(url_name), query)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(message.pk for message in response.context["messages"])
+            if "next_query" not in response.context:
+                return seen
+            query = QueryDict(response.context["next_query"])
+
+    def plan(self, queryset):
+        return queryset.order_by("-created_at", "-pk")[: PAGE_SIZE + 1].explain()
+
+    def test_mailboxes_read_in_index_order(self):
+        now = timezone.now()
+        after = Q(created_at__lt=now) | Q(created_at=now, pk__lt=10)
+        for name, queryset in [
+            (
+                "message_inbox_idx",
+                Message.objects.filter(receiver=1, receiver_read=False),
+            ),
+            (
+                "message_archive_idx",
+                Message.objects.filter(receiver=1, receiver_read=True),
+            ),
+            ("message_sender_idx", Message.objects.filter(sender=1)),
+        ]:
+            for plan in (self.plan(queryset), self.plan(queryset.filter(after))):
+                with self.subTest(index=name, plan=plan):
+                    self.assertIn(name, plan)
+                    self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_inbox_pages_through_equal_timestamps(self):
+        self.send(PAGE_SIZE + 5)
+        self.send(3, receiver=self.bert)
+        Message.objects.update(created_at=timezone.now())
+
+        seen = self.walk("inbox")
+        expected = Message.objects.filter(receiver=self.anna).order_by("-pk")
+        self.assertEqual(seen, list(expected.values_list("pk", flat=True)))
+
+    def test_outbox_and_archive_pages(self):
+        self.send(PAGE_SIZE + 1, sender=self.anna, receiver=self.bert)
+        self.send(2, receiver_read=True)
+        self.send(1)
+        self.assertEqual(len(self.walk("outbox")), PAGE_SIZE + 1)
+        self.assertEqual(len(self.walk("archive")), 2)
+
+    def test_empty_and_bad_cursor_show_first_page(self):
+        self.send(3)
+        first = self.walk("inbox")
+        for cursor in ["", "kaputt", encode_cursor("kein Datum", 1)]:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(reverse("inbox"), {"cursor": cursor})
+                self.assertEqual(
+                    [message.pk for message in response.context["messages"]], first
+                )
+
+    def test_page_query_count_independent_of_mailbox_size(self):
+        def count_queries():
+            self.client.get(reverse("inbox"))
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse("inbox"))
+            return len(queries)
+
+        self.send(3)
+        few = count_queries()
+        self.send(PAGE_SIZE * 2)
+        self.assertEqual(count_queries(), few)
+
+    def test_read_selected_messages(self):
+        self.send(3)
+        self.send(1, receiver=self.bert, sender=self.anna)
+        mine = list(Message.objects.filter(receiver=self.anna).order_by("pk"))
+        foreign = Message.objects.get(receiver=self.bert)
+        self.assertEqual(get_unread_counts(self.anna)["messages"], 3)
+
+        response = self.client.post(
+            reverse("inbox_read"),
+            {"selected": [mine[0].pk, foreign.pk, "x", ""]},
+        )
+        self.assertRedirects(response, reverse("inbox"), fetch_redirect_response=False)
+        self.assertEqual(list(Message.objects.filter(receiver_read=True)), [mine[0]])
+        self.assertEqual(get_unread_counts(self.anna)["messages"], 2)
+
+    def test_read_without_selection_changes_nothing(self):
+        self.send(2)
+        self.client.post(reverse("inbox_read"))
+        self.assertFalse(Message.objects.filter(receiver_read=True).exists())
+
+    def test_read_all_messages_in_one_update(self):
+        self.send(5)
+        self.send(1, receiver=self.bert, sender=self.anna)
+        self.client.get(reverse("inbox"))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse("inbox_read"), {"all": "1"})
+        updates = [q for q in queries if q["sql"].startswith('UPDATE "communication')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Message.objects.filter(receiver_read=False).count(), 1)
+        self.assertEqual(get_unread_counts(self.anna)["messages"], 0)
+
+
+class MessageSearchTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.anna = User.objects.create_user("anna")
+        self.bert = User.objects.create_user("bert")
+        for number in range(3):
+            Message.objects.create(
+                title=f"Budget {number}",
+                content="Planung",
+                sender=self.bert,
+                receiver=self.anna,
+            )
+        self.foreign = Message.objects.create(
+            title="Budget", content="Planung", sender=self.anna, receiver=self.bert
+        )
+
+    def search(self, query, box="inbox", user=None, **kwargs):
+        return search_messages(user or self.anna, query, box, **kwargs)
+
+    def test_other_mailboxes_not_searched(self):
+        self.assertNotIn(self.foreign, list(self.search("budget")))
+        self.assertEqual(list(self.search("budget", "outbox")), [self.foreign])
+        self.assertEqual(list(self.search("budget", user=self.bert)), [self.foreign])
+
+    def test_owner_tokens_not_matched_by_query(self):
+        self.assertEqual(list(self.search(f"r{self.anna.pk}")), [])
+
+    def test_keyset_continuation(self):
+        seen = []
+        cursor = None
+        while True:
+            page = self.search("budg", cursor=cursor, per_page=2)
+            seen.extend(message.pk for message in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(len(seen), 3)
+        self.assertEqual(len(set(seen)), 3)
+        self.assertNotIn(self.foreign.pk, seen)
+
+    def test_bad_cursor_and_empty_query(self):
+        self.assertEqual(len(self.search("budget", cursor="garbage")), 3)
+        self.assertEqual(len(self.search("  ")), 0)
+
+    def test_index_follows_changes(self):
+        message = Message.objects.filter(receiver=self.anna).first()
+        message.receiver = self.bert
+        message.title = "Umzug"
+        message.save()
+        self.assertEqual(len(self.search("budget")), 2)
+        self.assertEqual(list(self.search("umzug", user=self.bert)), [message])
@@ -0,0 +1,185 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Func, IntegerField, Max, Q, Subquery
+from django.db.models.signals import pre_delete
+
+from administration.versions import bump_version, get_version
+
+from .models import Announcement, AnnouncementReadState, Message
+
+User = get_user_model()
+
+# Die Zähler werden im Navigationsbereich jeder Seite angezeigt. Ein kurzer
+# Cache pro Benutzer reicht, weil alle Stellen, die einen Zähler verändern,
+# den Eintrag ausdrücklich verwerfen.
+UNREAD_CACHE_TIMEOUT = 30
+ANNOUNCEMENTS_VERSION = "unread:announcements"
+
+
+def _unread_key(user_id):
+    version = get_version(ANNOUNCEMENTS_VERSION)
+    return f"unread:user:{user_id}:v{version}"
+
+
+def _count(queryset):
+    return Subquery(
+        queryset.order_by()
+        .annotate(count=Func(F("pk"), function="COUNT"))
+        .values("count"),
+        output_field=IntegerField(),
+    )
+
+
+def get_unread_counts(user):
+    key = _unread_key(user.pk)
+    counts = cache.get(key)
+    if counts is None:
+        announcements, messages = (
+            User.objects.filter(pk=user.pk)
+            .annotate(
+                unread_announcements_count=Subquery(
+                    AnnouncementReadState.objects.filter(user_id=user.pk).values(
+                        "unread_count"
+                    ),
+                    output_field=IntegerField(),
+                ),
+                unread_messages_count=_count(
+                    Message.objects.filter(receiver_id=user.pk, receiver_read=False)
+                ),
+            )
+            .values_list("unread_announcements_count", "unread_messages_count")
+            .get()
+        )
+        if announcements is None:
+            announcements = get_read_state(user).unread_count
+        counts = {
+            "announcements": announcements,
+            "messages": messages,
+        }
+        counts["total"] = counts["announcements"] + counts["messages"]
+        cache.set(key, counts, UNREAD_CACHE_TIMEOUT)
+    return counts
+
+
+def invalidate_unread_counts(*users):
+    cache.delete_many([_unread_key(user.pk) for user in users if user is not None])
+
+
+def invalidate_all_unread_counts():
+    bump_version(ANNOUNCEMENTS_VERSION)
+
+
+# Gelesen-Status der Ankündigungen: eine Marke "alles bis hier gelesen" pro
+# Benutzer, einzeln gelesene neuere Ankündigungen bleiben als Ausnahmen in
+# read_by. Der Zähler der ungelesenen Ankündigungen wird bei jeder Änderung
+# direkt angepasst statt neu gezählt.
+def _count_unread(user, read_until):
+    return (
+        Announcement.objects.filter(pk__gt=read_until)
+        .exclude(read_by=user)
+        .order_by()
+        .count()
+    )
+
+
+def get_read_state(user):
+    try:
+        return AnnouncementReadState.objects.get(user=user)
+    except AnnouncementReadState.DoesNotExist:
+        pass
+
+    try:
+        with transaction.atomic():
+            return AnnouncementReadState.objects.create(
+                user=user, unread_count=_count_unread(user, 0)
+            )
+    except IntegrityError:
+        return AnnouncementReadState.objects.get(user=user)
+
+
+def recount_unread_announcements(user):
+    state = get_read_state(user)
+    state.unread_count = _count_unread(user, state.read_until)
+    state.save(update_fields=["unread_count"])
+    invalidate_unread_counts(user)
+    return state
+
+
+def unread_announcements(user, state=None):
+    state = state or get_read_state(user)
+    return Announcement.objects.filter(pk__gt=state.read_until).exclude(read_by=user)
+
+
+def read_announcements(user, state=None):
+    state = state or get_read_state(user)
+    return Announcement.objects.filter(
+        Q(pk__lte=state.read_until) | Q(read_by=user)
+    ).distinct()
+
+
+def is_announcement_read(user, announcement, state=None):
+    state = state or get_read_state(user)
+    if announcement.pk <= state.read_until:
+        return True
+    return announcement.read_by.filter(pk=user.pk).exists()
+
+
+def announcement_published(announcement):
+    AnnouncementReadState.objects.filter(read_until__lt=announcement.pk).update(
+        unread_count=F("unread_count") + 1
+    )
+    invalidate_all_unread_counts()
+
+
+def announcement_deleted(announcement):
+    AnnouncementReadState.objects.filter(
+        read_until__lt=announcement.pk, unread_count__gt=0
+    ).exclude(user__in=announcement.read_by.all()).update(
+        unread_count=F("unread_count") - 1
+    )
+    invalidate_all_unread_counts()
+
+
+def mark_announcement_read(user, announcement):
+    state = get_read_state(user)
+    if is_announcement_read(user, announcement, state):
+        return
+
+    with transaction.atomic():
+        announcement.read_by.add(user)
+        AnnouncementReadState.objects.filter(user=user, unread_count__gt=0).update(
+            unread_count=F("unread_count") - 1
+        )
+    state.refresh_from_db(fields=["unread_count"])
+    if state.unread_count == 0:
+        # Alles gelesen: die Marke nachziehen und die Ausnahmen aufräumen.
+        mark_all_announcements_read(user)
+    else:
+        invalidate_unread_counts(user)
+
+
+def mark_all_announcements_read(user):
+    state = get_read_state(user)
+    latest = Announcement.objects.aggregate(latest=Max("pk"))["latest"]
+    read_until = max(latest or 0, state.read_until)
+    with transaction.atomic():
+        AnnouncementReadState.objects.filter(user=user).update(
+            read_until=read_until, unread_count=0
+        )
+        Announcement.read_by.through.objects.filter(
+            user_id=user.pk, announcement_id__lte=read_until
+        ).delete()
+    invalidate_unread_counts(user)
+
+
+def _announcement_pre_delete(sender, instance, **kwargs):
+    announcement_deleted(instance)
+
+
+def connect_signals():
+    pre_delete.connect(
+        _announcement_pre_delete,
+        sender=Announcement,
+        dispatch_uid="communication.unread.announcement_pre_delete",
+    )
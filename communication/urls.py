@@ -1,6 +1,7 @@
 from django.urls import path
 
 from communication.views import (
+    AnnouncementsReadView,
     AnnouncementsView,
     AnnouncementView,
     ArchiveMessageView,
@@ -8,9 +9,12 @@ from communication.views import (
     CreateAnnouncementsView,
     CreateMessageView,
     InboxMessageView,
+    InboxReadView,
     InboxView,
+    MessageSearchView,
     OutboxMessageView,
     OutboxView,
+    RecipientsView,
     SelectUserView,
 )
 
@@ -21,11 +25,19 @@ urlpatterns = [
         CreateAnnouncementsView.as_view(),
         name="announcement_create",
     ),
+    path(
+        "announcements/read",
+        AnnouncementsReadView.as_view(),
+        name="announcements_read",
+    ),
     path("announcements/<int:pk>", AnnouncementView.as_view(), name="announcement"),
     path("inbox", InboxView.as_view(), name="inbox"),
+    path("inbox/read", InboxReadView.as_view(), name="inbox_read"),
     path("inbox/send", SelectUserView.as_view(), name="select"),
+    path("inbox/recipients", RecipientsView.as_view(), name="recipients"),
     path("inbox/send/<int:pk>", CreateMessageView.as_view(), name="message_create"),
     path("inbox/<int:pk>", InboxMessageView.as_view(), name="inbox_message"),
+    path("search", MessageSearchView.as_view(), name="message_search"),
     path("outbox/", OutboxView.as_view(), name="outbox"),
     path("outbox/<int:pk>", OutboxMessageView.as_view(), name="outbox_message"),
     path("archive/", ArchiveView.as_view(), name="archive"),
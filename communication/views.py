@@ -2,17 +2,30 @@ from typing import Any
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Case, CharField, F, Q, Value, When
-from django.db.models.functions import Lower
 from django.db.models.query import QuerySet
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
 from django.views import generic
 
-from administration.models import Log
-from authentication.models import OfficeSync
-from communication.models import Announcement, Message, Signature
+from administration.audit import write_log
+from administration.pagination import paginate_keyset
+from authentication.autocomplete import AUTOCOMPLETE_LIMIT, search_recipients
+from authentication.directory import paginate_directory, search_directory
+from authentication.singletons import get_officesync, get_signature
+from communication.models import Announcement, Message
+from communication.search import SEARCH_BOXES, search_messages
+from communication.unread import (
+    announcement_published,
+    invalidate_unread_counts,
+    is_announcement_read,
+    mark_all_announcements_read,
+    mark_announcement_read,
+    read_announcements,
+    unread_announcements,
+)
 
 User = get_user_model()
 
@@ -26,42 +39,22 @@ class AnnouncementsView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
             context["unread_announcements"] = self.get_unread_announcements()
             context["read_announcements"] = self.get_read_announcements()
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
 
         return context
 
     def get_unread_announcements(self):
-        return self.model.objects.exclude(read_by=self.request.user)
+        return unread_announcements(self.request.user)
 
     def get_read_announcements(self):
-        return self.model.objects.filter(read_by=self.request.user)
+        return read_announcements(self.request.user)
 
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
-
 
 class CreateAnnouncementsView(LoginRequiredMixin, generic.CreateView):
     model = Announcement
@@ -73,13 +66,14 @@ class CreateAnnouncementsView(LoginRequiredMixin, generic.CreateView):
         form.instance.created_at = timezone.now()
         response = super().form_valid(form)
 
-        Log.objects.create(
+        write_log(
             user=self.request.user,
             action="CREATE",
             category="COMMUNICATION",
             content_object=self.object,
             message=f'@{self.request.user} hat eine Ankündigung "{self.object.title}" veröffentlicht.',
         )
+        announcement_published(self.object)
 
         return response
 
@@ -88,36 +82,12 @@ class CreateAnnouncementsView(LoginRequiredMixin, generic.CreateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
-        if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+        context["officesync"] = get_officesync()
         return context
 
-    def get_unread_announcements(self):
-        return self.model.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
-
 
 class AnnouncementView(LoginRequiredMixin, generic.DetailView):
     model = Announcement
@@ -126,47 +96,28 @@ class AnnouncementView(LoginRequiredMixin, generic.DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
-            context["signature"] = Signature.objects.first()
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["signature"] = get_signature()
             context["show_read_button"] = not self.has_been_read_by(self.request.user)
         return context
 
     def has_been_read_by(self, user):
-        announcement = self.get_object()
-        return announcement.read_by.filter(id=user.id).exists()
-
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
+        return is_announcement_read(user, self.object)
 
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
     def post(self, request, *args, **kwargs):
         announcement = self.get_object()
-        announcement.read_by.add(request.user)
-        announcement.save()
+        mark_announcement_read(request.user, announcement)
         return redirect(reverse("announcement", kwargs={"pk": announcement.pk}))
 
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
 
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
+class AnnouncementsReadView(LoginRequiredMixin, generic.View):
+    def post(self, request, *args, **kwargs):
+        mark_all_announcements_read(request.user)
+        return redirect("announcements")
 
 
 class InboxView(LoginRequiredMixin, generic.ListView):
@@ -182,42 +133,24 @@ class InboxView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
+            page = paginate_keyset(
+                self.object_list, self.request.GET.get("cursor"), field="created_at"
+            )
+            context["messages"] = page
+            if page.has_next:
+                context["next_query"] = page.next_query(self.request.GET)
             context["unread_messages"] = self.get_unread_messages()
             context["read_messages"] = self.get_read_messages()
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_message_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return self.get_queryset().filter(receiver_read=False)
 
     def get_read_messages(self):
         return self.get_queryset().filter(receiver_read=True)
 
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
-
 
 class InboxMessageView(LoginRequiredMixin, generic.DetailView):
     model = Message
@@ -231,47 +164,58 @@ class InboxMessageView(LoginRequiredMixin, generic.DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
-            context["signature"] = Signature.objects.first()
+            context["signature"] = get_signature()
             context["unread_messages"] = self.get_unread_messages()
             context["read_messages"] = self.get_read_messages()
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
         return context
 
     def post(self, request, *args, **kwargs):
         message = self.get_object()
         message.receiver_read = True
         message.save()
+        invalidate_unread_counts(request.user)
         return redirect(reverse("archive_message", kwargs={"pk": message.pk}))
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return self.get_queryset().filter(receiver_read=False)
 
     def get_read_messages(self):
         return self.get_queryset().filter(receiver_read=True)
 
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
 
-            if not request.user.advanced.terms:
-                return redirect("terms")
+class InboxReadView(LoginRequiredMixin, generic.View):
+    def post(self, request, *args, **kwargs):
+        messages = Message.objects.filter(receiver=request.user, receiver_read=False)
+        if not request.POST.get("all"):
+            selected = [pk for pk in request.POST.getlist("selected") if pk.isdigit()]
+            messages = messages.filter(pk__in=selected)
+        if messages.update(receiver_read=True):
+            invalidate_unread_counts(request.user)
+        return redirect("inbox")
+
 
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
+class MessageSearchView(LoginRequiredMixin, generic.TemplateView):
+    template_name = "pages/search/search.html"
 
-        return super().dispatch(request, *args, **kwargs)
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["officesync"] = get_officesync()
+        if self.request.user.is_authenticated:
+            query = self.request.GET.get("q", "")
+            box = self.request.GET.get("box", "inbox")
+            if box not in SEARCH_BOXES:
+                box = "inbox"
+            page = search_messages(
+                self.request.user, query, box, self.request.GET.get("cursor")
+            )
+            context["search_query"] = query
+            context["box"] = box
+            context["results"] = page
+            if page.has_next:
+                context["next_query"] = page.next_query(self.request.GET)
+        return context
 
 
 class SelectUserView(LoginRequiredMixin, generic.ListView):
@@ -280,74 +224,42 @@ class SelectUserView(LoginRequiredMixin, generic.ListView):
     context_object_name = "users"
 
     def get_queryset(self):
-        queryset = User.objects.all()
-
-        search_query = self.request.GET.get("search", "")
-
-        if search_query:
-            search_terms = search_query.split()
-            q_objects = Q()
-            for term in search_terms:
-                q_objects |= (
-                    Q(first_name__icontains=term)
-                    | Q(last_name__icontains=term)
-                    | Q(username__icontains=term)
-                )
-            queryset = queryset.filter(q_objects)
-
-        # Sortierung der Benutzer ähnlich wie in Beispiel 1
-        queryset = queryset.annotate(
-            role_name_order=Case(
-                When(advanced__role__name__isnull=True, then=Value("ZZZZZZZZ")),
-                default=F("advanced__role__name"),
-                output_field=CharField(),
-            )
-        ).order_by(
-            Lower("role_name_order"),
-            Lower("first_name"),
-            Lower("last_name"),
-            Lower("username"),
-        )
-
-        return queryset
+        return search_directory(self.request.GET.get("search", ""))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
+            page = paginate_directory(self.object_list, self.request.GET.get("cursor"))
+            context["users"] = page
+            if page.has_next:
+                context["next_query"] = page.next_query(self.request.GET)
             context["unread_messages"] = self.get_unread_messages()
             context["read_messages"] = self.get_read_messages()
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
             context["search_query"] = self.request.GET.get("search", "")
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
     def get_read_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
 
-            if not request.user.advanced.terms:
-                return redirect("terms")
+class RecipientsView(LoginRequiredMixin, generic.View):
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = int(request.GET.get("limit", AUTOCOMPLETE_LIMIT))
+        except ValueError:
+            limit = AUTOCOMPLETE_LIMIT
 
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
+        results = search_recipients(request.GET.get("q", ""), limit)
+        for result in results:
+            result["url"] = reverse("message_create", kwargs={"pk": result["id"]})
 
-        return super().dispatch(request, *args, **kwargs)
+        response = JsonResponse({"results": results})
+        patch_cache_control(response, private=True, max_age=60)
+        return response
 
 
 class CreateMessageView(LoginRequiredMixin, generic.CreateView):
@@ -363,49 +275,28 @@ class CreateMessageView(LoginRequiredMixin, generic.CreateView):
 
         form.instance.sender = self.request.user
         form.instance.created_at = timezone.now()
+        response = super().form_valid(form)
+        invalidate_unread_counts(receiver)
 
-        return super().form_valid(form)
+        return response
 
     def get_success_url(self):
         return reverse_lazy("inbox")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
             context["unread_messages"] = self.get_unread_messages()
             context["read_messages"] = self.get_read_messages()
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
     def get_read_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
-
 
 class OutboxView(LoginRequiredMixin, generic.ListView):
     model = Message
@@ -418,41 +309,24 @@ class OutboxView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
+            page = paginate_keyset(
+                self.object_list, self.request.GET.get("cursor"), field="created_at"
+            )
+            context["messages"] = page
+            if page.has_next:
+                context["next_query"] = page.next_query(self.request.GET)
             context["unread_messages"] = self.get_unread_messages()
             context["read_messages"] = self.get_read_messages()
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
     def get_read_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
-
 
 class OutboxMessageView(LoginRequiredMixin, generic.DetailView):
     model = Message
@@ -461,42 +335,19 @@ class OutboxMessageView(LoginRequiredMixin, generic.DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
-            context["signature"] = Signature.objects.first()
+            context["signature"] = get_signature()
             context["unread_messages"] = self.get_unread_messages()
             context["read_messages"] = self.get_read_messages()
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
     def get_read_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
-
 
 class ArchiveView(LoginRequiredMixin, generic.ListView):
     model = Message
@@ -511,41 +362,24 @@ class ArchiveView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
+            page = paginate_keyset(
+                self.object_list, self.request.GET.get("cursor"), field="created_at"
+            )
+            context["messages"] = page
+            if page.has_next:
+                context["next_query"] = page.next_query(self.request.GET)
             context["unread_messages"] = self.get_unread_messages()
             context["read_messages"] = self.get_read_messages()
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
     def get_read_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
-
 
 class ArchiveMessageView(LoginRequiredMixin, generic.DetailView):
     model = Message
@@ -554,38 +388,15 @@ class ArchiveMessageView(LoginRequiredMixin, generic.DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
-            context["signature"] = Signature.objects.first()
+            context["signature"] = get_signature()
             context["unread_messages"] = self.get_unread_messages()
             context["read_messages"] = self.get_read_messages()
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
     def get_read_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
-
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
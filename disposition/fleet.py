@@ -0,0 +1,109 @@
+from collections import defaultdict
+
+from django.db.models import Count, Q
+
+from administration.pagination import PAGE_SIZE, paginate_keyset
+
+from .models import Vehicle, normalize_identifier
+
+# Fahrzeugliste mit Filtern, Sortierung und Blättern über den Index. Die
+# Zahlen pro Typ, Kraftstoff, Zustand und Hersteller kommen aus einer
+# einzigen GROUP BY-Abfrage über diese Spalten. Jede Facette zählt unter den
+# übrigen Filtern, damit auch nicht gewählte Werte ihre Trefferzahl zeigen.
+FACETS = ["type", "fuel_type", "condition", "manufacturer"]
+SORT_FIELDS = ["license_plate", "manufacturer", "year_of_manufacturer"]
+LIST_FIELDS = ["license_plate", "type", "model", "manufacturer", "year_of_manufacturer"]
+
+
+def _year(value):
+    try:
+        return int(value or 0) or None
+    except ValueError:
+        return None
+
+
+def parse_filters(params):
+    return {
+        "search": (params.get("search") or "").strip(),
+        "type": params.get("type") or None,
+        "fuel_type": params.get("fuel_type") or None,
+        "condition": params.get("condition") or None,
+        "manufacturer": params.get("manufacturer") or None,
+        "year_from": _year(params.get("year_from")),
+        "year_to": _year(params.get("year_to")),
+    }
+
+
+def parse_sort(params):
+    sort = params.get("sort") or ""
+    field = sort.lstrip("-")
+    if field not in SORT_FIELDS:
+        return SORT_FIELDS[0], False
+    return field, sort.startswith("-")
+
+
+def _base_vehicles(filters):
+    vehicles = Vehicle.objects.all()
+    if filters["search"]:
+        # Kennzeichen und Identifikationsnummer über den eindeutigen Schlüssel.
+        key = normalize_identifier(filters["search"])
+        if key is None:
+            return vehicles.none()
+        vehicles = vehicles.filter(Q(license_plate_key=key) | Q(vin_key=key))
+    if filters["year_from"]:
+        vehicles = vehicles.filter(year_of_manufacturer__gte=filters["year_from"])
+    if filters["year_to"]:
+        vehicles = vehicles.filter(year_of_manufacturer__lte=filters["year_to"])
+    return vehicles
+
+
+def filter_vehicles(filters):
+    return _base_vehicles(filters).filter(
+        **{facet: filters[facet] for facet in FACETS if filters[facet]}
+    )
+
+
+def get_facets(filters):
+    rows = (
+        _base_vehicles(filters).values(*FACETS).annotate(count=Count("pk")).order_by()
+    )
+    counts = {facet: defaultdict(int) for facet in FACETS}
+    for row in rows:
+        for facet in FACETS:
+            if all(
+                not filters[other] or row[other] == filters[other]
+                for other in FACETS
+                if other != facet
+            ):
+                counts[facet][row[facet]] += row["count"]
+
+    facets = {}
+    for facet in FACETS:
+        field = Vehicle._meta.get_field(facet)
+        # Ein gewählter Wert bleibt auch ohne Treffer sichtbar und abwählbar.
+        values = set(counts[facet])
+        if filters[facet]:
+            values.add(filters[facet])
+        choices = field.choices or [(value, value) for value in sorted(values)]
+        facets[facet] = [
+            {
+                "value": value,
+                "label": label,
+                "count": counts[facet].get(value, 0),
+                "selected": value == filters[facet],
+            }
+            for value, label in choices
+            if counts[facet].get(value) or value == filters[facet]
+        ]
+    return facets
+
+
+def paginate_vehicles(vehicles, cursor=None, sort=None, per_page=PAGE_SIZE):
+    field, descending = sort or (SORT_FIELDS[0], False)
+    return paginate_keyset(
+        vehicles.only(*LIST_FIELDS),
+        cursor,
+        field=field,
+        per_page=per_page,
+        descending=descending,
+    )
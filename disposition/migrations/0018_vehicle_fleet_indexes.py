@@ -0,0 +1,66 @@
+# Generated by Django 3.2.8 on 2026-10-17 21:20
+
+import re
+
+from django.db import migrations, models
+
+
+def fill_identifier_keys(apps, schema_editor):
+    # Bereits doppelt erfasste Kennzeichen oder Nummern behalten nur beim
+    # ältesten Fahrzeug einen Schlüssel.
+    Vehicle = apps.get_model("disposition", "Vehicle")
+
+    def normalize(value):
+        return re.sub(r"[\s.\-_/]+", "", value or "").upper() or None
+
+    license_plate_keys, vin_keys = set(), set()
+    vehicles = list(Vehicle.objects.order_by("pk"))
+    for vehicle in vehicles:
+        license_plate_key = normalize(vehicle.license_plate)
+        if license_plate_key not in license_plate_keys:
+            vehicle.license_plate_key = license_plate_key
+            license_plate_keys.add(license_plate_key)
+        vin_key = normalize(vehicle.vin)
+        if vin_key not in vin_keys:
+            vehicle.vin_key = vin_key
+            vin_keys.add(vin_key)
+    Vehicle.objects.bulk_update(
+        vehicles, ["license_plate_key", "vin_key"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('disposition', '0017_auto_20240210_2300'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicle',
+            name='license_plate_key',
+            field=models.CharField(editable=False, max_length=20, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='vin_key',
+            field=models.CharField(editable=False, max_length=20, null=True, unique=True),
+        ),
+        migrations.RunPython(fill_identifier_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['type', 'fuel_type', 'condition'], name='vehicle_facet_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['manufacturer', 'year_of_manufacturer'], name='vehicle_manufacturer_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['year_of_manufacturer'], name='vehicle_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['license_plate'], name='vehicle_license_plate_idx'),
+        ),
+    ]
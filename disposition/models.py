@@ -1,9 +1,20 @@
+import re
+
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
 # Create your models here.
 
+IDENTIFIER_SEPARATORS = re.compile(r"[\s.\-_/]+")
+
+
+def normalize_identifier(value):
+    # "zh 123-456" und "ZH123456" sind dasselbe Kennzeichen, gespeichert und
+    # gesucht wird die Schreibweise ohne Trennzeichen in Grossbuchstaben.
+    return IDENTIFIER_SEPARATORS.sub("", value or "").upper() or None
+
 
 class Station(models.Model):
     name = models.CharField(max_length=30)
@@ -104,6 +115,53 @@ class Vehicle(models.Model):
         default=Condition.UNUSED,
         verbose_name=_("Zustand"),
     )
+    # Normalisierte Schlüssel für die Suche nach Kennzeichen und
+    # Identifikationsnummer, eindeutig und damit ein Treffer über den Index.
+    license_plate_key = models.CharField(
+        max_length=20, unique=True, null=True, editable=False
+    )
+    vin_key = models.CharField(max_length=20, unique=True, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["type", "fuel_type", "condition"],
+                name="vehicle_facet_idx",
+            ),
+            models.Index(
+                fields=["manufacturer", "year_of_manufacturer"],
+                name="vehicle_manufacturer_year_idx",
+            ),
+            models.Index(fields=["year_of_manufacturer"], name="vehicle_year_idx"),
+            models.Index(fields=["license_plate"], name="vehicle_license_plate_idx"),
+        ]
+
+    def clean(self):
+        super().clean()
+        errors = {}
+        duplicates = Vehicle.objects.exclude(pk=self.pk)
+        license_plate_key = normalize_identifier(self.license_plate)
+        if (
+            license_plate_key
+            and duplicates.filter(license_plate_key=license_plate_key).exists()
+        ):
+            errors["license_plate"] = _("Dieses Kennzeichen ist bereits erfasst.")
+        vin_key = normalize_identifier(self.vin)
+        if vin_key and duplicates.filter(vin_key=vin_key).exists():
+            errors["vin"] = _("Diese Identifikationsnummer ist bereits erfasst.")
+        if errors:
+            raise ValidationError(errors)
+
+    def save(self, *args, **kwargs):
+        self.license_plate_key = normalize_identifier(self.license_plate)
+        self.vin_key = normalize_identifier(self.vin)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = set(update_fields) | {
+                "license_plate_key",
+                "vin_key",
+            }
+        super().save(*args, **kwargs)
 
 
 class VehicleData(models.Model):
@@ -1,3 +1,39 @@
 from django.test import TestCase
 
-# Create your tests here.
+from .fleet import get_facets, paginate_vehicles, parse_filters
+from .models import Vehicle
+
+
+class FleetTests(TestCase):
+    def setUp(self):
+        for number, manufacturer in enumerate(["Audi", "Audi", "Volvo"]):
+            Vehicle.objects.create(
+                license_plate=f"ZH {number}",
+                model="Modell",
+                manufacturer=manufacturer,
+                vin=f"VIN{number}",
+                capacity="500",
+                fuel_consumption="7",
+            )
+
+    def manufacturers(self, **params):
+        return {
+            choice["value"]: (choice["count"], choice["selected"])
+            for choice in get_facets(parse_filters(params))["manufacturer"]
+        }
+
+    def test_manufacturer_counts(self):
+        self.assertEqual(
+            self.manufacturers(), {"Audi": (2, False), "Volvo": (1, False)}
+        )
+
+    def test_selected_manufacturer_without_hits_stays_visible(self):
+        self.assertEqual(
+            self.manufacturers(manufacturer="Saab"),
+            {"Audi": (2, False), "Saab": (0, True), "Volvo": (1, False)},
+        )
+
+    def test_bad_cursor_starts_from_first_page(self):
+        page = paginate_vehicles(Vehicle.objects.all(), "garbage", per_page=2)
+        self.assertEqual([vehicle.license_plate for vehicle in page], ["ZH 0", "ZH 1"])
+        self.assertTrue(page.has_next)
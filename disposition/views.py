@@ -5,9 +5,17 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
 from django.views import generic
 
-from administration.models import Log
-from authentication.models import OfficeSync
-from communication.models import Announcement, Message
+from administration.audit import write_log
+from administration.permissions import has_permission
+from authentication.singletons import get_officesync
+from communication.models import Message
+from disposition.fleet import (
+    filter_vehicles,
+    get_facets,
+    paginate_vehicles,
+    parse_filters,
+    parse_sort,
+)
 from disposition.models import Station, Tour, Vehicle
 
 # Create your views here.
@@ -20,20 +28,9 @@ class ToursView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
-        if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+        context["officesync"] = get_officesync()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -41,21 +38,10 @@ class ToursView(LoginRequiredMixin, generic.ListView):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
     def has_disposition_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.access"
-        ).exists()
+        return has_permission(user, "disposition.access")
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_disposition_access(request.user):
                 return redirect("denied")
 
@@ -69,34 +55,20 @@ class LocationsView(LoginRequiredMixin, generic.ListView):
     context_object_name = "stations"
 
     def has_disposition_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.access"
-        ).exists()
+        return has_permission(user, "disposition.access")
 
     def has_create_location_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.location.create"
-        ).exists()
+        return has_permission(user, "disposition.location.create")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
             context["has_create_location_permission"] = (
                 self.has_create_location_permission(self.request.user)
             )
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -105,15 +77,6 @@ class LocationsView(LoginRequiredMixin, generic.ListView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_disposition_access(request.user):
                 return redirect("denied")
 
@@ -140,7 +103,7 @@ class CreateLocationView(LoginRequiredMixin, generic.CreateView):
     def form_valid(self, form):
         response = super().form_valid(form)
 
-        Log.objects.create(
+        write_log(
             user=self.request.user,
             action="CREATE",
             category="DISPOSITION",
@@ -151,31 +114,16 @@ class CreateLocationView(LoginRequiredMixin, generic.CreateView):
         return response
 
     def has_disposition_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.access"
-        ).exists()
+        return has_permission(user, "disposition.access")
 
     def has_create_location_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.location.create"
-        ).exists()
+        return has_permission(user, "disposition.location.create")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
-        if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+        context["officesync"] = get_officesync()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -184,15 +132,6 @@ class CreateLocationView(LoginRequiredMixin, generic.CreateView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_disposition_access(request.user):
                 return redirect("denied")
 
@@ -217,29 +156,17 @@ class LocationDetailView(LoginRequiredMixin, generic.DetailView):
     template_name = "pages/stations/station.html"
 
     def has_update_location_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.location.update"
-        ).exists()
+        return has_permission(user, "disposition.location.update")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
             context["has_update_location_permission"] = (
                 self.has_update_location_permission(self.request.user)
             )
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -247,21 +174,10 @@ class LocationDetailView(LoginRequiredMixin, generic.DetailView):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
     def has_disposition_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.access"
-        ).exists()
+        return has_permission(user, "disposition.access")
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_disposition_access(request.user):
                 return redirect("denied")
 
@@ -288,7 +204,7 @@ class UpdateLocationView(LoginRequiredMixin, generic.UpdateView):
     def form_valid(self, form):
         response = super().form_valid(form)
 
-        Log.objects.create(
+        write_log(
             user=self.request.user,
             action="UPDATE",
             category="DISPOSITION",
@@ -299,39 +215,23 @@ class UpdateLocationView(LoginRequiredMixin, generic.UpdateView):
         return response
 
     def has_disposition_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.access"
-        ).exists()
+        return has_permission(user, "disposition.access")
 
     def has_update_location_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.location.update"
-        ).exists()
+        return has_permission(user, "disposition.location.update")
 
     def has_delete_location_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.location.delete"
-        ).exists()
+        return has_permission(user, "disposition.location.delete")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
             context["has_delete_location_permission"] = (
                 self.has_delete_location_permission(self.request.user)
             )
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -340,15 +240,6 @@ class UpdateLocationView(LoginRequiredMixin, generic.UpdateView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_disposition_access(request.user):
                 return redirect("denied")
 
@@ -374,7 +265,7 @@ class StationDeleteView(LoginRequiredMixin, generic.DeleteView):
         old_station_name = station.name
 
         # Create the log entry
-        Log.objects.create(
+        write_log(
             user=request.user,
             action="DELETE",
             category="DISPOSITION",
@@ -388,31 +279,16 @@ class StationDeleteView(LoginRequiredMixin, generic.DeleteView):
         return HttpResponseRedirect(reverse_lazy("stations"))
 
     def has_disposition_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.access"
-        ).exists()
+        return has_permission(user, "disposition.access")
 
     def has_delete_location_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.location.delete"
-        ).exists()
+        return has_permission(user, "disposition.location.delete")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
-        if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+        context["officesync"] = get_officesync()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -421,15 +297,6 @@ class StationDeleteView(LoginRequiredMixin, generic.DeleteView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_disposition_access(request.user):
                 return redirect("denied")
 
@@ -445,35 +312,35 @@ class VehiclesView(LoginRequiredMixin, generic.ListView):
     template_name = "pages/vehicles/index.html"
     context_object_name = "vehicles"
 
+    def get_queryset(self):
+        self.filters = parse_filters(self.request.GET)
+        return filter_vehicles(self.filters)
+
     def has_disposition_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.access"
-        ).exists()
+        return has_permission(user, "disposition.access")
 
     def has_create_vehicle_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.vehicle.create"
-        ).exists()
+        return has_permission(user, "disposition.vehicle.create")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
             context["has_create_vehicle_permission"] = (
                 self.has_create_vehicle_permission(self.request.user)
             )
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
+            sort = parse_sort(self.request.GET)
+            page = paginate_vehicles(
+                self.object_list, self.request.GET.get("cursor"), sort
             )
+            context["vehicles"] = page
+            if page.has_next:
+                context["next_query"] = page.next_query(self.request.GET)
+            context["filters"] = self.filters
+            context["facets"] = get_facets(self.filters)
+            context["sort_query"] = f"{'-' if sort[1] else ''}{sort[0]}"
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -482,15 +349,6 @@ class VehiclesView(LoginRequiredMixin, generic.ListView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_disposition_access(request.user):
                 return redirect("denied")
 
@@ -522,7 +380,7 @@ class CreateVehicleView(LoginRequiredMixin, generic.CreateView):
     def form_valid(self, form):
         response = super().form_valid(form)
 
-        Log.objects.create(
+        write_log(
             user=self.request.user,
             action="CREATE",
             category="DISPOSITION",
@@ -533,31 +391,16 @@ class CreateVehicleView(LoginRequiredMixin, generic.CreateView):
         return response
 
     def has_disposition_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.access"
-        ).exists()
+        return has_permission(user, "disposition.access")
 
     def has_create_vehicle_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.vehicle.create"
-        ).exists()
+        return has_permission(user, "disposition.vehicle.create")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
-        if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+        context["officesync"] = get_officesync()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -566,15 +409,6 @@ class CreateVehicleView(LoginRequiredMixin, generic.CreateView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_disposition_access(request.user):
                 return redirect("denied")
 
@@ -604,34 +438,20 @@ class VehicleDetailView(LoginRequiredMixin, generic.DetailView):
     template_name = "pages/vehicles/vehicle.html"
 
     def has_disposition_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.access"
-        ).exists()
+        return has_permission(user, "disposition.access")
 
     def has_update_vehicle_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.vehicle.update"
-        ).exists()
+        return has_permission(user, "disposition.vehicle.update")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
             context["has_update_vehicle_permission"] = (
                 self.has_update_vehicle_permission(self.request.user)
             )
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -640,15 +460,6 @@ class VehicleDetailView(LoginRequiredMixin, generic.DetailView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_disposition_access(request.user):
                 return redirect("denied")
 
@@ -679,7 +490,7 @@ class UpdateVehicleView(LoginRequiredMixin, generic.UpdateView):
     def form_valid(self, form):
         response = super().form_valid(form)
 
-        Log.objects.create(
+        write_log(
             user=self.request.user,
             action="CREATE",
             category="DISPOSITION",
@@ -690,39 +501,23 @@ class UpdateVehicleView(LoginRequiredMixin, generic.UpdateView):
         return response
 
     def has_disposition_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.access"
-        ).exists()
+        return has_permission(user, "disposition.access")
 
     def has_update_vehicle_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.vehicle.update"
-        ).exists()
+        return has_permission(user, "disposition.vehicle.update")
 
     def has_delete_vehicle_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.vehicle.delete"
-        ).exists()
+        return has_permission(user, "disposition.vehicle.delete")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
+        context["officesync"] = get_officesync()
         if self.request.user.is_authenticated:
             context["has_delete_vehicle_permission"] = (
                 self.has_delete_vehicle_permission(self.request.user)
             )
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -731,15 +526,6 @@ class UpdateVehicleView(LoginRequiredMixin, generic.UpdateView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_disposition_access(request.user):
                 return redirect("denied")
 
@@ -765,7 +551,7 @@ class VehicleDeleteView(LoginRequiredMixin, generic.DeleteView):
         old_vehicle_name = vehicle.license_plate
 
         # Create the log entry
-        Log.objects.create(
+        write_log(
             user=request.user,
             action="DELETE",
             category="DISPOSITION",
@@ -779,31 +565,16 @@ class VehicleDeleteView(LoginRequiredMixin, generic.DeleteView):
         return HttpResponseRedirect(reverse_lazy("vehicles"))
 
     def has_disposition_access(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.access"
-        ).exists()
+        return has_permission(user, "disposition.access")
 
     def has_delete_vehicle_permission(self, user):
-        return user.advanced.role.permissions.filter(
-            permission="disposition.vehicle.delete"
-        ).exists()
+        return has_permission(user, "disposition.vehicle.delete")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = OfficeSync.objects.first()
-        if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+        context["officesync"] = get_officesync()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -812,15 +583,6 @@ class VehicleDeleteView(LoginRequiredMixin, generic.DeleteView):
 
     def dispatch(self, request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
             if not self.has_disposition_access(request.user):
                 return redirect("denied")
 
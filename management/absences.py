@@ -0,0 +1,296 @@
+import calendar
+import datetime
+import json
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.functional import cached_property
+
+from administration.streaming import buffered
+from authentication.models import Absence, AdvancedUser
+
+User = get_user_model()
+
+# Abwesenheitskalender für die Planung. Überlappende Abwesenheiten kommen mit
+# einer Abfrage über den (start, end)-Index, der Rest läuft als Sweep-Line im
+# Speicher: je Person werden die Zeiträume zusammengeführt, dann ergibt eine
+# Differenzliste über die Tage die Zahl der Abwesenden pro Tag.
+CALENDAR_MAX_DAYS = 366
+CALENDAR_EXPORT_CHUNK_SIZE = 2000
+ONE_DAY = datetime.timedelta(days=1)
+
+EVENT_FIELDS = [
+    "id",
+    "recipient_id",
+    "recipient__username",
+    "recipient__first_name",
+    "recipient__last_name",
+    "type",
+    "confirmation",
+    "start",
+    "end",
+]
+
+
+def _parse(value):
+    try:
+        return parse_date(value or "")
+    except ValueError:
+        return None
+
+
+def parse_range(params):
+    today = timezone.localdate()
+    start = _parse(params.get("start")) or today.replace(day=1)
+    end = _parse(params.get("end"))
+    if end is None:
+        end = start.replace(day=calendar.monthrange(start.year, start.month)[1])
+    if end < start:
+        start, end = end, start
+    # Längere Zeiträume werden abgeschnitten.
+    return start, min(end, start + datetime.timedelta(days=CALENDAR_MAX_DAYS - 1))
+
+
+def parse_role(params):
+    try:
+        return int(params.get("role") or 0) or None
+    except ValueError:
+        return None
+
+
+def get_absences(start, end, role_id=None):
+    absences = Absence.objects.filter(start__lte=end, end__gte=start).exclude(
+        confirmation=Absence.Confirmation.REJECTED
+    )
+    if role_id:
+        absences = absences.filter(recipient__advanced__role_id=role_id)
+    return absences
+
+
+def merge_intervals(intervals):
+    # Überlappende oder direkt aneinander anschließende Abwesenheiten
+    # derselben Person zählen als ein Zeitraum.
+    by_recipient = defaultdict(list)
+    for _, recipient_id, start, end in intervals:
+        if recipient_id is not None:
+            by_recipient[recipient_id].append((start, end))
+
+    merged = []
+    for recipient_id, periods in by_recipient.items():
+        periods.sort()
+        current_start, current_end = periods[0]
+        for start, end in periods[1:]:
+            if start <= current_end + ONE_DAY:
+                current_end = max(current_end, end)
+                continue
+            merged.append((recipient_id, current_start, current_end))
+            current_start, current_end = start, end
+        merged.append((recipient_id, current_start, current_end))
+    return merged
+
+
+def count_per_day(intervals, start, end):
+    days = (end - start).days + 1
+    changes = [0] * (days + 1)
+    for _, first, last in merge_intervals(intervals):
+        first, last = max(first, start), min(last, end)
+        if first > last:
+            continue
+        changes[(first - start).days] += 1
+        changes[(last - start).days + 1] -= 1
+
+    counts = []
+    running = 0
+    for change in changes[:days]:
+        running += change
+        counts.append(running)
+    return counts
+
+
+def find_conflicts(intervals):
+    # Doppelt erfasste Abwesenheiten: Zeiträume derselben Person, die sich
+    # überschneiden.
+    by_recipient = defaultdict(list)
+    for pk, recipient_id, start, end in intervals:
+        if recipient_id is not None:
+            by_recipient[recipient_id].append((start, end, pk))
+
+    conflicts = []
+    for recipient_id, periods in by_recipient.items():
+        periods.sort()
+        active_end, active_pk = periods[0][1], periods[0][2]
+        for start, end, pk in periods[1:]:
+            if start <= active_end:
+                conflicts.append((recipient_id, active_pk, pk))
+            if end > active_end:
+                active_end, active_pk = end, pk
+    return conflicts
+
+
+class AbsenceCalendar:
+    def __init__(self, start, end, role_id=None):
+        self.start = start
+        self.end = end
+        self.role_id = role_id
+
+    @cached_property
+    def intervals(self):
+        return list(
+            get_absences(self.start, self.end, self.role_id).values_list(
+                "pk", "recipient_id", "start", "end"
+            )
+        )
+
+    @cached_property
+    def team_size(self):
+        if self.role_id:
+            return AdvancedUser.objects.filter(
+                role_id=self.role_id, user__is_active=True
+            ).count()
+        return User.objects.filter(is_active=True).count()
+
+    @cached_property
+    def days(self):
+        counts = count_per_day(self.intervals, self.start, self.end)
+        return [
+            {
+                "date": self.start + datetime.timedelta(days=offset),
+                "absent": absent,
+                "available": max(self.team_size - absent, 0),
+            }
+            for offset, absent in enumerate(counts)
+        ]
+
+    @cached_property
+    def conflicts(self):
+        return find_conflicts(self.intervals)
+
+    def understaffed(self, minimum):
+        return [day for day in self.days if day["available"] < minimum]
+
+    def absent_on(self, day):
+        return sorted(
+            {
+                recipient_id
+                for _, recipient_id, start, end in self.intervals
+                if recipient_id is not None and start <= day <= end
+            }
+        )
+
+
+def _events(start, end, role_id):
+    return (
+        get_absences(start, end, role_id)
+        .order_by("start", "pk")
+        .values_list(*EVENT_FIELDS)
+        .iterator(chunk_size=CALENDAR_EXPORT_CHUNK_SIZE)
+    )
+
+
+def _json_lines(absence_calendar):
+    days = [
+        {
+            "date": day["date"].isoformat(),
+            "absent": day["absent"],
+            "available": day["available"],
+        }
+        for day in absence_calendar.days
+    ]
+    yield json.dumps(
+        {
+            "start": absence_calendar.start.isoformat(),
+            "end": absence_calendar.end.isoformat(),
+            "team_size": absence_calendar.team_size,
+            "days": days,
+            "conflicts": [list(conflict) for conflict in absence_calendar.conflicts],
+        }
+    )[:-1]
+    yield ', "events": ['
+    separator = ""
+    for row in _events(
+        absence_calendar.start, absence_calendar.end, absence_calendar.role_id
+    ):
+        record = dict(zip(EVENT_FIELDS, row))
+        yield separator + json.dumps(
+            {
+                "id": record["id"],
+                "user_id": record["recipient_id"],
+                "username": record["recipient__username"],
+                "name": (
+                    f"{record['recipient__first_name'] or ''} "
+                    f"{record['recipient__last_name'] or ''}"
+                ).strip(),
+                "type": record["type"],
+                "confirmation": record["confirmation"],
+                "start": record["start"].isoformat(),
+                "end": record["end"].isoformat(),
+            },
+            ensure_ascii=False,
+        )
+        separator = ", "
+    yield "]}"
+
+
+def export_calendar_json(absence_calendar):
+    return buffered(_json_lines(absence_calendar))
+
+
+def _ical_text(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _ical_line(line):
+    # Zeilen über 75 Bytes werden nach RFC 5545 umbrochen.
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts = []
+    current = ""
+    size = 0
+    for char in line:
+        length = len(char.encode("utf-8"))
+        if size + length > (75 if not parts else 74):
+            parts.append(current)
+            current, size = "", 0
+        current += char
+        size += length
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _ical_lines(start, end, role_id):
+    stamp = timezone.now().strftime("%Y%m%dT%H%M%SZ")
+    yield _ical_line("BEGIN:VCALENDAR")
+    yield _ical_line("VERSION:2.0")
+    yield _ical_line("PRODID:-//OfficeSync//Abwesenheiten//DE")
+    yield _ical_line("CALSCALE:GREGORIAN")
+    for row in _events(start, end, role_id):
+        record = dict(zip(EVENT_FIELDS, row))
+        name = (
+            f"{record['recipient__first_name'] or ''} "
+            f"{record['recipient__last_name'] or ''}"
+        ).strip() or record["recipient__username"]
+        approved = record["confirmation"] == Absence.Confirmation.APPROVED
+        yield _ical_line("BEGIN:VEVENT")
+        yield _ical_line(f"UID:absence-{record['id']}@officesync")
+        yield _ical_line(f"DTSTAMP:{stamp}")
+        yield _ical_line(f"DTSTART;VALUE=DATE:{record['start']:%Y%m%d}")
+        yield _ical_line(f"DTEND;VALUE=DATE:{record['end'] + ONE_DAY:%Y%m%d}")
+        summary = _ical_text(f"{record['type']}: {name}")
+        yield _ical_line(f"SUMMARY:{summary}")
+        yield _ical_line(f"STATUS:{'CONFIRMED' if approved else 'TENTATIVE'}")
+        yield _ical_line("TRANSP:TRANSPARENT")
+        yield _ical_line("END:VEVENT")
+    yield _ical_line("END:VCALENDAR")
+
+
+def export_calendar_ical(start, end, role_id=None):
+    return buffered(_ical_lines(start, end, role_id))
@@ -1,3 +1,16 @@
 from django.contrib import admin
 
+from .models import (
+    PayrollSummary,
+    TimeDaily,
+    TimeEntry,
+    TimeMonthly,
+    VacationBalance,
+)
+
 # Register your models here.
+admin.site.register(PayrollSummary)
+admin.site.register(VacationBalance)
+admin.site.register(TimeEntry)
+admin.site.register(TimeDaily)
+admin.site.register(TimeMonthly)
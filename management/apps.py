@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'management'
+
+    def ready(self):
+        from . import payroll, performance, vacation
+
+        payroll.connect_signals()
+        performance.connect_signals()
+        vacation.connect_signals()
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from management.payroll import rebuild_payroll_summary
+
+
+class Command(BaseCommand):
+    help = "Rebuild the monthly payroll summary from all salaries"
+
+    def handle(self, *args, **options):
+        count = rebuild_payroll_summary()
+        self.stdout.write(
+            self.style.SUCCESS(f"Payroll: {count} summary rows rebuilt successfully.")
+        )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from management.timetracking import rebuild_time_tracking
+
+
+class Command(BaseCommand):
+    help = "Recalculate daily and monthly time roll-ups and overtime balances"
+
+    def handle(self, *args, **options):
+        count = rebuild_time_tracking()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Time tracking: {count} days recalculated successfully."
+            )
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from management.vacation import rebuild_vacation_balances
+
+
+class Command(BaseCommand):
+    help = "Recalculate the vacation balances from all approved vacation absences"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, help="Only recalculate this year")
+
+    def handle(self, *args, **options):
+        count = rebuild_vacation_balances(options["year"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Vacation: {count} balances recalculated successfully.")
+        )
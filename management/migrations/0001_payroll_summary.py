@@ -0,0 +1,93 @@
+# Generated by Django 3.2.8 on 2026-10-17 21:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+
+
+def populate_payroll_summary(apps, schema_editor):
+    # Einmalige Aggregation über alle bisherigen Lohnzahlungen, danach wird
+    # die Tabelle bei jeder Änderung nachgeführt.
+    Salary = apps.get_model("authentication", "Salary")
+    PayrollSummary = apps.get_model("management", "PayrollSummary")
+    totals = {
+        "total_amount": Coalesce(Sum("amount"), Value(0.0)),
+        "total_unconfirmed_amount": Coalesce(
+            Sum("amount", filter=Q(confirmation=False)), Value(0.0)
+        ),
+        "total_count": Count("pk"),
+        "total_unconfirmed_count": Count("pk", filter=Q(confirmation=False)),
+    }
+    salaries = Salary.objects.annotate(
+        month=TruncMonth("date", output_field=models.DateField())
+    ).order_by()
+
+    summaries = []
+    for scope, condition in (
+        ([], Q()),
+        (["role_id"], Q(role__isnull=False)),
+        (["recipient_id"], Q(recipient__isnull=False)),
+    ):
+        rows = salaries.filter(condition).values("month", *scope).annotate(**totals)
+        for row in rows:
+            summaries.append(
+                PayrollSummary(
+                    month=row["month"],
+                    role_id=row.get("role_id"),
+                    employee_id=row.get("recipient_id"),
+                    amount=row["total_amount"],
+                    unconfirmed_amount=row["total_unconfirmed_amount"],
+                    count=row["total_count"],
+                    unconfirmed_count=row["total_unconfirmed_count"],
+                )
+            )
+    PayrollSummary.objects.bulk_create(summaries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('authentication', '0019_salary_role'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('administration', '0007_custompermission_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('amount', models.FloatField(default=0)),
+                ('unconfirmed_amount', models.FloatField(default=0)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('unconfirmed_count', models.PositiveIntegerField(default=0)),
+                ('employee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='payroll_summaries', to=settings.AUTH_USER_MODEL)),
+                ('role', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='payroll_summaries', to='administration.role')),
+            ],
+            options={
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='payrollsummary',
+            index=models.Index(fields=['month', 'amount'], name='management__month_709de1_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='payrollsummary',
+            constraint=models.UniqueConstraint(condition=models.Q(('employee__isnull', True), ('role__isnull', True)), fields=('month',), name='payroll_total_month_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='payrollsummary',
+            constraint=models.UniqueConstraint(condition=models.Q(('role__isnull', False)), fields=('role', 'month'), name='payroll_role_month_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='payrollsummary',
+            constraint=models.UniqueConstraint(condition=models.Q(('employee__isnull', False)), fields=('employee', 'month'), name='payroll_employee_month_uniq'),
+        ),
+        migrations.RunPython(populate_payroll_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,109 @@
+# Generated by Django 3.2.8 on 2026-10-17 21:13
+
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import management.models
+
+
+def _easter(year):
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+def _holidays(year, country, federal_state):
+    rules = settings.PUBLIC_HOLIDAYS.get(country or "", {})
+    holidays = set()
+    for rule in list(rules.get("", [])) + list(rules.get(federal_state or "", [])):
+        if rule.startswith("easter"):
+            holidays.add(_easter(year) + datetime.timedelta(days=int(rule[6:] or 0)))
+        else:
+            month, day = rule.split("-")
+            holidays.add(datetime.date(year, int(month), int(day)))
+    return holidays
+
+
+def populate_vacation_balances(apps, schema_editor):
+    # Bereits genehmigte Ferien einmalig zählen, danach werden die Konten bei
+    # jeder Änderung nachgeführt. Gezählt wird wie in management.vacation:
+    # Arbeitstage ohne Feiertage am Wohnort zu Beginn der Abwesenheit.
+    Absence = apps.get_model("authentication", "Absence")
+    Adress = apps.get_model("authentication", "Adress")
+    VacationBalance = apps.get_model("management", "VacationBalance")
+
+    addresses = defaultdict(list)
+    for user_id, country, federal_state, from_date in Adress.objects.order_by(
+        "user_id", "-from_date"
+    ).values_list("user_id", "country", "federal_state", "from_date"):
+        addresses[user_id].append((country, federal_state, from_date))
+
+    weekdays = set(settings.WORKING_WEEKDAYS)
+    holidays = {}
+    taken = defaultdict(int)
+    absences = Absence.objects.filter(
+        type="Urlaub", confirmation="Angenommen", recipient__isnull=False
+    ).values_list("recipient_id", "start", "end")
+    for user_id, start, end in absences.iterator():
+        location = (None, None)
+        for country, federal_state, from_date in addresses[user_id]:
+            location = (country, federal_state)
+            if from_date <= start:
+                break
+        day = start
+        while day <= end:
+            key = (day.year,) + location
+            if key not in holidays:
+                holidays[key] = _holidays(*key)
+            if day.weekday() in weekdays and day not in holidays[key]:
+                taken[(user_id, day.year)] += 1
+            day += datetime.timedelta(days=1)
+
+    VacationBalance.objects.bulk_create(
+        [
+            VacationBalance(user_id=user_id, year=year, taken=days)
+            for (user_id, year), days in taken.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('authentication', '0020_absence_start_end_index'),
+        ('management', '0001_payroll_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VacationBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('entitlement', models.FloatField(default=management.models.default_vacation_days)),
+                ('taken', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vacation_balances', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-year'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='vacationbalance',
+            constraint=models.UniqueConstraint(fields=('user', 'year'), name='vacation_balance_user_year_uniq'),
+        ),
+        migrations.RunPython(populate_vacation_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,120 @@
+# Generated by Django 3.2.8 on 2026-10-17 21:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+from django.utils import timezone
+
+
+def open_overtime_balances(apps, schema_editor):
+    # Bisherige Überstundensalden werden als Übertrag in die Zeiterfassung
+    # übernommen, damit der abgeleitete Wert mit dem Journal übereinstimmt.
+    AdvancedUser = apps.get_model("authentication", "AdvancedUser")
+    TimeEntry = apps.get_model("management", "TimeEntry")
+    TimeDaily = apps.get_model("management", "TimeDaily")
+    TimeMonthly = apps.get_model("management", "TimeMonthly")
+
+    today = timezone.localdate()
+    balances = list(
+        AdvancedUser.objects.exclude(overtime_hours__isnull=True)
+        .exclude(overtime_hours=0)
+        .values_list("user_id", "overtime_hours")
+    )
+    TimeEntry.objects.bulk_create(
+        [
+            TimeEntry(
+                user_id=user_id,
+                date=today,
+                kind="overtime",
+                hours=hours,
+                note="Übertrag",
+            )
+            for user_id, hours in balances
+        ],
+        batch_size=500,
+    )
+    TimeDaily.objects.bulk_create(
+        [
+            TimeDaily(user_id=user_id, date=today, overtime_hours=hours)
+            for user_id, hours in balances
+        ],
+        batch_size=500,
+    )
+    TimeMonthly.objects.bulk_create(
+        [
+            TimeMonthly(
+                user_id=user_id, month=today.replace(day=1), overtime_hours=hours
+            )
+            for user_id, hours in balances
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('authentication', '0021_performance_date_index'),
+        ('management', '0002_vacation_balance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimeMonthly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('worked_hours', models.FloatField(default=0)),
+                ('overtime_hours', models.FloatField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_months', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TimeEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('kind', models.CharField(choices=[('in', 'Einstempeln'), ('out', 'Ausstempeln'), ('overtime', 'Überstunden')], max_length=10)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('hours', models.FloatField(default=0)),
+                ('note', models.CharField(blank=True, max_length=200, null=True)),
+                ('creator', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_time_entries', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date', '-timestamp'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TimeDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('worked_hours', models.FloatField(default=0)),
+                ('overtime_hours', models.FloatField(default=0)),
+                ('target_hours', models.FloatField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_days', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='timemonthly',
+            constraint=models.UniqueConstraint(fields=('user', 'month'), name='time_monthly_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='timeentry',
+            index=models.Index(fields=['user', 'date'], name='management__user_id_748c2e_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='timedaily',
+            constraint=models.UniqueConstraint(fields=('user', 'date'), name='time_daily_uniq'),
+        ),
+        migrations.RunPython(open_overtime_balances, migrations.RunPython.noop),
+    ]
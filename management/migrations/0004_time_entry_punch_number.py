@@ -0,0 +1,36 @@
+# Generated by Django 3.2.8 on 2026-10-17 21:53
+
+from django.db import migrations, models
+
+
+def number_punches(apps, schema_editor):
+    TimeEntry = apps.get_model("management", "TimeEntry")
+    numbers = {}
+    entries = []
+    for entry in TimeEntry.objects.filter(kind__in=["in", "out"]).order_by(
+        "user_id", "date", "timestamp", "pk"
+    ):
+        numbers[entry.user_id] = numbers.get(entry.user_id, 0) + 1
+        entry.punch_number = numbers[entry.user_id]
+        entries.append(entry)
+    TimeEntry.objects.bulk_update(entries, ["punch_number"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0003_time_tracking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timeentry',
+            name='punch_number',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(number_punches, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='timeentry',
+            constraint=models.UniqueConstraint(fields=('user', 'punch_number'), name='time_entry_punch_uniq'),
+        ),
+    ]
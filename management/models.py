@@ -1,3 +1,170 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 
-# Create your models here.
+from administration.models import Role
+
+User = get_user_model()
+
+
+# Laufend nachgeführte Lohnsummen pro Monat: eine Zeile für alle
+# Mitarbeitenden, eine pro Rolle und eine pro Mitarbeiter:in. Die
+# Übersichten lesen nur diese Zeilen und nicht die einzelnen Lohnzahlungen.
+class PayrollSummary(models.Model):
+    month = models.DateField()
+    role = models.ForeignKey(
+        Role,
+        on_delete=models.CASCADE,
+        related_name="payroll_summaries",
+        null=True,
+        blank=True,
+    )
+    employee = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="payroll_summaries",
+        null=True,
+        blank=True,
+    )
+    amount = models.FloatField(default=0)
+    unconfirmed_amount = models.FloatField(default=0)
+    count = models.PositiveIntegerField(default=0)
+    unconfirmed_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        scope = self.employee or self.role or "Total"
+        return f"{self.month:%m.%Y} | {scope}: {self.amount}"
+
+    class Meta:
+        ordering = ["-month"]
+        indexes = [models.Index(fields=["month", "amount"])]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["month"],
+                condition=Q(role__isnull=True, employee__isnull=True),
+                name="payroll_total_month_uniq",
+            ),
+            models.UniqueConstraint(
+                fields=["role", "month"],
+                condition=Q(role__isnull=False),
+                name="payroll_role_month_uniq",
+            ),
+            models.UniqueConstraint(
+                fields=["employee", "month"],
+                condition=Q(employee__isnull=False),
+                name="payroll_employee_month_uniq",
+            ),
+        ]
+
+
+def default_vacation_days():
+    return settings.VACATION_DAYS_PER_YEAR
+
+
+# Urlaubskonto pro Benutzer und Jahr. "taken" wird beim Genehmigen oder
+# Ablehnen einer Abwesenheit um deren Arbeitstage angepasst.
+class VacationBalance(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="vacation_balances"
+    )
+    year = models.PositiveSmallIntegerField()
+    entitlement = models.FloatField(default=default_vacation_days)
+    taken = models.IntegerField(default=0)
+
+    @property
+    def remaining(self):
+        return self.entitlement - self.taken
+
+    def __str__(self):
+        return f"{self.user.username} {self.year}: {self.taken}/{self.entitlement}"
+
+    class Meta:
+        ordering = ["-year"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "year"], name="vacation_balance_user_year_uniq"
+            )
+        ]
+
+
+# Zeiterfassung: Stempelungen und Korrekturen werden nur angehängt, nie
+# geändert. Eine Schicht zählt zum Tag des Einstempelns, der Ausstempel-
+# Eintrag trägt deshalb dieses Datum und die gearbeiteten Stunden.
+class TimeEntry(models.Model):
+    class Kind(models.TextChoices):
+        CLOCK_IN = "in", "Einstempeln"
+        CLOCK_OUT = "out", "Ausstempeln"
+        OVERTIME = "overtime", "Überstunden"
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="time_entries"
+    )
+    date = models.DateField()
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    timestamp = models.DateTimeField(default=timezone.now)
+    hours = models.FloatField(default=0)
+    # Laufende Nummer der Stempelungen je Benutzer. Der eindeutige Index lässt
+    # von zwei gleichzeitigen Stempelungen nur eine durch, auch ohne
+    # Zeilensperren (SQLite kennt kein SELECT ... FOR UPDATE).
+    punch_number = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    note = models.CharField(max_length=200, null=True, blank=True)
+    creator = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name="created_time_entries",
+        null=True,
+        blank=True,
+    )
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Zeiteinträge können nicht geändert werden.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.user.username} {self.date}: {self.kind} {self.hours}"
+
+    class Meta:
+        ordering = ["-date", "-timestamp"]
+        indexes = [models.Index(fields=["user", "date"])]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "punch_number"], name="time_entry_punch_uniq"
+            )
+        ]
+
+
+class TimeDaily(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="time_days")
+    date = models.DateField()
+    worked_hours = models.FloatField(default=0)
+    overtime_hours = models.FloatField(default=0)
+    # Gesetzt, sobald am Tag gearbeitet wurde und das Soll abgezogen ist.
+    target_hours = models.FloatField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user.username} {self.date}: {self.worked_hours}"
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "date"], name="time_daily_uniq")
+        ]
+
+
+class TimeMonthly(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="time_months")
+    month = models.DateField()
+    worked_hours = models.FloatField(default=0)
+    overtime_hours = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username} {self.month:%m.%Y}: {self.worked_hours}"
+
+    class Meta:
+        ordering = ["-month"]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "month"], name="time_monthly_uniq")
+        ]
@@ -0,0 +1,230 @@
+import datetime
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+from administration.pagination import PAGE_SIZE, paginate_keyset
+from authentication.models import AdvancedUser, Salary
+
+from .models import PayrollSummary
+
+# Lohnübersicht aus der Tabelle PayrollSummary. Jede neue, geänderte oder
+# gelöschte Lohnzahlung verschiebt nur die drei betroffenen Monatszeilen
+# (Total, Rolle, Mitarbeiter:in) per UPDATE, die Auswertungen lesen höchstens
+# eine Zeile pro Monat und Rolle bzw. Mitarbeiter:in. Änderungen per
+# QuerySet.update() laufen an den Signalen vorbei, dafür gibt es
+# "manage.py rebuild_payroll".
+TREND_MONTHS = 12
+FIELDS = ("amount", "unconfirmed_amount", "count", "unconfirmed_count")
+
+
+def salary_month(date):
+    if timezone.is_aware(date):
+        date = timezone.localtime(date)
+    return date.date().replace(day=1)
+
+
+def parse_month(value):
+    try:
+        return datetime.datetime.strptime(value or "", "%Y-%m").date()
+    except ValueError:
+        return timezone.localdate().replace(day=1)
+
+
+def shift_month(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _state(salary):
+    if salary is None or salary.date is None:
+        return None
+    return (
+        salary_month(salary.date),
+        salary.role_id,
+        salary.recipient_id,
+        salary.amount or 0.0,
+        salary.confirmation,
+    )
+
+
+def _scopes(month, role_id, employee_id):
+    scopes = [(month, None, None)]
+    if role_id is not None:
+        scopes.append((month, role_id, None))
+    if employee_id is not None:
+        scopes.append((month, None, employee_id))
+    return scopes
+
+
+def _deltas(old, new):
+    # Alte Werte abziehen, neue addieren. Beim Bestätigen im selben Monat
+    # bleibt so nur der unbestätigte Anteil übrig.
+    deltas = {}
+    for state, sign in ((old, -1), (new, 1)):
+        if state is None:
+            continue
+        month, role_id, employee_id, amount, confirmed = state
+        unconfirmed = 0 if confirmed else 1
+        for scope in _scopes(month, role_id, employee_id):
+            values = deltas.setdefault(scope, [0.0, 0.0, 0, 0])
+            values[0] += sign * amount
+            values[1] += sign * amount * unconfirmed
+            values[2] += sign
+            values[3] += sign * unconfirmed
+    return {scope: values for scope, values in deltas.items() if any(values)}
+
+
+def _update(scope, values):
+    month, role_id, employee_id = scope
+    return PayrollSummary.objects.filter(
+        month=month,
+        role_id=role_id,
+        employee_id=employee_id,
+    ).update(**{field: F(field) + value for field, value in zip(FIELDS, values)})
+
+
+def apply_payroll_change(old, new):
+    for scope, values in _deltas(old, new).items():
+        if _update(scope, values):
+            continue
+        month, role_id, employee_id = scope
+        try:
+            with transaction.atomic():
+                PayrollSummary.objects.create(
+                    month=month,
+                    role_id=role_id,
+                    employee_id=employee_id,
+                    **dict(zip(FIELDS, values)),
+                )
+        except IntegrityError:
+            # Parallel angelegt, dann greift das UPDATE.
+            _update(scope, values)
+
+
+def rebuild_payroll_summary():
+    totals = {
+        "total_amount": Coalesce(Sum("amount"), Value(0.0)),
+        "total_unconfirmed_amount": Coalesce(
+            Sum("amount", filter=Q(confirmation=False)), Value(0.0)
+        ),
+        "total_count": Count("pk"),
+        "total_unconfirmed_count": Count("pk", filter=Q(confirmation=False)),
+    }
+    salaries = Salary.objects.annotate(
+        month=TruncMonth("date", output_field=DateField())
+    ).order_by()
+
+    summaries = []
+    for scope, condition in (
+        ([], Q()),
+        (["role_id"], Q(role__isnull=False)),
+        (["recipient_id"], Q(recipient__isnull=False)),
+    ):
+        rows = salaries.filter(condition).values("month", *scope).annotate(**totals)
+        for row in rows:
+            summaries.append(
+                PayrollSummary(
+                    month=row["month"],
+                    role_id=row.get("role_id"),
+                    employee_id=row.get("recipient_id"),
+                    **{field: row[f"total_{field}"] for field in FIELDS},
+                )
+            )
+
+    with transaction.atomic():
+        PayrollSummary.objects.all().delete()
+        PayrollSummary.objects.bulk_create(summaries, batch_size=500)
+    return len(summaries)
+
+
+def get_month_summary(month):
+    return PayrollSummary.objects.filter(
+        month=month, role__isnull=True, employee__isnull=True
+    ).first()
+
+
+def get_year_to_date(month):
+    totals = PayrollSummary.objects.filter(
+        month__gte=month.replace(month=1),
+        month__lte=month,
+        role__isnull=True,
+        employee__isnull=True,
+    ).aggregate(*[Sum(field) for field in FIELDS])
+    return {field: totals[f"{field}__sum"] or 0 for field in FIELDS}
+
+
+def get_trend(month, months=TREND_MONTHS):
+    summaries = {
+        summary.month: summary
+        for summary in PayrollSummary.objects.filter(
+            month__gt=shift_month(month, -months),
+            month__lte=month,
+            role__isnull=True,
+            employee__isnull=True,
+        )
+    }
+    return [
+        (shift_month(month, -offset), summaries.get(shift_month(month, -offset)))
+        for offset in range(months - 1, -1, -1)
+    ]
+
+
+def get_role_totals(month):
+    return (
+        PayrollSummary.objects.filter(month=month, role__isnull=False)
+        .select_related("role")
+        .order_by("-amount", "pk")
+    )
+
+
+def paginate_employee_totals(month, cursor=None, per_page=PAGE_SIZE):
+    return paginate_keyset(
+        PayrollSummary.objects.filter(
+            month=month, employee__isnull=False
+        ).select_related("employee"),
+        cursor,
+        field="amount",
+        per_page=per_page,
+    )
+
+
+def _salary_pre_save(sender, instance, **kwargs):
+    if instance.pk is None or instance._state.adding:
+        instance._payroll_state = None
+        # Neue Lohnzahlungen merken sich die aktuelle Rolle des Empfängers.
+        if instance.role_id is None and instance.recipient_id is not None:
+            instance.role_id = (
+                AdvancedUser.objects.filter(user_id=instance.recipient_id)
+                .values_list("role_id", flat=True)
+                .first()
+            )
+        return
+    instance._payroll_state = _state(
+        Salary.objects.filter(pk=instance.pk)
+        .only("date", "role", "recipient", "amount", "confirmation")
+        .first()
+    )
+
+
+def _salary_saved(sender, instance, **kwargs):
+    apply_payroll_change(getattr(instance, "_payroll_state", None), _state(instance))
+
+
+def _salary_deleted(sender, instance, **kwargs):
+    apply_payroll_change(_state(instance), None)
+
+
+def connect_signals():
+    pre_save.connect(
+        _salary_pre_save, sender=Salary, dispatch_uid="management.payroll.pre_save"
+    )
+    post_save.connect(
+        _salary_saved, sender=Salary, dispatch_uid="management.payroll.salary"
+    )
+    post_delete.connect(
+        _salary_deleted, sender=Salary, dispatch_uid="management.payroll.delete"
+    )
@@ -0,0 +1,232 @@
+import datetime
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from math import fsum, sqrt
+from operator import itemgetter
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from administration.models import Role
+from administration.versions import bump_version, get_version
+from authentication.models import Performance
+
+User = get_user_model()
+
+# Auswertung der Mitarbeitergespräche. Die Noten eines Zeitraums kommen mit
+# einer values_list-Abfrage und werden spaltenweise verarbeitet: sortiert,
+# summiert und gezählt wird mit den eingebauten C-Funktionen (sorted, fsum,
+# bisect), gruppiert in einem Durchlauf über die Spalten. Das Ergebnis liegt
+# pro (Zeitraum, Rolle) im Cache und wird über eine Version verworfen, sobald
+# eine Beurteilung gespeichert oder gelöscht wird.
+PERFORMANCE_VERSION = "performance:stats"
+PERFORMANCE_CACHE_TIMEOUT = 60 * 60
+PERCENTILES = (10, 25, 50, 75, 90)
+OUTLIER_Z = 2.0
+OUTLIER_MIN_REVIEWS = 3
+TOP_GROUPS = 20
+NO_ROLE = 0
+
+
+def _parse(value):
+    try:
+        return parse_date(value or "")
+    except ValueError:
+        return None
+
+
+def parse_period(params):
+    # Ohne Angabe das letzte Jahr bis heute.
+    end = _parse(params.get("end")) or timezone.localdate()
+    start = _parse(params.get("start")) or end - datetime.timedelta(days=365)
+    if end < start:
+        start, end = end, start
+    return start, end
+
+
+def invalidate_performance_stats():
+    bump_version(PERFORMANCE_VERSION)
+
+
+def _percentile(ordered, percent):
+    # Lineare Interpolation wie numpy.percentile.
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def describe(grades):
+    count = len(grades)
+    if not count:
+        return {"count": 0}
+    ordered = sorted(grades)
+    total = fsum(ordered)
+    mean = total / count
+    variance = max(fsum(map(float.__mul__, ordered, ordered)) / count - mean**2, 0)
+    return {
+        "count": count,
+        "mean": mean,
+        "stdev": sqrt(variance),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "percentiles": [
+            (percent, _percentile(ordered, percent)) for percent in PERCENTILES
+        ],
+        "ordered": ordered,
+    }
+
+
+def distribution(ordered, step=0.5):
+    # Anzahl Noten pro halbe Note über die sortierte Liste (bisect statt
+    # Schleife über jede Note).
+    if not ordered:
+        return []
+    buckets = []
+    bucket = int(ordered[0] / step) * step
+    while bucket <= ordered[-1]:
+        count = bisect_left(ordered, bucket + step) - bisect_left(ordered, bucket)
+        if count:
+            buckets.append((bucket, count))
+        bucket += step
+    return buckets
+
+
+def _group(keys, grades):
+    groups = defaultdict(lambda: array("d"))
+    for key, grade in zip(keys, grades):
+        groups[key].append(grade)
+    return groups
+
+
+def _summary(key, grades, overall_mean):
+    count = len(grades)
+    mean = fsum(grades) / count
+    return {
+        "id": key,
+        "count": count,
+        "mean": mean,
+        "difference": mean - overall_mean,
+        "min": min(grades),
+        "max": max(grades),
+    }
+
+
+def _names(model, ids, field):
+    return dict(model.objects.filter(pk__in=ids).values_list("pk", field))
+
+
+def compute_performance_stats(start, end, role_id=None):
+    reviews = Performance.objects.filter(date__gte=start, date__lte=end)
+    if role_id:
+        reviews = reviews.filter(user__advanced__role_id=role_id)
+    rows = list(
+        reviews.values_list(
+            "grade", "date", "user_id", "evaluator_id", "user__advanced__role_id"
+        )
+    )
+    if not rows:
+        return {"overall": {"count": 0}}
+
+    # Spaltenweise weiterarbeiten.
+    grades, dates, user_ids, evaluator_ids, role_ids = zip(*rows)
+    grades = array("d", grades)
+    overall = describe(grades)
+    ordered = overall.pop("ordered")
+    mean, stdev = overall["mean"], overall["stdev"]
+
+    roles = [
+        _summary(key, values, mean)
+        for key, values in _group(
+            (role or NO_ROLE for role in role_ids), grades
+        ).items()
+    ]
+    roles.sort(key=itemgetter("count"), reverse=True)
+    role_names = _names(Role, [role["id"] for role in roles], "name")
+    for role in roles:
+        role["name"] = role_names.get(role["id"], "?")
+
+    evaluators = [
+        _summary(key, values, mean)
+        for key, values in _group(evaluator_ids, grades).items()
+        if key is not None
+    ]
+    evaluators.sort(key=itemgetter("count"), reverse=True)
+    evaluators = evaluators[:TOP_GROUPS]
+    evaluator_names = _names(
+        User, [evaluator["id"] for evaluator in evaluators], "username"
+    )
+    for evaluator in evaluators:
+        evaluator["name"] = evaluator_names.get(evaluator["id"], "?")
+
+    months = _group(((day.year, day.month) for day in dates), grades)
+    trend = [
+        {
+            "month": datetime.date(year, month, 1),
+            "count": len(values),
+            "mean": fsum(values) / len(values),
+        }
+        for (year, month), values in sorted(months.items())
+    ]
+
+    # Auffällig sind Mitarbeitende, deren Schnitt mehr als OUTLIER_Z
+    # Standardabweichungen vom Gesamtschnitt abweicht.
+    outliers = []
+    if stdev:
+        low = bisect_right(ordered, mean - OUTLIER_Z * stdev)
+        high = len(ordered) - bisect_left(ordered, mean + OUTLIER_Z * stdev)
+        overall["outlier_reviews"] = low + high
+        for key, values in _group(user_ids, grades).items():
+            if key is None or len(values) < OUTLIER_MIN_REVIEWS:
+                continue
+            summary = _summary(key, values, mean)
+            summary["z"] = summary["difference"] / stdev
+            if abs(summary["z"]) >= OUTLIER_Z:
+                outliers.append(summary)
+        outliers.sort(key=lambda summary: abs(summary["z"]), reverse=True)
+        outliers = outliers[:TOP_GROUPS]
+        user_names = _names(User, [outlier["id"] for outlier in outliers], "username")
+        for outlier in outliers:
+            outlier["name"] = user_names.get(outlier["id"], "?")
+
+    return {
+        "overall": overall,
+        "distribution": distribution(ordered),
+        "roles": roles,
+        "evaluators": evaluators,
+        "trend": trend,
+        "outliers": outliers,
+    }
+
+
+def get_performance_stats(start, end, role_id=None):
+    version = get_version(PERFORMANCE_VERSION)
+    key = f"performance:stats:v{version}:{start}:{end}:{role_id or NO_ROLE}"
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_performance_stats(start, end, role_id)
+        cache.set(key, stats, PERFORMANCE_CACHE_TIMEOUT)
+    return stats
+
+
+def _performance_changed(sender, **kwargs):
+    invalidate_performance_stats()
+
+
+def connect_signals():
+    post_save.connect(
+        _performance_changed,
+        sender=Performance,
+        dispatch_uid="management.performance.performance",
+    )
+    post_delete.connect(
+        _performance_changed,
+        sender=Performance,
+        dispatch_uid="management.performance.delete",
+    )
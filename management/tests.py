@@ -1,3 +1,432 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from administration.models import CustomPermission, Role
+from administration.permissions import sync_permissions
+from authentication.models import (
+    Absence,
+    Adress,
+    AdvancedUser,
+    Health,
+    Meta,
+    Performance,
+    Salary,
+    UserCustomInterface,
+)
+
+from .absences import AbsenceCalendar
+from .models import (
+    PayrollSummary,
+    TimeDaily,
+    TimeEntry,
+    TimeMonthly,
+    VacationBalance,
+)
+from .payroll import rebuild_payroll_summary
+from .performance import get_performance_stats
+from .timetracking import (
+    OvertimeError,
+    PunchError,
+    add_overtime,
+    get_overtime_balance,
+    punch,
+    rebuild_time_tracking,
+)
+from .vacation import rebuild_vacation_balances
+
+User = get_user_model()
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+def create_performance(user, grade, date):
+    return Performance.objects.create(
+        user=user,
+        date=date,
+        grade=grade,
+        appearance="-",
+        teamwork="-",
+        helpfulness="-",
+        politeness="-",
+        communication="-",
+        work_quality="-",
+        work_organisation="-",
+        knowledge="-",
+        goals="-",
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PerformanceStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("anna")
+        self.start = datetime.date(2024, 1, 1)
+        self.end = datetime.date(2024, 12, 31)
+
+    def test_new_review_counted_after_version_expiry(self):
+        create_performance(self.user, 5.0, datetime.date(2024, 3, 1))
+        stats = get_performance_stats(self.start, self.end)
+        self.assertEqual(stats["overall"]["count"], 1)
+
+        create_performance(self.user, 4.0, datetime.date(2024, 4, 1))
+        cache.delete("version:performance:stats")
+        stats = get_performance_stats(self.start, self.end)
+        self.assertEqual(stats["overall"]["count"], 2)
+        self.assertEqual(stats["overall"]["mean"], 4.5)
+
+
+class VacationBackfillTests(TransactionTestCase):
+    migrate_from = [("management", "0001_payroll_summary")]
+    migrate_to = [("management", "0002_vacation_balance")]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        apps = executor.loader.project_state(self.migrate_from).apps
+        User = apps.get_model("auth", "User")
+        Absence = apps.get_model("authentication", "Absence")
+        Adress = apps.get_model("authentication", "Adress")
+
+        anna = User.objects.create(username="anna")
+        bert = User.objects.create(username="bert")
+        Adress.objects.create(
+            user=anna,
+            country="Schweiz",
+            federal_state="Zürich",
+            from_date=datetime.date(2020, 1, 1),
+        )
+        for recipient, start, end, confirmation in (
+            # Ostern 2025 in Zürich: 8 Arbeitstage.
+            (
+                anna,
+                datetime.date(2025, 4, 14),
+                datetime.date(2025, 4, 25),
+                "Angenommen",
+            ),
+            # Über den Jahreswechsel ohne Adresse: 7 + 3 Arbeitstage.
+            (
+                bert,
+                datetime.date(2024, 12, 23),
+                datetime.date(2025, 1, 3),
+                "Angenommen",
+            ),
+            (bert, datetime.date(2025, 6, 2), datetime.date(2025, 6, 6), "Abgelehnt"),
+        ):
+            Absence.objects.create(
+                type="Urlaub",
+                recipient=recipient,
+                start=start,
+                end=end,
+                confirmation=confirmation,
+            )
+        self.anna, self.bert = anna.pk, bert.pk
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def balances(self):
+        return set(VacationBalance.objects.values_list("user_id", "year", "taken"))
+
+    def test_approved_vacations_are_counted(self):
+        self.assertEqual(
+            self.balances(),
+            {(self.anna, 2025, 8), (self.bert, 2024, 7), (self.bert, 2025, 3)},
+        )
+        backfilled = self.balances()
+        rebuild_vacation_balances()
+        self.assertEqual(self.balances(), backfilled)
+
+
+def grant_management(user, *permissions):
+    sync_permissions()
+    role = Role.objects.create(name="Verwaltung")
+    role.permissions.set(CustomPermission.objects.filter(permission__in=permissions))
+    AdvancedUser.objects.update_or_create(user=user, defaults={"role": role})
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TimeTrackingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("anna", password="pw")
+        AdvancedUser.objects.create(
+            user=self.user, privacy=True, terms=True, copyright=True
+        )
+        Meta.objects.create(user=self.user, sex="Divers")
+        Health.objects.create(user=self.user)
+        UserCustomInterface.objects.create(user=self.user)
+        self.monday = timezone.make_aware(datetime.datetime(2025, 3, 3, 8))
+
+    def snapshot(self):
+        return (
+            set(
+                TimeDaily.objects.values_list(
+                    "user_id", "date", "worked_hours", "overtime_hours", "target_hours"
+                )
+            ),
+            set(
+                TimeMonthly.objects.values_list(
+                    "user_id", "month", "worked_hours", "overtime_hours"
+                )
+            ),
+            get_overtime_balance(self.user.pk),
+        )
+
+    def test_roll_ups_match_rebuild(self):
+        for day in range(8):
+            start = self.monday + datetime.timedelta(days=day)
+            punch(self.user, timestamp=start)
+            punch(self.user, timestamp=start + datetime.timedelta(hours=9))
+        # Schicht über Mitternacht zählt zum Einstempeltag.
+        late = self.monday + datetime.timedelta(days=8, hours=14)
+        punch(self.user, timestamp=late)
+        punch(self.user, timestamp=late + datetime.timedelta(hours=12))
+        add_overtime(self.user, -2.5, day=self.monday.date())
+
+        incremental = self.snapshot()
+        rebuild_time_tracking()
+        self.assertEqual(self.snapshot(), incremental)
+        # 6 Arbeitstage zu 9 h und einer zu 12 h bei 8.4 h Soll, dazu das
+        # Wochenende (Soll 0) und die Korrektur.
+        self.assertAlmostEqual(incremental[2], 6 * 0.6 + 3.6 + 2 * 9 - 2.5, places=6)
+
+    def test_second_clock_in_rejected(self):
+        punch(self.user, timestamp=self.monday)
+        with self.assertRaises(PunchError):
+            punch(self.user, kind=TimeEntry.Kind.CLOCK_IN)
+
+    def test_concurrent_clock_in_rejected_by_database(self):
+        punch(self.user, timestamp=self.monday)
+        # Zweiter Prozess, der die erste Stempelung noch nicht gesehen hat.
+        with mock.patch("management.timetracking.get_last_punch", return_value=None):
+            with self.assertRaises(PunchError):
+                punch(self.user, timestamp=self.monday)
+        self.assertEqual(TimeEntry.objects.count(), 1)
+        punch(self.user, timestamp=self.monday + datetime.timedelta(hours=8))
+        self.assertEqual(
+            list(
+                TimeEntry.objects.order_by("punch_number").values_list(
+                    "kind", "punch_number"
+                )
+            ),
+            [(TimeEntry.Kind.CLOCK_IN, 1), (TimeEntry.Kind.CLOCK_OUT, 2)],
+        )
+
+    def test_non_finite_overtime_rejected(self):
+        for hours in (float("inf"), float("nan"), 0.0, 1e9):
+            with self.assertRaises(OvertimeError):
+                add_overtime(self.user, hours)
+        self.assertFalse(TimeEntry.objects.exists())
+
+    def test_overtime_form_rejects_invalid_hours(self):
+        grant_management(
+            self.user,
+            "management.access",
+            "management.time.access",
+            "management.time.manage",
+        )
+        self.client.force_login(self.user)
+        for hours in ("nan", "inf", "-inf", "1e9", "abc"):
+            response = self.client.post(
+                reverse("time_tracking"), {"action": "overtime", "hours": hours}
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.context["overtime_error"])
+        response = self.client.post(
+            reverse("time_tracking"),
+            {"action": "overtime", "hours": "1,5", "date": "2025-13-40"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(TimeEntry.objects.exists())
+
+        response = self.client.post(
+            reverse("time_tracking"), {"action": "overtime", "hours": "1,5"}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(get_overtime_balance(self.user.pk), 1.5)
+
+
+class AbsenceCalendarTests(TestCase):
+    def test_team_size_counts_active_users_only(self):
+        role = Role.objects.create(name="Team")
+        for username, active in [("aktiv", True), ("inaktiv", False)]:
+            user = User.objects.create_user(username, is_active=active)
+            AdvancedUser.objects.update_or_create(user=user, defaults={"role": role})
+
+        start = datetime.date(2024, 1, 1)
+        self.assertEqual(AbsenceCalendar(start, start, role.pk).team_size, 1)
+        self.assertEqual(
+            AbsenceCalendar(start, start).team_size,
+            User.objects.filter(is_active=True).count(),
+        )
+
+
+class PayrollSummaryTests(TestCase):
+    def summaries(self):
+        return {
+            (month, role_id, employee_id): (
+                round(amount, 2),
+                round(open_amount, 2),
+                count,
+                open_count,
+            )
+            for month, role_id, employee_id, amount, open_amount, count, open_count in (
+                PayrollSummary.objects.values_list(
+                    "month",
+                    "role_id",
+                    "employee_id",
+                    "amount",
+                    "unconfirmed_amount",
+                    "count",
+                    "unconfirmed_count",
+                )
+            )
+            if count
+        }
+
+    def test_incremental_updates_match_rebuild(self):
+        role = Role.objects.create(name="Lohn")
+        anna = User.objects.create_user("anna")
+        bert = User.objects.create_user("bert")
+        january = timezone.make_aware(datetime.datetime(2025, 1, 15, 12))
+        february = timezone.make_aware(datetime.datetime(2025, 2, 15, 12))
+
+        first = Salary.objects.create(
+            amount=1000.5, date=january, recipient=anna, role=role
+        )
+        second = Salary.objects.create(amount=800, date=january, recipient=bert)
+        third = Salary.objects.create(
+            amount=300, date=february, recipient=anna, role=role
+        )
+        first.confirmation = True
+        first.save()
+        second.date = february
+        second.amount = 750
+        second.save()
+        third.delete()
+
+        incremental = self.summaries()
+        rebuild_payroll_summary()
+        self.assertEqual(self.summaries(), incremental)
+        self.assertEqual(
+            incremental[(datetime.date(2025, 1, 1), None, None)], (1000.5, 0.0, 1, 0)
+        )
+
+
+class VacationBalanceTests(TestCase):
+    def balances(self):
+        return set(
+            VacationBalance.objects.filter(taken__gt=0).values_list(
+                "user_id", "year", "taken"
+            )
+        )
+
+    def test_incremental_updates_match_rebuild(self):
+        anna = User.objects.create_user("anna")
+        Adress.objects.create(
+            user=anna,
+            country="Schweiz",
+            federal_state="Zürich",
+            from_date=datetime.date(2020, 1, 1),
+        )
+        easter = Absence.objects.create(
+            type="Urlaub",
+            recipient=anna,
+            start=datetime.date(2025, 4, 14),
+            end=datetime.date(2025, 4, 25),
+            confirmation="Ausstehend",
+        )
+        turn_of_year = Absence.objects.create(
+            type="Urlaub",
+            recipient=anna,
+            start=datetime.date(2024, 12, 23),
+            end=datetime.date(2025, 1, 3),
+            confirmation="Angenommen",
+        )
+        easter.confirmation = "Angenommen"
+        easter.save()
+        turn_of_year.end = datetime.date(2024, 12, 31)
+        turn_of_year.save()
+        Absence.objects.create(
+            type="Urlaub",
+            recipient=anna,
+            start=datetime.date(2025, 6, 2),
+            end=datetime.date(2025, 6, 6),
+            confirmation="Angenommen",
+        ).delete()
+
+        incremental = self.balances()
+        self.assertEqual(incremental, {(anna.pk, 2024, 5), (anna.pk, 2025, 8)})
+        rebuild_vacation_balances()
+        self.assertEqual(self.balances(), incremental)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TimePunchViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("anna", password="pw")
+        AdvancedUser.objects.create(
+            user=self.user, privacy=True, terms=True, copyright=True
+        )
+        Meta.objects.create(user=self.user, sex="Divers")
+        Health.objects.create(user=self.user)
+        UserCustomInterface.objects.create(user=self.user)
+        self.other = User.objects.create_user("bert")
+        self.client.login(username="anna", password="pw")
+        self.url = reverse("time_punch")
+
+    def test_requires_time_access(self):
+        grant_management(self.user, "management.access")
+        response = self.client.post(self.url)
+        self.assertRedirects(response, reverse("denied"), fetch_redirect_response=False)
+        self.assertFalse(TimeEntry.objects.exists())
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(TimeEntry.objects.exists())
+
+    def test_punches_own_account(self):
+        grant_management(self.user, "management.access", "management.time.access")
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["clocked_in"])
+
+        response = self.client.post(self.url, {"kind": TimeEntry.Kind.CLOCK_IN})
+        self.assertEqual(response.status_code, 409)
+
+    def test_other_user_needs_manage_permission(self):
+        grant_management(self.user, "management.access", "management.time.access")
+        response = self.client.post(self.url, {"username": "bert"})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(TimeEntry.objects.exists())
+
+    def test_unknown_user(self):
+        grant_management(
+            self.user,
+            "management.access",
+            "management.time.access",
+            "management.time.manage",
+        )
+        response = self.client.post(self.url, {"username": "niemand"})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.post(self.url, {"username": "bert"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(TimeEntry.objects.get().user, self.other)
@@ -0,0 +1,227 @@
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from authentication.models import AdvancedUser
+
+from .models import TimeDaily, TimeEntry, TimeMonthly
+
+# Zeiterfassung als Journal: jede Stempelung und jede Korrektur ist eine neue
+# Zeile in TimeEntry. Beim Ausstempeln und bei Korrekturen werden Tages- und
+# Monatszeile sowie der Saldo in AdvancedUser.overtime_hours um die Differenz
+# verschoben. Der Saldo wird nur per UPDATE auf diese eine Spalte geschrieben
+# und ist damit ein einzelner Lesezugriff über den Benutzerindex. Beim
+# ersten Ausstempeln eines Tages wird das Tagessoll abgezogen. Stempelungen
+# sind je Benutzer fortlaufend nummeriert, ein eindeutiger Index auf der
+# Nummer verhindert doppelte oder verschränkte Stempelungen.
+
+# Obergrenze für eine einzelne Überstundenkorrektur, Einträge lassen sich
+# nicht mehr ändern, nur mit einer Gegenbuchung ausgleichen.
+MAX_OVERTIME_CORRECTION = 500.0
+
+
+class PunchError(Exception):
+    pass
+
+
+class OvertimeError(ValueError):
+    pass
+
+
+def target_hours(day):
+    if day.weekday() in settings.WORKING_WEEKDAYS:
+        return settings.WORKING_HOURS_PER_DAY
+    return 0.0
+
+
+def get_overtime_balance(user_id):
+    return (
+        AdvancedUser.objects.filter(user_id=user_id)
+        .values_list("overtime_hours", flat=True)
+        .first()
+    ) or 0.0
+
+
+def get_last_punch(user_id):
+    # Letzte Stempelung über den (user, punch_number)-Index.
+    return (
+        TimeEntry.objects.filter(user_id=user_id, punch_number__isnull=False)
+        .order_by("-punch_number")
+        .first()
+    )
+
+
+def get_open_entry(user_id):
+    # Offen ist die letzte Stempelung, wenn es ein Einstempeln ist.
+    entry = get_last_punch(user_id)
+    if entry is not None and entry.kind == TimeEntry.Kind.CLOCK_IN:
+        return entry
+    return None
+
+
+def _update_monthly(user_id, month, worked, overtime):
+    return TimeMonthly.objects.filter(user_id=user_id, month=month).update(
+        worked_hours=F("worked_hours") + worked,
+        overtime_hours=F("overtime_hours") + overtime,
+    )
+
+
+def _apply(user_id, day, worked=0.0, adjustment=0.0):
+    daily = TimeDaily.objects.select_for_update().filter(user_id=user_id, date=day)
+    daily = daily.first() or TimeDaily(user_id=user_id, date=day)
+    overtime = worked + adjustment
+    if worked and daily.target_hours is None:
+        daily.target_hours = target_hours(day)
+        overtime -= daily.target_hours
+    daily.worked_hours += worked
+    daily.overtime_hours += overtime
+    daily.save()
+
+    month = day.replace(day=1)
+    if not _update_monthly(user_id, month, worked, overtime):
+        try:
+            with transaction.atomic():
+                TimeMonthly.objects.create(
+                    user_id=user_id,
+                    month=month,
+                    worked_hours=worked,
+                    overtime_hours=overtime,
+                )
+        except IntegrityError:
+            _update_monthly(user_id, month, worked, overtime)
+
+    AdvancedUser.objects.filter(user_id=user_id).update(
+        overtime_hours=Coalesce(F("overtime_hours"), Value(0.0)) + overtime
+    )
+
+
+def punch(user, kind=None, timestamp=None, creator=None):
+    try:
+        with transaction.atomic():
+            return _punch(user, kind, timestamp or timezone.now(), creator)
+    except (IntegrityError, OperationalError) as error:
+        # Zwei gleichzeitige Stempelungen wollen dieselbe punch_number
+        # schreiben (oder SQLite meldet die gesperrte Datenbank), nur die
+        # erste gilt.
+        raise PunchError("Gleichzeitige Stempelung, bitte erneut versuchen.") from error
+
+
+def _punch(user, kind, timestamp, creator):
+    last = get_last_punch(user.pk)
+    open_entry = last if last and last.kind == TimeEntry.Kind.CLOCK_IN else None
+    punch_number = (last.punch_number if last else 0) + 1
+    if kind is None:
+        kind = TimeEntry.Kind.CLOCK_OUT if open_entry else TimeEntry.Kind.CLOCK_IN
+
+    if kind == TimeEntry.Kind.CLOCK_IN:
+        if open_entry is not None:
+            raise PunchError("Bereits eingestempelt.")
+        return TimeEntry.objects.create(
+            user=user,
+            date=timezone.localdate(timestamp),
+            kind=kind,
+            timestamp=timestamp,
+            punch_number=punch_number,
+            creator=creator,
+        )
+
+    if open_entry is None:
+        raise PunchError("Nicht eingestempelt.")
+    if timestamp < open_entry.timestamp:
+        raise PunchError("Ausstempeln vor dem Einstempeln.")
+    hours = (timestamp - open_entry.timestamp).total_seconds() / 3600
+    entry = TimeEntry.objects.create(
+        user=user,
+        date=open_entry.date,
+        kind=kind,
+        timestamp=timestamp,
+        hours=hours,
+        punch_number=punch_number,
+        creator=creator,
+    )
+    _apply(user.pk, open_entry.date, worked=hours)
+    return entry
+
+
+def add_overtime(user, hours, day=None, note=None, creator=None):
+    if not math.isfinite(hours) or not 0 < abs(hours) <= MAX_OVERTIME_CORRECTION:
+        raise OvertimeError("Ungültige Stundenzahl.")
+    day = day or timezone.localdate()
+    with transaction.atomic():
+        entry = TimeEntry.objects.create(
+            user=user,
+            date=day,
+            kind=TimeEntry.Kind.OVERTIME,
+            hours=hours,
+            note=note,
+            creator=creator,
+        )
+        _apply(user.pk, day, adjustment=hours)
+    return entry
+
+
+def rebuild_time_tracking():
+    # Tage, Monate und Salden vollständig aus dem Journal neu berechnen.
+    rows = (
+        TimeEntry.objects.exclude(kind=TimeEntry.Kind.CLOCK_IN)
+        .values("user_id", "date")
+        .annotate(
+            worked=Coalesce(
+                Sum("hours", filter=Q(kind=TimeEntry.Kind.CLOCK_OUT)), Value(0.0)
+            ),
+            adjustment=Coalesce(
+                Sum("hours", filter=Q(kind=TimeEntry.Kind.OVERTIME)), Value(0.0)
+            ),
+        )
+        .order_by()
+    )
+
+    days = []
+    months = defaultdict(lambda: [0.0, 0.0])
+    balances = defaultdict(float)
+    for row in rows.iterator():
+        day = row["date"]
+        target = target_hours(day) if row["worked"] else None
+        overtime = row["worked"] + row["adjustment"] - (target or 0.0)
+        days.append(
+            TimeDaily(
+                user_id=row["user_id"],
+                date=day,
+                worked_hours=row["worked"],
+                overtime_hours=overtime,
+                target_hours=target,
+            )
+        )
+        month = months[(row["user_id"], day.replace(day=1))]
+        month[0] += row["worked"]
+        month[1] += overtime
+        balances[row["user_id"]] += overtime
+
+    with transaction.atomic():
+        TimeDaily.objects.all().delete()
+        TimeMonthly.objects.all().delete()
+        TimeDaily.objects.bulk_create(days, batch_size=500)
+        TimeMonthly.objects.bulk_create(
+            [
+                TimeMonthly(
+                    user_id=user_id,
+                    month=month,
+                    worked_hours=worked,
+                    overtime_hours=overtime,
+                )
+                for (user_id, month), (worked, overtime) in months.items()
+            ],
+            batch_size=500,
+        )
+        advanced_users = list(AdvancedUser.objects.only("pk", "user_id"))
+        for advanced_user in advanced_users:
+            advanced_user.overtime_hours = balances.get(advanced_user.user_id)
+        AdvancedUser.objects.bulk_update(
+            advanced_users, ["overtime_hours"], batch_size=500
+        )
+    return len(days)
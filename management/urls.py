@@ -0,0 +1,39 @@
+from django.urls import path
+
+from .views import (
+    AbsenceCalendarExportView,
+    AbsenceCalendarView,
+    PayrollView,
+    PerformanceAnalyticsView,
+    TimePunchView,
+    TimeTrackingView,
+    VacationReportView,
+)
+
+urlpatterns = [
+    path("payroll", PayrollView.as_view(), name="payroll"),
+    path("absences", AbsenceCalendarView.as_view(), name="absences"),
+    path(
+        "absences/calendar.json",
+        AbsenceCalendarExportView.as_view(export_format="json"),
+        name="absences_json",
+    ),
+    path(
+        "absences/calendar.ics",
+        AbsenceCalendarExportView.as_view(export_format="ical"),
+        name="absences_ical",
+    ),
+    path("vacation", VacationReportView.as_view(), name="vacation"),
+    path(
+        "performance",
+        PerformanceAnalyticsView.as_view(),
+        name="performance_analytics",
+    ),
+    path(
+        "vacation/export",
+        VacationReportView.as_view(export=True),
+        name="vacation_export",
+    ),
+    path("time", TimeTrackingView.as_view(), name="time_tracking"),
+    path("time/punch", TimePunchView.as_view(), name="time_punch"),
+]
@@ -0,0 +1,326 @@
+import csv
+import datetime
+import hashlib
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, FilteredRelation, Q, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from administration.pagination import PAGE_SIZE, paginate_keyset
+from administration.streaming import Echo
+from authentication.models import Absence, Adress
+
+from .models import VacationBalance
+
+User = get_user_model()
+
+# Urlaubskonten pro Benutzer und Jahr. Eine genehmigte Ferienabwesenheit
+# zählt mit ihren Arbeitstagen, die aus einem Kalender pro Jahr, Land und
+# Kanton/Bundesland kommen. Ein Kalender ist eine Bitmaske über die Tage des
+# Jahres (Bit gesetzt = Arbeitstag), die Arbeitstage eines Zeitraums sind die
+# gesetzten Bits unter einer Maske. Genehmigen, Ablehnen oder Löschen passt
+# nur die betroffenen Konten per UPDATE an. Adressänderungen wirken erst nach
+# "manage.py rebuild_vacation".
+VACATION_CALENDAR_TIMEOUT = 60 * 60 * 24 * 30
+VACATION_EXPORT_CHUNK_SIZE = 2000
+VACATION_EXPORT_FIELDS = [
+    "username",
+    "first_name",
+    "last_name",
+    "advanced__role__name",
+    "entitlement",
+    "taken",
+    "remaining",
+]
+MAX_YEAR_DAYS = 366
+
+_calendars = {}
+
+
+def easter(year):
+    # Ostersonntag nach der Gaußschen Osterformel (gregorianisch).
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+def _holiday_rules(country, federal_state):
+    rules = settings.PUBLIC_HOLIDAYS.get(country or "", {})
+    return list(rules.get("", [])) + list(rules.get(federal_state or "", []))
+
+
+def get_holidays(year, country=None, federal_state=None):
+    holidays = set()
+    for rule in _holiday_rules(country, federal_state):
+        if rule.startswith("easter"):
+            holidays.add(easter(year) + datetime.timedelta(days=int(rule[6:] or 0)))
+        else:
+            month, day = rule.split("-")
+            holidays.add(datetime.date(year, int(month), int(day)))
+    return holidays
+
+
+def _build_calendar(year, country, federal_state):
+    holidays = get_holidays(year, country, federal_state)
+    weekdays = set(settings.WORKING_WEEKDAYS)
+    first = datetime.date(year, 1, 1)
+    bitmap = 0
+    for offset in range((datetime.date(year + 1, 1, 1) - first).days):
+        day = first + datetime.timedelta(days=offset)
+        if day.weekday() in weekdays and day not in holidays:
+            bitmap |= 1 << offset
+    return bitmap
+
+
+def _calendar_key(year, country, federal_state):
+    # Die Regeln gehen in den Schlüssel ein, damit geänderte Einstellungen
+    # nicht auf alte Kalender treffen.
+    rules = json.dumps(
+        [settings.WORKING_WEEKDAYS, _holiday_rules(country, federal_state)]
+    )
+    digest = hashlib.md5(rules.encode()).hexdigest()[:12]
+    place = hashlib.md5(f"{country}|{federal_state}".encode()).hexdigest()[:12]
+    return f"vacation:calendar:{year}:{place}:{digest}"
+
+
+def get_working_calendar(year, country=None, federal_state=None):
+    key = (year, country or "", federal_state or "")
+    bitmap = _calendars.get(key)
+    if bitmap is not None:
+        return bitmap
+
+    cache_key = _calendar_key(*key)
+    data = cache.get(cache_key)
+    if data is None:
+        bitmap = _build_calendar(*key)
+        cache.set(
+            cache_key,
+            bitmap.to_bytes(MAX_YEAR_DAYS // 8 + 1, "little"),
+            VACATION_CALENDAR_TIMEOUT,
+        )
+    else:
+        bitmap = int.from_bytes(data, "little")
+    _calendars[key] = bitmap
+    return bitmap
+
+
+def count_working_days(start, end, country=None, federal_state=None):
+    days = {}
+    for year in range(start.year, end.year + 1):
+        first_day = datetime.date(year, 1, 1)
+        first = (max(start, first_day) - first_day).days
+        last = (min(end, datetime.date(year, 12, 31)) - first_day).days
+        mask = ((1 << (last - first + 1)) - 1) << first
+        bitmap = get_working_calendar(year, country, federal_state)
+        days[year] = bin(bitmap & mask).count("1")
+    return days
+
+
+def _location(addresses, day):
+    # Adressen absteigend nach from_date, gültig ist die letzte vor dem Tag.
+    for country, federal_state, from_date in addresses:
+        if from_date <= day:
+            return country, federal_state
+    if addresses:
+        return addresses[-1][0], addresses[-1][1]
+    return None, None
+
+
+def get_addresses(user_id):
+    return list(
+        Adress.objects.filter(user_id=user_id)
+        .order_by("-from_date")
+        .values_list("country", "federal_state", "from_date")
+    )
+
+
+def _state(absence):
+    if (
+        absence is None
+        or absence.type != Absence.Type.VACATION
+        or absence.confirmation != Absence.Confirmation.APPROVED
+        or absence.recipient_id is None
+        or absence.start > absence.end
+    ):
+        return None
+    return absence.recipient_id, absence.start, absence.end
+
+
+def _days(state, addresses):
+    user_id, start, end = state
+    country, federal_state = _location(addresses, start)
+    return {
+        (user_id, year): days
+        for year, days in count_working_days(start, end, country, federal_state).items()
+    }
+
+
+def _update(user_id, year, days):
+    return VacationBalance.objects.filter(user_id=user_id, year=year).update(
+        taken=F("taken") + days
+    )
+
+
+def apply_vacation_change(old, new):
+    deltas = defaultdict(int)
+    addresses = {}
+    for state, sign in ((old, -1), (new, 1)):
+        if state is None:
+            continue
+        user_id = state[0]
+        if user_id not in addresses:
+            addresses[user_id] = get_addresses(user_id)
+        for key, days in _days(state, addresses[user_id]).items():
+            deltas[key] += sign * days
+
+    for (user_id, year), days in deltas.items():
+        if not days or _update(user_id, year, days):
+            continue
+        try:
+            with transaction.atomic():
+                VacationBalance.objects.create(user_id=user_id, year=year, taken=days)
+        except IntegrityError:
+            _update(user_id, year, days)
+
+
+def rebuild_vacation_balances(year=None):
+    absences = Absence.objects.filter(
+        type=Absence.Type.VACATION,
+        confirmation=Absence.Confirmation.APPROVED,
+        recipient__isnull=False,
+    )
+    balances = VacationBalance.objects.all()
+    if year is not None:
+        absences = absences.filter(
+            start__lte=datetime.date(year, 12, 31), end__gte=datetime.date(year, 1, 1)
+        )
+        balances = balances.filter(year=year)
+
+    addresses = defaultdict(list)
+    for user_id, country, federal_state, from_date in (
+        Adress.objects.order_by("user_id", "-from_date")
+        .values_list("user_id", "country", "federal_state", "from_date")
+        .iterator()
+    ):
+        addresses[user_id].append((country, federal_state, from_date))
+
+    taken = defaultdict(int)
+    for user_id, start, end in absences.values_list(
+        "recipient_id", "start", "end"
+    ).iterator():
+        if start > end:
+            continue
+        for key, days in _days((user_id, start, end), addresses[user_id]).items():
+            if year is None or key[1] == year:
+                taken[key] += days
+
+    with transaction.atomic():
+        existing = {}
+        for balance in balances.select_for_update():
+            existing[(balance.user_id, balance.year)] = balance
+            balance.taken = taken.get((balance.user_id, balance.year), 0)
+        VacationBalance.objects.bulk_update(existing.values(), ["taken"], 500)
+        VacationBalance.objects.bulk_create(
+            [
+                VacationBalance(user_id=user_id, year=balance_year, taken=days)
+                for (user_id, balance_year), days in taken.items()
+                if (user_id, balance_year) not in existing
+            ],
+            batch_size=500,
+        )
+    return len(taken)
+
+
+def get_balance_report(year, role_id=None):
+    # Alle aktiven Benutzer mit ihrem Konto des Jahres in einer Abfrage,
+    # Benutzer ohne Konto erscheinen mit dem vollen Anspruch.
+    users = (
+        User.objects.filter(is_active=True)
+        .annotate(
+            balance=FilteredRelation(
+                "vacation_balances", condition=Q(vacation_balances__year=year)
+            )
+        )
+        .annotate(
+            entitlement=Coalesce(
+                F("balance__entitlement"),
+                Value(float(settings.VACATION_DAYS_PER_YEAR)),
+            ),
+            taken=Coalesce(F("balance__taken"), Value(0)),
+        )
+        .annotate(remaining=F("entitlement") - F("taken"))
+    )
+    if role_id:
+        users = users.filter(advanced__role_id=role_id)
+    return users
+
+
+def paginate_balance_report(users, cursor=None, per_page=PAGE_SIZE):
+    return paginate_keyset(
+        users.select_related("advanced__role"),
+        cursor,
+        field="username",
+        per_page=per_page,
+        descending=False,
+    )
+
+
+def export_balance_report(users):
+    writer = csv.writer(Echo())
+    yield writer.writerow(
+        [field.replace("advanced__", "") for field in VACATION_EXPORT_FIELDS]
+    )
+    rows = (
+        users.order_by("username")
+        .values_list(*VACATION_EXPORT_FIELDS)
+        .iterator(chunk_size=VACATION_EXPORT_CHUNK_SIZE)
+    )
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _absence_pre_save(sender, instance, **kwargs):
+    if instance.pk is None or instance._state.adding:
+        instance._vacation_state = None
+        return
+    instance._vacation_state = _state(
+        Absence.objects.filter(pk=instance.pk)
+        .only("type", "confirmation", "recipient", "start", "end")
+        .first()
+    )
+
+
+def _absence_saved(sender, instance, **kwargs):
+    apply_vacation_change(getattr(instance, "_vacation_state", None), _state(instance))
+
+
+def _absence_deleted(sender, instance, **kwargs):
+    apply_vacation_change(_state(instance), None)
+
+
+def connect_signals():
+    pre_save.connect(
+        _absence_pre_save,
+        sender=Absence,
+        dispatch_uid="management.vacation.pre_save",
+    )
+    post_save.connect(
+        _absence_saved, sender=Absence, dispatch_uid="management.vacation.absence"
+    )
+    post_delete.connect(
+        _absence_deleted, sender=Absence, dispatch_uid="management.vacation.delete"
+    )
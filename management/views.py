@@ -1,3 +1,440 @@
-from django.shortcuts import render
+from django.contrib.auth import get_user_model
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import HttpResponseRedirect, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import reverse
+from django.utils.dateparse import parse_date
+from django.utils import timezone
+from django.views import generic
+
+from administration.models import Role
+from administration.permissions import has_permission
+from authentication.singletons import get_officesync
+from communication.models import Message
+
+from .absences import (
+    AbsenceCalendar,
+    export_calendar_ical,
+    export_calendar_json,
+    parse_range,
+    parse_role,
+)
+from .payroll import (
+    get_month_summary,
+    get_role_totals,
+    get_trend,
+    get_year_to_date,
+    paginate_employee_totals,
+    parse_month,
+    shift_month,
+)
+from .models import TimeDaily, TimeEntry, TimeMonthly
+from .performance import get_performance_stats, parse_period
+from .timetracking import (
+    PunchError,
+    add_overtime,
+    get_open_entry,
+    get_overtime_balance,
+    punch,
+)
+from .vacation import (
+    export_balance_report,
+    get_balance_report,
+    paginate_balance_report,
+)
+
+User = get_user_model()
+
 
 # Create your views here.
+class PayrollView(LoginRequiredMixin, generic.TemplateView):
+    template_name = "pages/payroll/index.html"
+
+    def has_management_access(self, user):
+        return has_permission(user, "management.access")
+
+    def has_payroll_access(self, user):
+        return has_permission(user, "management.payroll.access")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["officesync"] = get_officesync()
+        if self.request.user.is_authenticated:
+            month = parse_month(self.request.GET.get("month"))
+            employees = paginate_employee_totals(month, self.request.GET.get("cursor"))
+            context["month"] = month
+            context["previous_month"] = shift_month(month, -1)
+            context["next_month"] = shift_month(month, 1)
+            context["summary"] = get_month_summary(month)
+            context["year_to_date"] = get_year_to_date(month)
+            context["trend"] = get_trend(month)
+            context["role_totals"] = get_role_totals(month)
+            context["employee_totals"] = employees
+            if employees.has_next:
+                context["next_query"] = employees.next_query(self.request.GET)
+        return context
+
+    def get_unread_messages(self):
+        return Message.objects.filter(receiver=self.request.user, receiver_read=False)
+
+    def get_read_messages(self):
+        return Message.objects.filter(receiver=self.request.user, receiver_read=True)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            if not self.has_management_access(request.user):
+                return redirect("denied")
+
+            if not self.has_payroll_access(request.user):
+                return redirect("denied")
+
+        return super().dispatch(request, *args, **kwargs)
+
+
+class AbsenceCalendarView(LoginRequiredMixin, generic.TemplateView):
+    template_name = "pages/absences/index.html"
+
+    def has_management_access(self, user):
+        return has_permission(user, "management.access")
+
+    def has_absences_access(self, user):
+        return has_permission(user, "management.absences.access")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["officesync"] = get_officesync()
+        if self.request.user.is_authenticated:
+            start, end = parse_range(self.request.GET)
+            role_id = parse_role(self.request.GET)
+            absence_calendar = AbsenceCalendar(start, end, role_id)
+            context["calendar"] = absence_calendar
+            context["roles"] = Role.objects.all()
+            context["role_query"] = role_id
+            context["query"] = self.request.GET.urlencode()
+            try:
+                minimum = int(self.request.GET.get("minimum") or 0)
+            except ValueError:
+                minimum = 0
+            if minimum:
+                context["minimum"] = minimum
+                context["understaffed_days"] = absence_calendar.understaffed(minimum)
+
+            day = next(
+                (
+                    day["date"]
+                    for day in absence_calendar.days
+                    if day["date"].isoformat() == self.request.GET.get("day")
+                ),
+                None,
+            )
+            if day is not None:
+                context["day"] = day
+                context["absent_users"] = User.objects.filter(
+                    pk__in=absence_calendar.absent_on(day)
+                ).select_related("advanced__role")
+        return context
+
+    def get_unread_messages(self):
+        return Message.objects.filter(receiver=self.request.user, receiver_read=False)
+
+    def get_read_messages(self):
+        return Message.objects.filter(receiver=self.request.user, receiver_read=True)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            if not self.has_management_access(request.user):
+                return redirect("denied")
+
+            if not self.has_absences_access(request.user):
+                return redirect("denied")
+
+        return super().dispatch(request, *args, **kwargs)
+
+
+class AbsenceCalendarExportView(LoginRequiredMixin, generic.View):
+    export_format = "json"
+
+    def has_management_access(self, user):
+        return has_permission(user, "management.access")
+
+    def has_absences_access(self, user):
+        return has_permission(user, "management.absences.access")
+
+    def get(self, request, *args, **kwargs):
+        start, end = parse_range(request.GET)
+        role_id = parse_role(request.GET)
+
+        if self.export_format == "ical":
+            response = StreamingHttpResponse(
+                export_calendar_ical(start, end, role_id),
+                content_type="text/calendar; charset=utf-8",
+            )
+            response["Content-Disposition"] = 'inline; filename="abwesenheiten.ics"'
+        else:
+            response = StreamingHttpResponse(
+                export_calendar_json(AbsenceCalendar(start, end, role_id)),
+                content_type="application/json",
+            )
+        response["Cache-Control"] = "private, max-age=60"
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            if not self.has_management_access(request.user):
+                return redirect("denied")
+
+            if not self.has_absences_access(request.user):
+                return redirect("denied")
+
+        return super().dispatch(request, *args, **kwargs)
+
+
+class VacationReportView(LoginRequiredMixin, generic.TemplateView):
+    template_name = "pages/vacation/index.html"
+    export = False
+
+    def has_management_access(self, user):
+        return has_permission(user, "management.access")
+
+    def has_vacation_access(self, user):
+        return has_permission(user, "management.vacation.access")
+
+    def get_year(self):
+        try:
+            return int(self.request.GET.get("year"))
+        except (TypeError, ValueError):
+            return timezone.localdate().year
+
+    def get(self, request, *args, **kwargs):
+        if not self.export:
+            return super().get(request, *args, **kwargs)
+
+        year = self.get_year()
+        response = StreamingHttpResponse(
+            export_balance_report(get_balance_report(year, parse_role(request.GET))),
+            content_type="text/csv",
+        )
+        response["Content-Disposition"] = f'attachment; filename="urlaub-{year}.csv"'
+        return response
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["officesync"] = get_officesync()
+        if self.request.user.is_authenticated:
+            year = self.get_year()
+            role_id = parse_role(self.request.GET)
+            page = paginate_balance_report(
+                get_balance_report(year, role_id), self.request.GET.get("cursor")
+            )
+            context["year"] = year
+            context["balances"] = page
+            context["roles"] = Role.objects.all()
+            context["role_query"] = role_id
+            if page.has_next:
+                context["next_query"] = page.next_query(self.request.GET)
+        return context
+
+    def get_unread_messages(self):
+        return Message.objects.filter(receiver=self.request.user, receiver_read=False)
+
+    def get_read_messages(self):
+        return Message.objects.filter(receiver=self.request.user, receiver_read=True)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            if not self.has_management_access(request.user):
+                return redirect("denied")
+
+            if not self.has_vacation_access(request.user):
+                return redirect("denied")
+
+        return super().dispatch(request, *args, **kwargs)
+
+
+class PerformanceAnalyticsView(LoginRequiredMixin, generic.TemplateView):
+    template_name = "pages/performance/index.html"
+
+    def has_management_access(self, user):
+        return has_permission(user, "management.access")
+
+    def has_performance_access(self, user):
+        return has_permission(user, "management.performance.access")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["officesync"] = get_officesync()
+        if self.request.user.is_authenticated:
+            start, end = parse_period(self.request.GET)
+            role_id = parse_role(self.request.GET)
+            context["start"] = start
+            context["end"] = end
+            context["stats"] = get_performance_stats(start, end, role_id)
+            context["roles"] = Role.objects.all()
+            context["role_query"] = role_id
+        return context
+
+    def get_unread_messages(self):
+        return Message.objects.filter(receiver=self.request.user, receiver_read=False)
+
+    def get_read_messages(self):
+        return Message.objects.filter(receiver=self.request.user, receiver_read=True)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            if not self.has_management_access(request.user):
+                return redirect("denied")
+
+            if not self.has_performance_access(request.user):
+                return redirect("denied")
+
+        return super().dispatch(request, *args, **kwargs)
+
+
+class TimeTrackingView(LoginRequiredMixin, generic.TemplateView):
+    template_name = "pages/time/index.html"
+
+    def has_management_access(self, user):
+        return has_permission(user, "management.access")
+
+    def has_time_access(self, user):
+        return has_permission(user, "management.time.access")
+
+    def has_time_manage_permission(self, user):
+        return has_permission(user, "management.time.manage")
+
+    def get_employee(self):
+        # Fremde Zeiten sieht nur, wer sie auch korrigieren darf.
+        user_id = self.request.GET.get("user") or self.request.POST.get("user")
+        if not user_id or not self.has_time_manage_permission(self.request.user):
+            return self.request.user
+        try:
+            return get_object_or_404(User, pk=int(user_id))
+        except ValueError:
+            return self.request.user
+
+    def post(self, request, *args, **kwargs):
+        employee = self.get_employee()
+        if request.POST.get("action") == "overtime":
+            if not self.has_time_manage_permission(request.user):
+                return redirect("denied")
+            try:
+                hours = float(request.POST.get("hours", "").replace(",", "."))
+                day = parse_date(request.POST.get("date") or "")
+                add_overtime(
+                    employee,
+                    hours,
+                    day=day,
+                    note=request.POST.get("note") or None,
+                    creator=request.user,
+                )
+            except ValueError:
+                context = self.get_context_data(**kwargs)
+                context["overtime_error"] = "Ungültige Stundenzahl oder Datum."
+                return self.render_to_response(context)
+        elif employee == request.user:
+            try:
+                punch(employee, creator=request.user)
+            except PunchError as error:
+                context = self.get_context_data(**kwargs)
+                context["punch_error"] = str(error)
+                return self.render_to_response(context)
+        return HttpResponseRedirect(f"{reverse('time_tracking')}?user={employee.pk}")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["officesync"] = get_officesync()
+        if self.request.user.is_authenticated:
+            employee = self.get_employee()
+            month = parse_month(self.request.GET.get("month"))
+            next_month = shift_month(month, 1)
+            context["employee"] = employee
+            context["month"] = month
+            context["previous_month"] = shift_month(month, -1)
+            context["next_month"] = next_month
+            context["overtime_balance"] = get_overtime_balance(employee.pk)
+            context["open_entry"] = get_open_entry(employee.pk)
+            context["time_months"] = TimeMonthly.objects.filter(user=employee)[:12]
+            context["time_days"] = TimeDaily.objects.filter(
+                user=employee, date__gte=month, date__lt=next_month
+            )
+            context["time_entries"] = TimeEntry.objects.filter(
+                user=employee, date__gte=month, date__lt=next_month
+            ).select_related("creator")[:200]
+            context["has_time_manage_permission"] = self.has_time_manage_permission(
+                self.request.user
+            )
+        return context
+
+    def get_unread_messages(self):
+        return Message.objects.filter(receiver=self.request.user, receiver_read=False)
+
+    def get_read_messages(self):
+        return Message.objects.filter(receiver=self.request.user, receiver_read=True)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            if not self.has_management_access(request.user):
+                return redirect("denied")
+
+            if not self.has_time_access(request.user):
+                return redirect("denied")
+
+        return super().dispatch(request, *args, **kwargs)
+
+
+class TimePunchView(LoginRequiredMixin, generic.View):
+    # Stempeln für Terminals: ohne Angabe wird der angemeldete Benutzer
+    # ein- bzw. ausgestempelt, für andere braucht es das Korrekturrecht.
+    def has_management_access(self, user):
+        return has_permission(user, "management.access")
+
+    def has_time_access(self, user):
+        return has_permission(user, "management.time.access")
+
+    def has_time_manage_permission(self, user):
+        return has_permission(user, "management.time.manage")
+
+    def get_state(self, user):
+        open_entry = get_open_entry(user.pk)
+        return {
+            "user": user.username,
+            "clocked_in": open_entry is not None,
+            "since": open_entry.timestamp.isoformat() if open_entry else None,
+            "overtime_hours": get_overtime_balance(user.pk),
+        }
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(self.get_state(request.user))
+
+    def post(self, request, *args, **kwargs):
+        employee = request.user
+        username = request.POST.get("username")
+        if username and username != request.user.username:
+            if not self.has_time_manage_permission(request.user):
+                return JsonResponse({"error": "Keine Berechtigung."}, status=403)
+            employee = User.objects.filter(username=username).first()
+            if employee is None:
+                return JsonResponse({"error": "Unbekannter Benutzer."}, status=404)
+
+        kind = request.POST.get("kind") or None
+        if kind not in (None, TimeEntry.Kind.CLOCK_IN, TimeEntry.Kind.CLOCK_OUT):
+            return JsonResponse({"error": "Ungültige Stempelung."}, status=400)
+        try:
+            entry = punch(employee, kind, creator=request.user)
+        except PunchError as error:
+            return JsonResponse({"error": str(error)}, status=409)
+
+        state = self.get_state(employee)
+        state["kind"] = entry.kind
+        state["hours"] = entry.hours
+        return JsonResponse(state)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            if not self.has_management_access(request.user):
+                return redirect("denied")
+
+            if not self.has_time_access(request.user):
+                return redirect("denied")
+
+        return super().dispatch(request, *args, **kwargs)
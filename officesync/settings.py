@@ -58,6 +58,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django.middleware.locale.LocaleMiddleware",
+    "authentication.middleware.ConsentMiddleware",
 ]
 
 LANGUAGE_CODE = "de"
@@ -95,6 +96,8 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "administration.context_processors.role_permissions",
+                "communication.context_processors.unread_counts",
             ],
         },
     },
@@ -109,6 +112,70 @@ DATABASES = {
         "NAME": BASE_DIR / "db.sqlite3",
     }
 }
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Dateibasiert, damit alle Worker-Prozesse denselben Cache (und damit dieselben
+# Versionsschlüssel für Invalidierungen) sehen.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / ".cache",
+    }
+}
+
+# Protokolleinträge werden gepuffert und gebündelt geschrieben. Mit
+# AUDIT_LOG_SYNCHRONOUS = True wird jeder Eintrag sofort gespeichert (z. B. für
+# Tests, die die Einträge direkt in der Datenbank erwarten).
+AUDIT_LOG_BATCH_SIZE = 100
+AUDIT_LOG_FLUSH_INTERVAL = 2.0
+AUDIT_LOG_SYNCHRONOUS = False
+
+# Protokolle, die älter als LOG_RETENTION_DAYS sind, verschiebt der tägliche
+# Aufruf von "manage.py archive_logs" (z. B. per cron) in das Archiv.
+LOG_RETENTION_DAYS = 90
+LOG_ARCHIVE_DIR = BASE_DIR / "archive" / "logs"
+LOG_ARCHIVE_CHUNK_SIZE = 1000
+
+# Die Mitgliederauswahl einer Rolle sendet ein Feld pro Benutzer, ganze
+# Abteilungen liegen über Djangos Standardgrenze von 1000 Feldern.
+DATA_UPLOAD_MAX_NUMBER_FIELDS = 10000
+
+# Mitarbeiterimport ("manage.py import_employees" bzw. Benutzerliste): Zeilen
+# pro Transaktion und Prozesse, mit denen der Befehl die Passwörter hasht
+# (None = alle Kerne). Der Import über die Benutzerliste hasht im Webprozess.
+EMPLOYEE_IMPORT_CHUNK_SIZE = 500
+EMPLOYEE_IMPORT_WORKERS = None
+
+# Urlaubskonten: Anspruch pro Jahr und Arbeitstage. Feiertage gelten je Land
+# und zusätzlich je Kanton/Bundesland aus der Adresse, feste Tage als "MM-TT",
+# bewegliche relativ zum Ostersonntag ("easter+1" = Ostermontag).
+VACATION_DAYS_PER_YEAR = 25
+WORKING_WEEKDAYS = [0, 1, 2, 3, 4]
+# Sollarbeitszeit pro Arbeitstag für die Überstunden der Zeiterfassung.
+WORKING_HOURS_PER_DAY = 8.4
+PUBLIC_HOLIDAYS = {
+    "Schweiz": {
+        "": ["01-01", "easter-2", "easter+1", "easter+39", "easter+50", "08-01"]
+        + ["12-25", "12-26"],
+        "Zürich": ["01-02", "05-01"],
+        "Bern": ["01-02"],
+        "Basel-Stadt": ["05-01"],
+        "Luzern": ["01-02", "easter+60", "08-15", "11-01", "12-08"],
+    },
+    "Deutschland": {
+        "": ["01-01", "easter-2", "easter+1", "05-01", "easter+39", "easter+50"]
+        + ["10-03", "12-25", "12-26"],
+        "Bayern": ["01-06", "easter+60", "08-15", "11-01"],
+        "Baden-Württemberg": ["01-06", "easter+60", "11-01"],
+        "Berlin": ["03-08"],
+    },
+    "Österreich": {
+        "": ["01-01", "01-06", "easter+1", "05-01", "easter+39", "easter+50"]
+        + ["easter+60", "08-15", "10-26", "11-01", "12-08", "12-25", "12-26"],
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
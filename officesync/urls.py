@@ -8,4 +8,5 @@ urlpatterns = [
     path("personal/", include("personal.urls")),
     path("disposition/", include("disposition.urls")),
     path("mail/", include("communication.urls")),
+    path("management/", include("management.urls")),
 ]
@@ -0,0 +1,145 @@
+from django.contrib.auth import get_user_model
+from django.http import QueryDict
+from django.utils.functional import cached_property
+
+from administration.pagination import PAGE_SIZE, paginate_keyset
+from authentication.models import (
+    Absence,
+    Adress,
+    Criminal,
+    Performance,
+    Reprimant,
+    Salary,
+)
+
+User = get_user_model()
+
+
+# Personal- und Mitarbeiterakte eines Benutzers. Die 1:1-Daten kommen mit dem
+# Benutzer in einer Abfrage, jede Liste wird erst beim ersten Zugriff seitenweise
+# über den Index geladen (samt beteiligter Benutzer) und danach für den Rest des
+# Requests wiederverwendet. Jede Liste blättert mit einem eigenen Parameter
+# (z.B. "salaries_cursor"), damit die Akte mehrere Listen zugleich zeigen kann.
+class Dossier:
+    def __init__(self, user_id, params=None, per_page=PAGE_SIZE):
+        self.user_id = user_id
+        self.params = params if params is not None else QueryDict()
+        self.per_page = per_page
+        self.next_queries = {}
+
+    @cached_property
+    def user(self):
+        return (
+            User.objects.select_related(
+                "advanced__role", "meta", "health", "user_custom_interface"
+            )
+            .filter(pk=self.user_id)
+            .first()
+        )
+
+    def _related(self, name):
+        return getattr(self.user, name, None)
+
+    def _page(self, name, queryset, field):
+        parameter = f"{name}_cursor"
+        page = paginate_keyset(
+            queryset, self.params.get(parameter), field=field, per_page=self.per_page
+        )
+        if page.has_next:
+            self.next_queries[name] = page.next_query(self.params, parameter)
+        return page
+
+    @property
+    def advanced(self):
+        return self._related("advanced")
+
+    @property
+    def meta(self):
+        return self._related("meta")
+
+    @property
+    def health(self):
+        return self._related("health")
+
+    @cached_property
+    def addresses(self):
+        return self._page(
+            "addresses", Adress.objects.filter(user_id=self.user_id), "from_date"
+        )
+
+    @cached_property
+    def criminals(self):
+        return self._page(
+            "criminals", Criminal.objects.filter(user_id=self.user_id), "date"
+        )
+
+    @cached_property
+    def salaries(self):
+        return self._page(
+            "salaries",
+            Salary.objects.filter(recipient_id=self.user_id).select_related(
+                "beneficiary"
+            ),
+            "date",
+        )
+
+    @cached_property
+    def absences(self):
+        return self._page(
+            "absences",
+            Absence.objects.filter(recipient_id=self.user_id).select_related(
+                "beneficiary", "creator"
+            ),
+            "start",
+        )
+
+    @cached_property
+    def performances(self):
+        return self._page(
+            "performances",
+            Performance.objects.filter(user_id=self.user_id).select_related(
+                "evaluator"
+            ),
+            "date",
+        )
+
+    @cached_property
+    def reprimants(self):
+        return self._page(
+            "reprimants",
+            Reprimant.objects.filter(user_id=self.user_id).select_related("creator"),
+            "date",
+        )
+
+    @cached_property
+    def reprimant_count(self):
+        reprimants = self.reprimants
+        if not reprimants.has_next and not self.params.get("reprimants_cursor"):
+            return len(reprimants)
+        return Reprimant.objects.filter(user_id=self.user_id).count()
+
+    @cached_property
+    def unconfirmed_salaries_count(self):
+        salaries = self.__dict__.get("salaries")
+        if (
+            salaries is not None
+            and not salaries.has_next
+            and not self.params.get("salaries_cursor")
+        ):
+            return sum(1 for salary in salaries if not salary.confirmation)
+        return Salary.objects.filter(
+            recipient_id=self.user_id, confirmation=False
+        ).count()
+
+
+def get_dossier(request, user_id=None):
+    if user_id is None:
+        user_id = request.user.pk
+
+    dossiers = getattr(request, "_dossiers", None)
+    if dossiers is None:
+        dossiers = request._dossiers = {}
+    dossier = dossiers.get(user_id)
+    if dossier is None:
+        dossier = dossiers[user_id] = Dossier(user_id, request.GET)
+    return dossier
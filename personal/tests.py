@@ -1,3 +1,44 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.http import QueryDict
 from django.test import TestCase
 
-# Create your tests here.
+from authentication.models import Reprimant
+
+from .dossier import Dossier
+
+User = get_user_model()
+
+
+class DossierTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("akte", password="x")
+        Reprimant.objects.bulk_create(
+            Reprimant(
+                user=self.user,
+                date=date(2024, 1, 1) + timedelta(days=day),
+                reason="Grund",
+            )
+            for day in range(5)
+        )
+
+    def test_pages_through_all_entries(self):
+        seen = []
+        params = QueryDict(mutable=True)
+        while True:
+            dossier = Dossier(self.user.pk, params, per_page=2)
+            seen.extend(reprimant.date for reprimant in dossier.reprimants)
+            self.assertEqual(dossier.reprimant_count, 5)
+            query = dossier.next_queries.get("reprimants")
+            if query is None:
+                break
+            params = QueryDict(query)
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_single_page_has_no_next_query(self):
+        dossier = Dossier(self.user.pk)
+        self.assertEqual(len(dossier.reprimants), 5)
+        self.assertEqual(dossier.next_queries, {})
+        self.assertEqual(dossier.reprimant_count, 5)
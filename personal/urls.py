@@ -3,6 +3,7 @@ from .views import (
     AbsenceView,
     AdressView,
     CriminalView,
+    DossierView,
     HealthView,
     MetaView,
     NotesView,
@@ -24,6 +25,7 @@ urlpatterns = [
     path("personal/adress", AdressView.as_view(), name="adress"),
     path("personal/health", HealthView.as_view(), name="health"),
     path("personal/criminal", CriminalView.as_view(), name="criminal"),
+    path("personal/dossier", DossierView.as_view(), name="dossier"),
     path("work", WorkView.as_view(), name="work"),
     path("work/salary", SalaryView.as_view(), name="salary"),
     path("work/absence", AbsenceView.as_view(), name="absence"),
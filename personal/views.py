@@ -4,10 +4,13 @@ from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
 from django.views import generic
 
-from authentication.models import AdvancedUser, OfficeSync, Salary
-from communication.models import Announcement, Message
+from authentication.models import AdvancedUser, Salary
+from authentication.singletons import get_officesync
+from communication.models import Message
 from personal.models import Note
 
+from .dossier import get_dossier
+
 User = get_user_model()
 
 
@@ -18,23 +21,12 @@ class ProfileView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["dossier"] = get_dossier(self.request)
             context["unconfirmed_salaries_count"] = self.get_unconfirmed_salaries()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -42,20 +34,7 @@ class ProfileView(LoginRequiredMixin, generic.ListView):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
     def get_unconfirmed_salaries(self):
-        return self.request.user.salaries.filter(confirmation=False).count()
-
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
+        return get_dossier(self.request).unconfirmed_salaries_count
 
 
 class ProfileUpdateView(LoginRequiredMixin, generic.UpdateView):
@@ -86,23 +65,12 @@ class ProfileUpdateView(LoginRequiredMixin, generic.UpdateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["dossier"] = get_dossier(self.request)
             context["unconfirmed_salaries_count"] = self.get_unconfirmed_salaries()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -110,20 +78,7 @@ class ProfileUpdateView(LoginRequiredMixin, generic.UpdateView):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
     def get_unconfirmed_salaries(self):
-        return self.request.user.salaries.filter(confirmation=False).count()
-
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
+        return get_dossier(self.request).unconfirmed_salaries_count
 
 
 class PersonalView(LoginRequiredMixin, generic.ListView):
@@ -132,23 +87,12 @@ class PersonalView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["dossier"] = get_dossier(self.request)
             context["unconfirmed_salaries_count"] = self.get_unconfirmed_salaries()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -156,20 +100,7 @@ class PersonalView(LoginRequiredMixin, generic.ListView):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
     def get_unconfirmed_salaries(self):
-        return self.request.user.salaries.filter(confirmation=False).count()
-
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
+        return get_dossier(self.request).unconfirmed_salaries_count
 
 
 class MetaView(LoginRequiredMixin, generic.ListView):
@@ -178,23 +109,12 @@ class MetaView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["dossier"] = get_dossier(self.request)
             context["unconfirmed_salaries_count"] = self.get_unconfirmed_salaries()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -202,20 +122,7 @@ class MetaView(LoginRequiredMixin, generic.ListView):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
     def get_unconfirmed_salaries(self):
-        return self.request.user.salaries.filter(confirmation=False).count()
-
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
+        return get_dossier(self.request).unconfirmed_salaries_count
 
 
 class AdressView(LoginRequiredMixin, generic.ListView):
@@ -224,23 +131,12 @@ class AdressView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["dossier"] = get_dossier(self.request)
             context["unconfirmed_salaries_count"] = self.get_unconfirmed_salaries()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -248,20 +144,7 @@ class AdressView(LoginRequiredMixin, generic.ListView):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
     def get_unconfirmed_salaries(self):
-        return self.request.user.salaries.filter(confirmation=False).count()
-
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
+        return get_dossier(self.request).unconfirmed_salaries_count
 
 
 class HealthView(LoginRequiredMixin, generic.ListView):
@@ -270,23 +153,12 @@ class HealthView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["dossier"] = get_dossier(self.request)
             context["unconfirmed_salaries_count"] = self.get_unconfirmed_salaries()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -294,20 +166,7 @@ class HealthView(LoginRequiredMixin, generic.ListView):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
     def get_unconfirmed_salaries(self):
-        return self.request.user.salaries.filter(confirmation=False).count()
-
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
+        return get_dossier(self.request).unconfirmed_salaries_count
 
 
 class CriminalView(LoginRequiredMixin, generic.ListView):
@@ -316,23 +175,12 @@ class CriminalView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["dossier"] = get_dossier(self.request)
             context["unconfirmed_salaries_count"] = self.get_unconfirmed_salaries()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -340,20 +188,28 @@ class CriminalView(LoginRequiredMixin, generic.ListView):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
     def get_unconfirmed_salaries(self):
-        return self.request.user.salaries.filter(confirmation=False).count()
+        return get_dossier(self.request).unconfirmed_salaries_count
 
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
 
-            if not request.user.advanced.terms:
-                return redirect("terms")
+class DossierView(LoginRequiredMixin, generic.TemplateView):
+    template_name = "pages/profile/dossier.html"
 
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["officesync"] = get_officesync()
+        if self.request.user.is_authenticated:
+            context["dossier"] = get_dossier(self.request)
+            context["unconfirmed_salaries_count"] = self.get_unconfirmed_salaries()
+        return context
 
-        return super().dispatch(request, *args, **kwargs)
+    def get_unread_messages(self):
+        return Message.objects.filter(receiver=self.request.user, receiver_read=False)
+
+    def get_read_messages(self):
+        return Message.objects.filter(receiver=self.request.user, receiver_read=True)
+
+    def get_unconfirmed_salaries(self):
+        return get_dossier(self.request).unconfirmed_salaries_count
 
 
 class WorkView(LoginRequiredMixin, generic.ListView):
@@ -362,23 +218,12 @@ class WorkView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["dossier"] = get_dossier(self.request)
             context["unconfirmed_salaries_count"] = self.get_unconfirmed_salaries()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -386,20 +231,7 @@ class WorkView(LoginRequiredMixin, generic.ListView):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
     def get_unconfirmed_salaries(self):
-        return self.request.user.salaries.filter(confirmation=False).count()
-
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
+        return get_dossier(self.request).unconfirmed_salaries_count
 
 
 class SalaryView(LoginRequiredMixin, generic.ListView):
@@ -408,30 +240,19 @@ class SalaryView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["dossier"] = get_dossier(self.request)
             context["unconfirmed_salaries_count"] = self.get_unconfirmed_salaries()
         return context
 
     def post(self, request, *args, **kwargs):
         salary_id = request.POST.get("salary_id")
-        salary = get_object_or_404(Salary, id=salary_id)
+        salary = get_object_or_404(Salary, id=salary_id, recipient=request.user)
         salary.confirmation = True
         salary.save()
         return redirect(reverse("salary"))
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -439,20 +260,7 @@ class SalaryView(LoginRequiredMixin, generic.ListView):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
     def get_unconfirmed_salaries(self):
-        return self.request.user.salaries.filter(confirmation=False).count()
-
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
+        return get_dossier(self.request).unconfirmed_salaries_count
 
 
 class AbsenceView(LoginRequiredMixin, generic.ListView):
@@ -461,23 +269,12 @@ class AbsenceView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["dossier"] = get_dossier(self.request)
             context["unconfirmed_salaries_count"] = self.get_unconfirmed_salaries()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -485,20 +282,7 @@ class AbsenceView(LoginRequiredMixin, generic.ListView):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
     def get_unconfirmed_salaries(self):
-        return self.request.user.salaries.filter(confirmation=False).count()
-
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
+        return get_dossier(self.request).unconfirmed_salaries_count
 
 
 class PerformanceView(LoginRequiredMixin, generic.ListView):
@@ -507,23 +291,12 @@ class PerformanceView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["dossier"] = get_dossier(self.request)
             context["unconfirmed_salaries_count"] = self.get_unconfirmed_salaries()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -531,20 +304,7 @@ class PerformanceView(LoginRequiredMixin, generic.ListView):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
     def get_unconfirmed_salaries(self):
-        return self.request.user.salaries.filter(confirmation=False).count()
-
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
+        return get_dossier(self.request).unconfirmed_salaries_count
 
 
 class ReprimantView(LoginRequiredMixin, generic.ListView):
@@ -553,23 +313,12 @@ class ReprimantView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+            context["dossier"] = get_dossier(self.request)
             context["unconfirmed_salaries_count"] = self.get_unconfirmed_salaries()
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
@@ -577,20 +326,7 @@ class ReprimantView(LoginRequiredMixin, generic.ListView):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
     def get_unconfirmed_salaries(self):
-        return self.request.user.salaries.filter(confirmation=False).count()
-
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
+        return get_dossier(self.request).unconfirmed_salaries_count
 
 
 class NotesView(LoginRequiredMixin, generic.ListView):
@@ -600,41 +336,15 @@ class NotesView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
-        if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
     def get_read_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
 
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)
-
 
 class NoteUpdateView(LoginRequiredMixin, generic.UpdateView):
     model = Note
@@ -646,37 +356,11 @@ class NoteUpdateView(LoginRequiredMixin, generic.UpdateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["officesync"] = (
-            OfficeSync.objects.first()
-        )  # Hole das erste OfficeSync-Objekt
-        if self.request.user.is_authenticated:
-            context["unread_announcements_count"] = (
-                self.get_unread_announcements().count()
-            )
-            context["unread_messages_count"] = self.get_unread_messages().count()
-            context["unread_count"] = (
-                context["unread_announcements_count"] + context["unread_messages_count"]
-            )
+        context["officesync"] = get_officesync()  # Hole das erste OfficeSync-Objekt
         return context
 
-    def get_unread_announcements(self):
-        return Announcement.objects.exclude(read_by=self.request.user)
-
     def get_unread_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=False)
 
     def get_read_messages(self):
         return Message.objects.filter(receiver=self.request.user, receiver_read=True)
-
-    def dispatch(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            if not request.user.advanced.privacy:
-                return redirect("privacy")
-
-            if not request.user.advanced.terms:
-                return redirect("terms")
-
-            if not request.user.advanced.copyright:
-                return redirect("copyright")
-
-        return super().dispatch(request, *args, **kwargs)